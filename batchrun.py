@@ -0,0 +1,264 @@
+import os
+import sys
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from spectrum import check_design
+
+# 批次工作的預設值，可於清單的 "defaults" 覆寫
+JOB_DEFAULTS = {
+    'task': 'period',
+    'groups_x': [],
+    'groups_y': [],
+    'groups_z': [],
+    'eqfactor_x': None,
+    'eqfactor_y': None,
+    'eqfactor_z': None,
+    'v_percent': 0.9,
+    'use_cache': True,
+    'load_output': 'sap',
+    'design': None,
+    'results_path': None,
+}
+# combined 以 design 設計參數自動計算係數，見 sapcore.run_analysis_combined
+TASKS = ('period', 'eqforce', 'both', 'combined')
+
+
+def _expand_factor(factor, groups):
+    """單一數值的係數展開為與群組等長的列表。"""
+    if factor is None:
+        return None
+    if isinstance(factor, (int, float)):
+        return [float(factor)] * len(groups)
+    if len(factor) != len(groups):
+        raise ValueError(f"係數數量 ({len(factor)}) 與群組數量 ({len(groups)}) 不一致")
+    return [float(f) for f in factor]
+
+
+def normalize_job(job, defaults=None, base_dir=''):
+    """
+    補齊工作設定的預設值並檢查內容。
+
+    參數:
+        job (dict): 單一模型的設定，至少包含 model_path。
+        defaults (dict): 覆寫 JOB_DEFAULTS 的預設值。
+        base_dir (str): 相對模型路徑的基準資料夾（清單檔所在資料夾）。
+
+    回傳:
+        dict: 完整的工作設定，係數已展開為與群組等長的列表。
+    """
+    merged = dict(JOB_DEFAULTS)
+    merged.update(defaults or {})
+    merged.update(job)
+
+    if 'model_path' not in merged:
+        raise ValueError("工作設定缺少 model_path")
+    if merged['task'] not in TASKS:
+        raise ValueError(f"未知的工作類型：{merged['task']}")
+    merged['model_path'] = os.path.abspath(os.path.join(base_dir, merged['model_path']))
+    if merged['results_path']:
+        merged['results_path'] = os.path.abspath(os.path.join(base_dir, merged['results_path']))
+
+    for axis in ('x', 'y', 'z'):
+        groups = merged[f'groups_{axis}']
+        merged[f'eqfactor_{axis}'] = _expand_factor(merged[f'eqfactor_{axis}'], groups)
+        if merged['task'] in ('eqforce', 'both') and merged[f'eqfactor_{axis}'] is None:
+            raise ValueError(f"地震力計算缺少 eqfactor_{axis}")
+    if merged['task'] == 'combined':
+        if not merged['design']:
+            raise ValueError("一次完成計算缺少 design 設計參數")
+        check_design(merged['design'])
+    return merged
+
+
+def load_manifest(manifest_path):
+    """
+    讀取批次清單（JSON）。
+
+    清單可為工作列表，或 {"defaults": {...}, "jobs": [...]}；
+    每個工作包含 model_path、groups_x/y/z、task（period、eqforce、both 或 combined），
+    地震力計算另需 eqfactor_x/y/z（單一數值或與群組等長的列表）及 v_percent，
+    combined 則以 design（見 spectrum.design_params）取代 eqfactor_x/y/z。
+    提供 results_path（SAP2000 匯出的結果檔）時不啟動 SAP2000 分析，見 sapcore.collect_joint_results。
+
+    參數:
+        manifest_path (str): 清單檔案路徑。
+
+    回傳:
+        list: normalize_job 處理後的工作列表。
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {'jobs': manifest}
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    defaults = manifest.get('defaults', {})
+    return [normalize_job(job, defaults, base_dir) for job in manifest['jobs']]
+
+
+def summarize_period(periods):
+    """將 run_analysis_period 的結果整理為 {方向: {群組: 週期}}。"""
+    return {
+        axis: {gp: data['period'] for gp, data in period.items()}
+        for axis, period in zip(('X', 'Y', 'Z'), periods)
+    }
+
+
+def summarize_eqforce(eqforces):
+    """
+    將 run_analysis_eqforce 的結果整理為 {方向: {群組: {eqfactor, SumForce, ...}}}。
+    X、Y 方向另含 TotalMass 與 BaseShear。
+    """
+    summary = {}
+    for axis, eqforce in zip(('X', 'Y', 'Z'), eqforces):
+        summary[axis] = {}
+        for gp, data in eqforce.items():
+            item = {'eqfactor': data['eqfactor'], 'SumForce': data['nodes'].sum('eqforce')}
+            for key in ('TotalMass', 'BaseShear'):
+                if key in data:
+                    item[key] = data[key]
+            summary[axis][gp] = item
+    return summary
+
+
+def run_job(job, session=None):
+    """
+    執行單一模型的週期及（或）地震力計算，錯誤時不拋出例外而記錄於結果中。
+
+    參數:
+        job (dict): normalize_job 處理後的工作設定。
+        session (SapSession): 若提供，period 與 eqforce 共用同一個 SAP2000。
+
+    回傳:
+        dict: model_path、task、status（'ok' 或 'failed'）、elapsed、error 及 period/eqforce 摘要。
+    """
+    import sapcore
+
+    result = {'model_path': job['model_path'], 'task': job['task'], 'status': 'ok', 'error': None}
+    start = time.perf_counter()
+    try:
+        if job['task'] in ('period', 'both'):
+            periods = sapcore.run_analysis_period(
+                job['model_path'], job['groups_x'], job['groups_y'], job['groups_z'],
+                session=session, use_cache=job['use_cache'], results_path=job['results_path'],
+            )
+            result['period'] = summarize_period(periods)
+        if job['task'] in ('eqforce', 'both'):
+            eqforces = sapcore.run_analysis_eqforce(
+                job['model_path'], job['groups_x'], job['groups_y'], job['groups_z'],
+                job['eqfactor_x'], job['eqfactor_y'], job['eqfactor_z'], job['v_percent'],
+                session=session, use_cache=job['use_cache'], load_output=job['load_output'],
+                results_path=job['results_path'],
+            )
+            result['eqforce'] = summarize_eqforce(eqforces)
+        if job['task'] == 'combined':
+            periods, eqfactors, eqforces = sapcore.run_analysis_combined(
+                job['model_path'], job['groups_x'], job['groups_y'], job['groups_z'],
+                job['design'], job['v_percent'],
+                session=session, use_cache=job['use_cache'], load_output=job['load_output'],
+                results_path=job['results_path'],
+            )
+            result['period'] = summarize_period(periods)
+            result['eqfactor'] = dict(zip(('X', 'Y', 'Z'), eqfactors))
+            result['eqforce'] = summarize_eqforce(eqforces)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+        print(f"[錯誤]：{job['model_path']} 計算失敗：{result['error']}")
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def _run_job_in_worker(job):
+    """工作程序中執行單一模型，period 與 eqforce 共用工作程序專屬的 SAP2000，結束後關閉。"""
+    import sapcore
+
+    session = sapcore.SapSession()
+    try:
+        return run_job(job, session)
+    finally:
+        session.shutdown()
+
+
+def _init_worker(profile=False):
+    """
+    工作程序初始化：不附加到其他程序的 SAP2000，每個工作程序使用自己啟動的實例；
+    輸出檔名加上模型檔名字首，同資料夾的多個模型不互相覆寫。
+    """
+    import sapcore
+    import sapprofile
+    sapcore.ATTACH_EXISTING = False
+    sapcore.OUTPUT_PREFIX_MODEL = True
+    if profile:
+        sapprofile.ENABLED = True
+
+
+def run_batch(jobs, workers=None, profile=False):
+    """
+    以程序池平行執行多個模型。每個工作程序各自啟動 SAP2000，單一模型失敗不影響其他模型。
+
+    參數:
+        jobs (list): load_manifest 或 normalize_job 產生的工作列表。
+        workers (int): 同時執行的程序數量，None 表示 min(工作數, CPU 數)。
+        profile (bool): 是否於各工作程序輸出耗時統計與 Chrome trace。
+
+    回傳:
+        list: 與 jobs 順序對應的 run_job 結果。
+    """
+    if not jobs:
+        return []
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profile,)) as pool:
+        futures = [pool.submit(_run_job_in_worker, job) for job in jobs]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # 工作程序異常結束（例如 SAP2000 當機導致程序終止）
+                results[i] = {
+                    'model_path': jobs[i]['model_path'], 'task': jobs[i]['task'],
+                    'status': 'failed', 'error': f"{type(e).__name__}: {e}", 'elapsed': None,
+                }
+            print(f"[訊息]：({i + 1}/{len(jobs)}) {results[i]['status']} - {jobs[i]['model_path']}")
+    return results
+
+
+def write_batch_results(results, output_path):
+    """
+    將批次結果寫為 JSON 檔。
+
+    參數:
+        results (list): run_batch 的回傳值。
+        output_path (str): 輸出檔案完整路徑。
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="以程序池批次執行多個 SAP2000 模型的週期與地震力計算")
+    parser.add_argument('manifest', help="批次清單 JSON 檔")
+    parser.add_argument('--workers', type=int, default=None, help="同時執行的程序數量")
+    parser.add_argument('--output', default=None, help="結果 JSON 檔，預設為清單同路徑的 batch_results.json")
+    parser.add_argument('--profile', action='store_true', help="輸出各模型的耗時統計與 Chrome trace")
+    args = parser.parse_args()
+
+    jobs = load_manifest(args.manifest)
+    start = time.perf_counter()
+    results = run_batch(jobs, args.workers, args.profile)
+    output_path = args.output or os.path.join(os.path.dirname(os.path.abspath(args.manifest)), 'batch_results.json')
+    write_batch_results(results, output_path)
+
+    failed = [r for r in results if r['status'] != 'ok']
+    print(f"[訊息]：批次完成，共 {len(results)} 個模型，失敗 {len(failed)} 個，耗時 {time.perf_counter() - start:.1f} 秒。")
+    print(f"[訊息]：結果已輸出至：{output_path}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import argparse
+
+from batchrun import TASKS, normalize_job, run_job
+
+
+def load_config(config_path):
+    """
+    讀取單一模型的設定檔（JSON 或 YAML），欄位與批次清單的工作相同。
+    YAML 需安裝 PyYAML。
+
+    參數:
+        config_path (str): 設定檔路徑。
+
+    回傳:
+        dict: 設定內容。
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(config_path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("[錯誤]：讀取 YAML 設定檔需要安裝 PyYAML（pip install pyyaml）。")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='pyreeq',
+        description="PyreEQ 命令列模式：不啟動 GUI，執行週期及（或）地震力計算",
+    )
+    parser.add_argument('model_path', nargs='?', help="SAP2000 模型檔案（.sdb），可由設定檔提供")
+    parser.add_argument('-c', '--config', help="JSON 或 YAML 設定檔，命令列參數優先")
+    parser.add_argument('-t', '--task', choices=TASKS, help="period、eqforce、both 或 combined（預設 period）")
+    parser.add_argument('-x', '--groups-x', nargs='+', metavar='GROUP', help="X 方向群組")
+    parser.add_argument('-y', '--groups-y', nargs='+', metavar='GROUP', help="Y 方向群組")
+    parser.add_argument('-z', '--groups-z', nargs='+', metavar='GROUP', help="Z 方向群組")
+    parser.add_argument('--eqfactor-x', nargs='+', type=float, metavar='C', help="X 方向地震力係數，單一值套用至所有群組")
+    parser.add_argument('--eqfactor-y', nargs='+', type=float, metavar='C', help="Y 方向地震力係數")
+    parser.add_argument('--eqfactor-z', nargs='+', type=float, metavar='C', help="Z 方向地震力係數")
+    parser.add_argument('--v-percent', type=float, help="分配力總和須達總基底剪力的比例下限（預設 0.9）")
+    parser.add_argument('--load-output', choices=('sap', 's2k', 'both'), help="節點力輸出方式（預設 sap）")
+    parser.add_argument('--no-cache', action='store_true', help="不使用模型旁的結果快取")
+    parser.add_argument('--profile', action='store_true',
+                        help="輸出耗時統計，並於模型同路徑寫入 Chrome trace（*_profile.json）")
+    parser.add_argument('--attach', action='store_true',
+                        help="附加到正在運行的 SAP2000 實例，而非啟動專屬實例；結束時不關閉該實例")
+    parser.add_argument('--results', dest='results_path', metavar='PATH',
+                        help="由 SAP2000 匯出的 Joint Displacements / Assembled Joint Masses 結果檔計算（文字、Excel 或 Access），不啟動 SAP2000")
+    design = parser.add_argument_group("combined 設計參數（鐵路橋梁耐震設計規範[110年]）")
+    design.add_argument('--sds', type=float, help="短週期設計譜加速度係數 SDS")
+    design.add_argument('--sd1', type=float, help="一秒週期設計譜加速度係數 SD1")
+    design.add_argument('--site-class', type=int, choices=(1, 2, 3), help="地盤分類，與 --ss、--s1 一起取代 SDS、SD1")
+    design.add_argument('--ss', type=float, help="短週期震區設計水平譜加速度係數 SS")
+    design.add_argument('--s1', type=float, help="一秒週期震區設計水平譜加速度係數 S1")
+    design.add_argument('--importance', type=float, help="用途係數 I")
+    design.add_argument('--alpha-y', type=float, help="起始降伏地震力放大倍數 αy")
+    design.add_argument('--ductility', type=float, help="韌性容量 R")
+    design.add_argument('--alpha-v', type=float, help="垂直與水平向加速度比值 αv")
+    return parser
+
+
+def main(argv=None):
+    """
+    命令列進入點。
+
+    回傳:
+        int: 結束代碼，成功為 0，設定錯誤為 2，計算失敗為 1。
+    """
+    args = build_parser().parse_args(argv)
+
+    job = {}
+    base_dir = ''
+    if args.config:
+        job.update(load_config(args.config))
+        base_dir = os.path.dirname(os.path.abspath(args.config))
+    if args.model_path:
+        job['model_path'] = os.path.abspath(args.model_path)
+    if args.results_path:
+        job['results_path'] = os.path.abspath(args.results_path)
+    for key in ('task', 'groups_x', 'groups_y', 'groups_z', 'v_percent', 'load_output'):
+        value = getattr(args, key)
+        if value is not None:
+            job[key] = value
+    for key in ('eqfactor_x', 'eqfactor_y', 'eqfactor_z'):
+        value = getattr(args, key)
+        if value is not None:
+            job[key] = value[0] if len(value) == 1 else value
+    if args.no_cache:
+        job['use_cache'] = False
+    design_args = {'SDS': args.sds, 'SD1': args.sd1, 'site_class': args.site_class, 'SS': args.ss, 'S1': args.s1,
+                   'I': args.importance,
+                   'alpha_y': args.alpha_y, 'R': args.ductility, 'alpha_v': args.alpha_v}
+    design_args = {key: value for key, value in design_args.items() if value is not None}
+    if design_args:
+        job['design'] = dict(job.get('design') or {}, **design_args)
+
+    try:
+        job = normalize_job(job, base_dir=base_dir)
+    except ValueError as e:
+        print(f"[錯誤]：{e}", file=sys.stderr)
+        return 2
+
+    import sapcore
+    import sapprofile
+
+    sapcore.ATTACH_EXISTING = args.attach
+    if args.profile:
+        sapprofile.ENABLED = True
+    session = sapcore.SapSession()
+    try:
+        result = run_job(job, session)
+    finally:
+        session.shutdown()
+
+    if result['status'] != 'ok':
+        print(result.get('traceback', ''), file=sys.stderr)
+        return 1
+    print(f"[訊息]：計算完成，耗時 {result['elapsed']:.1f} 秒。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+import sys
+import math
+import numpy as np
+
+# 重力加速度，與單位載重 'Accel' 設定一致
+G = 9.81
+
+
+def node_sort_key(name):
+    """節點名稱排序鍵：純數字名稱依數值排序並排在其他名稱之前。"""
+    return (0, int(name)) if name.isdigit() else (1, name)
+
+
+class NodeTable(object):
+    """
+    單一群組的節點結果表，以欄儲存（struct-of-arrays）。
+
+    所有欄位共用同一組節點名稱，名稱以 sys.intern 建立，各群組、各方向的相同節點共用同一字串物件；
+    數值欄位皆為長度等於節點數的 float64 ndarray，該節點無此資料時為 NaN
+    （例如僅有位移而無質量的節點，其 wu、eqforce 為 NaN）。
+
+    參數:
+        names (list of str): 節點名稱。
+        **columns (array_like): 欄位名稱及對應數值，例如 mass=..., disp=...。
+    """
+    __slots__ = ('names', 'columns', '_row')
+
+    def __init__(self, names, **columns):
+        self.names = [sys.intern(str(name)) for name in names]
+        self.columns = {}
+        self._row = None
+        for key, values in columns.items():
+            self[key] = values
+
+    @classmethod
+    def from_dicts(cls, **dicts):
+        """
+        由 {節點: 數值} 字典建立結果表，節點為所有字典的聯集，依首次出現順序排列。
+
+        參數:
+            **dicts (dict): 欄位名稱及對應的節點字典。
+        """
+        names = list(dict.fromkeys(name for values in dicts.values() for name in values))
+        nan = float('nan')
+        return cls(names, **{
+            key: np.fromiter((values.get(name, nan) for name in names), dtype=np.float64, count=len(names))
+            for key, values in dicts.items()
+        })
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def __getitem__(self, key):
+        return self.columns[key]
+
+    def __setitem__(self, key, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(self.names),):
+            raise ValueError(f"欄位 {key} 的長度 {values.shape} 與節點數 {len(self.names)} 不一致")
+        self.columns[key] = values
+
+    def get(self, key, default=None):
+        return self.columns.get(key, default)
+
+    def with_columns(self, **columns):
+        """回傳加入欄位後的新結果表，節點名稱與既有欄位陣列共用而不複製。"""
+        table = NodeTable.__new__(NodeTable)
+        table.names = self.names
+        table.columns = dict(self.columns)
+        table._row = self._row
+        for key, values in columns.items():
+            table[key] = values
+        return table
+
+    def row(self, name):
+        """節點名稱於表中的列索引，找不到時為 None。"""
+        if self._row is None:
+            self._row = {name: i for i, name in enumerate(self.names)}
+        return self._row.get(name)
+
+    def valid(self, key):
+        """欄位非 NaN 的布林遮罩。"""
+        return ~np.isnan(self.columns[key])
+
+    def sum(self, key):
+        """欄位總和，略過 NaN。"""
+        return float(np.nansum(self.columns[key]))
+
+    def to_dict(self, key):
+        """
+        將欄位轉為 {節點: 數值} 字典，略過 NaN，供施加節點力等需要以名稱查詢的場合使用。
+        """
+        values = self.columns[key]
+        rows = np.flatnonzero(~np.isnan(values))
+        return dict(zip([self.names[i] for i in rows], values[rows].tolist()))
+
+
+def aligned_table(aligned):
+    """
+    將 align_nodes 的結果轉為含 mass、disp 欄位的 NodeTable。
+    列依位移節點順序排列，其後接僅有質量的節點。
+
+    回傳:
+        tuple: (table, common_row)，common_row 為共通節點於表中的列索引，順序與 common_name 相同。
+    """
+    disp_name = aligned['disp_name']
+    mass_name = aligned['mass_name']
+    num_disp = len(disp_name)
+    in_common = np.zeros(len(mass_name), dtype=bool)
+    in_common[aligned['idx_mass']] = True
+    mass_only = np.flatnonzero(~in_common)
+
+    num_node = num_disp + len(mass_only)
+    disp = np.full(num_node, np.nan)
+    disp[:num_disp] = aligned['disp']
+    mass = np.full(num_node, np.nan)
+    mass[aligned['idx_disp']] = aligned['mass'][aligned['idx_mass']]
+    mass[num_disp:] = aligned['mass'][mass_only]
+
+    table = NodeTable(disp_name + [mass_name[i] for i in mass_only], mass=mass, disp=disp)
+    return table, aligned['idx_disp']
+
+
+def common_column(table, common_row, values):
+    """將僅含共通節點的數值展開為結果表欄位，其餘節點為 NaN。"""
+    column = np.full(len(table), np.nan)
+    column[common_row] = values
+    return column
+
+
+def align_nodes(dict_disp, dict_mass):
+    """
+    依節點名稱將位移與質量一次對齊為索引陣列。
+    重複節點的處理方式與 dict(zip(...)) 相同，保留最後一筆資料。
+
+    參數:
+        dict_disp (dict): get_disp 單一群組結果，含 'node_name' 與 'node_disp'。
+        dict_mass (dict): get_mass 單一群組結果，含 'node_name' 與 'node_mass'。
+
+    回傳:
+        dict: 對齊後的欄位資料
+            - disp_name (list): 不重複位移節點名稱。
+            - disp (ndarray): 對應 disp_name 的位移。
+            - mass_name (list): 不重複質量節點名稱。
+            - mass (ndarray): 對應 mass_name 的質量。
+            - common_name (list): 位移與質量共通節點名稱。
+            - idx_disp (ndarray): 共通節點於 disp 的索引。
+            - idx_mass (ndarray): 共通節點於 mass 的索引。
+    """
+    disp_pos = {name: i for i, name in enumerate(dict_disp['node_name'])}
+    mass_pos = {name: i for i, name in enumerate(dict_mass['node_name'])}
+
+    disp_raw = np.asarray(dict_disp['node_disp'], dtype=np.float64)
+    mass_raw = np.asarray(dict_mass['node_mass'], dtype=np.float64)
+    disp = disp_raw[np.fromiter(disp_pos.values(), dtype=np.intp, count=len(disp_pos))]
+    mass = mass_raw[np.fromiter(mass_pos.values(), dtype=np.intp, count=len(mass_pos))]
+
+    # 以質量節點的順序編號，查出共通節點在兩個陣列中的位置
+    mass_order = {name: i for i, name in enumerate(mass_pos)}
+    common_name = []
+    idx_disp = []
+    idx_mass = []
+    for i, name in enumerate(disp_pos):
+        j = mass_order.get(name)
+        if j is not None:
+            common_name.append(name)
+            idx_disp.append(i)
+            idx_mass.append(j)
+
+    return {
+        'disp_name': list(disp_pos),
+        'disp': disp,
+        'mass_name': list(mass_pos),
+        'mass': mass,
+        'common_name': common_name,
+        'idx_disp': np.asarray(idx_disp, dtype=np.intp),
+        'idx_mass': np.asarray(idx_mass, dtype=np.intp),
+    }
+
+
+def rayleigh_sums(aligned):
+    """
+    計算共通節點的 wu、wuu 與其總和。
+
+    回傳:
+        tuple: (wu, wuu, beta, zeta)，wu 與 wuu 為 ndarray，beta = |Σwu|，zeta = Σwuu。
+    """
+    u = aligned['disp'][aligned['idx_disp']]
+    m = aligned['mass'][aligned['idx_mass']]
+    wu = u * m
+    wuu = wu * u
+    beta = abs(float(wu.sum()))
+    zeta = float(wuu.sum())
+    return wu, wuu, beta, zeta
+
+
+def cal_period_vec(jointdisp, jointmass, group):
+    """
+    cal_period 的向量化版本，結果與 cal_period 相同。
+
+    參數:
+        jointdisp (dict): get_disp 的回傳值。
+        jointmass (dict): get_mass 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+
+    回傳:
+        dict: {群組: 結果}，結果含 period、beta、zeta 及 nodes
+            （NodeTable，列為位移與質量節點的聯集，欄位 mass、disp，缺少的值為 NaN）。
+    """
+    dict_period = {}
+    for gp in group:
+        aligned = align_nodes(jointdisp[gp], jointmass[gp])
+        _, _, beta, zeta = rayleigh_sums(aligned)
+        table, _ = aligned_table(aligned)
+
+        # 根據 Rayleigh's method 計算週期
+        # T = 2 * pi * sqrt( (sum(m*u^2)) / (g * sum(m*u)) )
+        period = 2 * math.pi * math.sqrt(zeta / (G * beta))
+
+        dict_period[gp] = {}
+        dict_period[gp]['period'] = period
+        dict_period[gp]['beta'] = beta
+        dict_period[gp]['zeta'] = zeta
+        dict_period[gp]['nodes'] = table
+
+    return dict_period
+
+
+def eqforce_basis(jointdisp, jointmass, group):
+    """
+    計算與地震力係數無關的各群組分配基準：beta、zeta、總質量及單位係數下的節點分配力。
+    節點力對係數為線性，僅比例下限調整與係數有關，因此係數或比例變更時只需以 scale_eqforce 重新縮放。
+
+    參數:
+        jointdisp (dict): get_disp 的回傳值。
+        jointmass (dict): get_mass 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+
+    回傳:
+        dict: {群組: 基準資料}，基準資料含 beta、zeta、TotalMass、unit_force（係數為 1 時的節點力）、
+            wu、wuu（以上三者僅含共通節點）、common_name、common_row 及 nodes（含 mass、disp、wu、wuu 欄位的 NodeTable）。
+    """
+    dict_basis = {}
+    for gp in group:
+        aligned = align_nodes(jointdisp[gp], jointmass[gp])
+        wu, wuu, beta, zeta = rayleigh_sums(aligned)
+        table, common_row = aligned_table(aligned)
+
+        dict_basis[gp] = {}
+        dict_basis[gp]['beta'] = beta
+        dict_basis[gp]['zeta'] = zeta
+        dict_basis[gp]['TotalMass'] = float(aligned['mass'].sum())
+        # [sum(wu)/sum(wuu)]*wu*g，乘上 eqfactor 即為節點地震力；無位移時無法分配，分配力為 0
+        dict_basis[gp]['unit_force'] = (beta / zeta) * G * wu if zeta != 0 else np.zeros_like(wu)
+        dict_basis[gp]['wu'] = wu
+        dict_basis[gp]['wuu'] = wuu
+        dict_basis[gp]['common_name'] = [table.names[i] for i in common_row]
+        dict_basis[gp]['common_row'] = common_row
+        dict_basis[gp]['nodes'] = table.with_columns(
+            wu=common_column(table, common_row, wu),
+            wuu=common_column(table, common_row, wuu),
+        )
+
+    return dict_basis
+
+
+def zero_force_message(gp, vpa):
+    """第一振態分配力總和為 0 時的錯誤訊息。"""
+    return (f"群組 {gp} 的第一振態分配力總和為 0，無法調整至總基底剪力{vpa*100}%；"
+            "請確認該群組節點在單位加速度下的位移與質量")
+
+
+def scale_eqforce(basis, group, eqfactor, vpa):
+    """
+    以 eqforce_basis 的結果與地震力係數計算節點地震力，結果與 cal_eqforce 相同。
+
+    參數:
+        basis (dict): eqforce_basis 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+        eqfactor (list of float): 與 group 順序對應的地震力係數。
+        vpa (float): 分配力總和須達總基底剪力的比例下限。
+
+    回傳:
+        dict: 各群組的 beta、zeta、eqfactor、TotalMass、BaseShear 及 nodes
+            （含 mass、disp、wu、wuu、eqforce_origin、eqforce 欄位的 NodeTable）。
+
+    例外:
+        ValueError: 群組的第一振態分配力總和為 0，無法調整至比例下限。
+    """
+    dict_eqforce = {}
+    for i, gp in enumerate(group):
+        data = basis[gp]
+        factor = eqfactor[i]
+        all_mass = data['TotalMass']
+        baseshear = all_mass * G * factor
+        baseshear_vpa = baseshear * vpa
+
+        # 計算節點地震力
+        # [sum(wu)/sum(wuu)]*wu*(V/W) = (beta/zeta)*wu*eqfactor
+        eqf_temp = data['unit_force'] * factor
+
+        sumeqf = abs(float(eqf_temp.sum()))
+        if sumeqf >= baseshear_vpa:
+            eqf = eqf_temp
+        elif sumeqf == 0:
+            raise ValueError(zero_force_message(gp, vpa))
+        else:
+            print("[警告]：第一振態分佈力總和未達總基底剪力{}%！".format(vpa*100))
+            eqf = eqf_temp * (baseshear_vpa / sumeqf)
+
+        table = data['nodes']
+        common_row = data['common_row']
+        dict_eqforce[gp] = {}
+        dict_eqforce[gp]['beta'] = data['beta']
+        dict_eqforce[gp]['zeta'] = data['zeta']
+        dict_eqforce[gp]['eqfactor'] = factor
+        dict_eqforce[gp]['TotalMass'] = all_mass
+        dict_eqforce[gp]['BaseShear'] = baseshear
+        dict_eqforce[gp]['nodes'] = table.with_columns(
+            eqforce_origin=common_column(table, common_row, eqf_temp),
+            eqforce=common_column(table, common_row, eqf),
+        )
+
+    return dict_eqforce
+
+
+def cal_eqforce_vec(jointdisp, jointmass, group, eqfactor, vpa):
+    """
+    cal_eqforce 的向量化版本，結果與 cal_eqforce 相同。
+
+    參數:
+        jointdisp (dict): get_disp 的回傳值。
+        jointmass (dict): get_mass 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+        eqfactor (list of float): 與 group 順序對應的地震力係數。
+        vpa (float): 分配力總和須達總基底剪力的比例下限。
+
+    回傳:
+        dict: {群組: 結果}，結果含 beta、zeta、eqfactor、TotalMass、BaseShear 及 nodes
+            （NodeTable，列為位移與質量節點的聯集，欄位 mass、disp、wu、wuu、eqforce_origin、eqforce；
+            wu 以後的欄位僅共通節點有值，其餘為 NaN）。
+    """
+    return scale_eqforce(eqforce_basis(jointdisp, jointmass, group), group, eqfactor, vpa)
+
+
+def sweep_eqforce(basis, group, eqfactor, vpa):
+    """
+    一次計算多組地震力係數與比例下限（情境）下各群組的節點地震力，計算方式與 scale_eqforce 相同。
+
+    參數:
+        basis (dict): eqforce_basis 的回傳值。
+        group (list): 群組名稱列表。
+        eqfactor (array_like): 形狀 (情境數, 群組數) 的係數；形狀 (情境數,) 時各群組使用相同係數。
+        vpa (float or array_like): 形狀 (情境數,) 的比例下限，單一數值套用至所有情境。
+
+    回傳:
+        dict:
+            - group (list): 群組名稱。
+            - node_name (list of list): 各群組節點名稱，對應 eqforce 第三軸的前 len 個元素。
+            - eqfactor (ndarray): (情境, 群組) 係數。
+            - v_percent (ndarray): (情境,) 比例下限。
+            - eqforce (ndarray): (情境, 群組, 節點) 節點地震力，超出群組節點數的部分為 0。
+            - BaseShear (ndarray): (情境, 群組) 總基底剪力。
+            - SumForce (ndarray): (情境, 群組) 調整後分配力總和。
+            - ModalRatio (ndarray): (情境, 群組) 第一振態分配力總和與總基底剪力比值。
+            - ScaleRatio (ndarray): (情境, 群組) 比例下限調整倍數，未調整為 1。
+
+    例外:
+        ValueError: 任一情境下群組的第一振態分配力總和為 0，無法調整至比例下限。
+    """
+    num_group = len(group)
+    eqfactor = np.asarray(eqfactor, dtype=np.float64)
+    if eqfactor.ndim == 1:
+        eqfactor = np.repeat(eqfactor[:, None], num_group, axis=1)
+    num_scenario = eqfactor.shape[0]
+    vpa = np.broadcast_to(np.asarray(vpa, dtype=np.float64), (num_scenario,))
+
+    node_name = [basis[gp]['common_name'] for gp in group]
+    max_node = max((len(names) for names in node_name), default=0)
+    unit_force = np.zeros((num_group, max_node))
+    for j, gp in enumerate(group):
+        unit_force[j, :len(node_name[j])] = basis[gp]['unit_force']
+    total_mass = np.array([basis[gp]['TotalMass'] for gp in group])
+
+    baseshear = total_mass[None, :] * G * eqfactor
+    baseshear_vpa = baseshear * vpa[:, None]
+    sumeqf = np.abs(eqfactor * unit_force.sum(axis=1)[None, :])
+    scale = np.ones_like(sumeqf)
+    below = sumeqf < baseshear_vpa
+    zero = below & (sumeqf == 0)
+    if zero.any():
+        scenario, j = np.argwhere(zero)[0]
+        raise ValueError(zero_force_message(group[j], vpa[scenario]))
+    scale[below] = baseshear_vpa[below] / sumeqf[below]
+    eqforce = eqfactor[:, :, None] * unit_force[None, :, :] * scale[:, :, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        modal_ratio = np.where(baseshear != 0, sumeqf / baseshear, np.nan)
+
+    return {
+        'group': list(group),
+        'node_name': node_name,
+        'eqfactor': eqfactor,
+        'v_percent': np.array(vpa),
+        'eqforce': eqforce,
+        'BaseShear': baseshear,
+        'SumForce': np.abs(eqforce.sum(axis=2)),
+        'ModalRatio': modal_ratio,
+        'ScaleRatio': scale,
+    }
+
+
+def directional_response(disp, mass, angle, eqfactor=None, vpa=1.0):
+    """
+    以 UNIT-X、UNIT-Y 位移疊加任意水平方向 θ 的單位加速度反應，一次計算多個角度的週期與地震力。
+
+    θ 方向加速度的位移向量為 cosθ·d_X + sinθ·d_Y，其沿 θ 方向的分量為
+    u_θ = cos²θ·U1_X + cosθ·sinθ·(U2_X + U1_Y) + sin²θ·U2_Y，
+    質量取 m_θ = cos²θ·m_X + sin²θ·m_Y，其餘計算與 cal_period / cal_eqforce 相同。
+
+    參數:
+        disp (dict): 共通節點的位移陣列 'xx'（UNIT-X 之 U1）、'xy'（UNIT-X 之 U2）、
+            'yx'（UNIT-Y 之 U1）、'yy'（UNIT-Y 之 U2），形狀皆為 (節點數,)。
+        mass (dict): 共通節點的質量陣列 'x'（U1）、'y'（U2）。
+        angle (array_like): 形狀 (角度數,) 的方向角（度），自 Global X 軸逆時針量測。
+        eqfactor (float or array_like): 單一數值或形狀 (角度數,) 的地震力係數，None 時僅計算週期。
+        vpa (float): 分配力總和須達總基底剪力的比例下限。
+
+    回傳:
+        dict: 形狀 (角度數,) 的 angle、period、beta、zeta、TotalMass，
+            提供 eqfactor 時另含 BaseShear、SumForce、ScaleRatio 及形狀 (角度數, 節點數) 的 eqforce（沿 θ 方向）。
+
+    例外:
+        ValueError: eqfactor 形狀與角度數量不符，或某角度的第一振態分配力總和為 0 而無法調整至比例下限。
+    """
+    angle = np.atleast_1d(np.asarray(angle, dtype=np.float64))
+    theta = np.radians(angle)[:, None]
+    c = np.cos(theta)
+    s = np.sin(theta)
+
+    u = c * c * disp['xx'][None, :] + c * s * (disp['xy'] + disp['yx'])[None, :] + s * s * disp['yy'][None, :]
+    m = c * c * mass['x'][None, :] + s * s * mass['y'][None, :]
+    wu = m * u
+    wuu = wu * u
+    beta = np.abs(wu.sum(axis=1))
+    zeta = wuu.sum(axis=1)
+    total_mass = m.sum(axis=1)
+    # 無位移的角度週期為 NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = 2 * math.pi * np.sqrt(zeta / (G * beta))
+
+    result = {
+        'angle': angle,
+        'period': period,
+        'beta': beta,
+        'zeta': zeta,
+        'TotalMass': total_mass,
+    }
+    if eqfactor is None:
+        return result
+
+    factor = np.asarray(eqfactor, dtype=np.float64)
+    if factor.ndim > 0 and factor.shape != angle.shape:
+        raise ValueError(f"地震力係數形狀 {factor.shape} 與角度數量 ({len(angle)}) 不一致")
+    factor = np.broadcast_to(factor, angle.shape)
+    baseshear = total_mass * G * factor
+    baseshear_vpa = baseshear * vpa
+    # 無位移的角度無法分配，分配力為 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(zeta != 0, beta / zeta, 0.0)
+    eqf_temp = (ratio * G * factor)[:, None] * wu
+    sumeqf = np.abs(eqf_temp.sum(axis=1))
+    scale = np.ones_like(sumeqf)
+    below = sumeqf < baseshear_vpa
+    zero = below & (sumeqf == 0)
+    if zero.any():
+        raise ValueError(f"方向 {angle[zero][0]:g}° 的第一振態分配力總和為 0，無法調整至總基底剪力{vpa*100}%")
+    scale[below] = baseshear_vpa[below] / sumeqf[below]
+
+    result['eqfactor'] = np.array(factor)
+    result['BaseShear'] = baseshear
+    result['ScaleRatio'] = scale
+    result['eqforce'] = eqf_temp * scale[:, None]
+    result['SumForce'] = np.abs(result['eqforce'].sum(axis=1))
+    return result
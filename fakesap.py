@@ -0,0 +1,635 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import threading
+
+# 與 sapcore 一致的重力加速度，形狀資料為 1g 加速度下的位移
+G = 9.81
+# 與 sapcore.JOINT_FORCE_TABLE / JOINT_FORCE_FIELDS 一致
+JOINT_FORCE_TABLE = "Joint Loads - Force"
+JOINT_FORCE_FIELDS = ['Joint', 'LoadPat', 'CoordSys', 'F1', 'F2', 'F3', 'M1', 'M2', 'M3']
+# 與 sapcore.ELEMENT_TABLES 一致的物件與元素資料表欄位
+ELEMENT_TABLE_FIELDS = {
+    "Objects And Elements - Joints": ['JointElem', 'JointObject'],
+    "Objects And Elements - Frames": ['FrameElem', 'FrameObject', 'ElemJtI', 'ElemJtJ'],
+    "Objects And Elements - Areas": ['AreaElem', 'AreaObject', 'ElemJt1', 'ElemJt2', 'ElemJt3', 'ElemJt4'],
+}
+ACCEL_DIRS = ('UX', 'UY', 'UZ', 'RX', 'RY', 'RZ')
+
+
+class FakeSapError(Exception):
+    """FakeSapBackend 附加或啟動失敗時拋出的例外，對應 pythoncom.com_error。"""
+    pass
+
+
+class FakeModel(object):
+    """
+    模擬 SAP2000 模型的資料：點物件、群組、組裝質量，以及各方向 1g 加速度下的節點位移形狀。
+
+    參數:
+        joints (list of str): 點物件名稱。
+        groups (dict): {群組名稱: [(物件型態, 物件名稱)]}，物件型態 1=Point、2=Frame。
+        mass (dict): {點元素名稱: [U1, U2, U3, R1, R2, R3]}，含自動分割產生的節點。
+        shape (dict): {'UX'/'UY'/'UZ': {點元素名稱: [U1, U2, U3, R1, R2, R3]}}。
+        frames (dict): {框架物件名稱: [I 端點物件, J 端點物件]}。
+        mesh (dict): {框架物件名稱: [自動分割產生的點元素名稱]}，依 I 端至 J 端排列。
+    """
+    def __init__(self, joints, groups, mass, shape, frames=None, mesh=None):
+        self.joints = list(joints)
+        self.groups = dict(groups)
+        self.mass = mass
+        self.shape = shape
+        self.frames = dict(frames or {})
+        self.mesh = dict(mesh or {})
+        # SAP2000 內建 ALL 群組包含所有物件
+        if 'ALL' not in self.groups:
+            frames = [item for members in groups.values() for item in members if item[0] != 1]
+            self.groups['ALL'] = [(1, j) for j in self.joints] + list(dict.fromkeys(frames))
+
+    def elements(self, items):
+        """
+        物件對應的點元素，與 SAP2000 以群組或選取讀取結果時相同：
+        點物件為同名點元素，框架物件為兩端點及自動分割產生的節點。
+
+        參數:
+            items (iterable): [(物件型態, 物件名稱)]。
+
+        回傳:
+            list: 不重複的點元素名稱。
+        """
+        names = {}
+        for objtype, name in items:
+            if objtype == 1:
+                names[name] = None
+            elif objtype == 2 and name in self.frames:
+                joint_i, joint_j = self.frames[name]
+                names.update(dict.fromkeys([joint_i] + self.mesh.get(name, []) + [joint_j]))
+        return list(names)
+
+    @classmethod
+    def synthetic(cls, num_groups=20, joints_per_group=100, seed=0, mesh_points=0):
+        """
+        產生高架橋墩的合成模型：每個群組為一座橋墩，節點由墩底至墩頂排列，墩頂含上構質量。
+
+        參數:
+            num_groups (int): 群組（橋墩）數量。
+            joints_per_group (int): 每個群組的節點數量。
+            seed (int): 亂數種子。
+            mesh_points (int): 每根框架自動分割產生的內部節點數量，節點名稱為 '~1'、'~2'...。
+        """
+        rng = random.Random(seed)
+        joints = []
+        groups = {}
+        mass = {}
+        shape = {'UX': {}, 'UY': {}, 'UZ': {}}
+        frames = {}
+        mesh = {}
+        for g in range(num_groups):
+            gp = f"P{g + 1:03d}"
+            stiff_x = rng.uniform(0.5, 2.0)
+            stiff_y = rng.uniform(0.5, 2.0)
+            members = []
+            for k in range(joints_per_group):
+                name = str(len(joints) + 1)
+                joints.append(name)
+                members.append((1, name))
+                if k > 0:
+                    members.append((2, f"F{name}"))
+                    frames[f"F{name}"] = [joints[-2], name]
+                h = k / max(joints_per_group - 1, 1)
+                # 墩底固定無質量，墩頂集中上構質量
+                m = 0.0 if k == 0 else rng.uniform(1.0, 3.0)
+                if k == joints_per_group - 1:
+                    m += rng.uniform(200.0, 400.0)
+                mass[name] = [m, m, m, 0.0, 0.0, 0.0]
+                ux = 0.01 * h ** 1.5 / stiff_x
+                uy = 0.01 * h ** 1.5 / stiff_y
+                uz = 0.0005 * h
+                shape['UX'][name] = [ux, 0.02 * ux, 0.0, 0.0, 0.0, 0.0]
+                shape['UY'][name] = [0.02 * uy, uy, 0.0, 0.0, 0.0, 0.0]
+                shape['UZ'][name] = [0.0, 0.0, uz, 0.0, 0.0, 0.0]
+            groups[gp] = members
+
+        # 自動分割節點的質量固定、位移於框架兩端間線性內插，不影響上方亂數序列
+        count = 0
+        for frame, (joint_i, joint_j) in frames.items():
+            mesh[frame] = []
+            for i in range(mesh_points):
+                count += 1
+                name = f"~{count}"
+                t = (i + 1) / (mesh_points + 1)
+                mass[name] = [1.0, 1.0, 1.0, 0.0, 0.0, 0.0]
+                for direction, values in shape.items():
+                    values[name] = [(1 - t) * a + t * b for a, b in zip(values[joint_i], values[joint_j])]
+                mesh[frame].append(name)
+        return cls(joints, groups, mass, shape, frames, mesh)
+
+    @classmethod
+    def from_json(cls, path):
+        """由 JSON 檔讀取模型資料（例如由實際模型擷取的資料）。"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        groups = {gp: [tuple(item) for item in members] for gp, members in data['groups'].items()}
+        return cls(data['joints'], groups, data['mass'], data['shape'], data.get('frames'), data.get('mesh'))
+
+    def to_json(self, path):
+        """將模型資料寫為 JSON 檔。"""
+        data = {'joints': self.joints, 'groups': self.groups, 'mass': self.mass, 'shape': self.shape,
+                'frames': self.frames, 'mesh': self.mesh}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+
+class _Proxy(object):
+    """
+    包裝模擬物件，每次方法呼叫先交由後端計數並加入延遲。
+    呼叫名稱為完整屬性路徑，例如 'SapModel.Results.JointDispl'。
+    """
+    def __init__(self, target, backend, path):
+        self._target = target
+        self._backend = backend
+        self._path = path
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        full_name = f"{self._path}.{name}" if self._path else name
+        if callable(attr):
+            def call(*args):
+                self._backend.on_call(full_name)
+                return attr(*args)
+            return call
+        return _Proxy(attr, self._backend, full_name)
+
+
+class _FakeFile(object):
+    def __init__(self, model):
+        self._m = model
+
+    def OpenFile(self, FileName):
+        self._m.reset()
+        self._m.filename = FileName
+        return 0
+
+    def Save(self, FileName=''):
+        if FileName:
+            self._m.filename = FileName
+        self._m.save_file()
+        return 0 if self._m.filename else 1
+
+
+class _FakeSelectObj(object):
+    def __init__(self, model):
+        self._m = model
+
+    def ClearSelection(self):
+        self._m.selection = {}
+        return 0
+
+    def Group(self, GroupName, DeSelect=False):
+        for item in self._m.data.groups.get(GroupName, []):
+            if DeSelect:
+                self._m.selection.pop(item, None)
+            else:
+                self._m.selection[item] = True
+        return 0
+
+    def GetSelected(self):
+        items = list(self._m.selection)
+        return (0, len(items), tuple(t for t, _ in items), tuple(n for _, n in items))
+
+
+class _FakeGroupDef(object):
+    def __init__(self, model):
+        self._m = model
+
+    def GetNameList(self):
+        names = tuple(self._m.data.groups)
+        return (0, len(names), names)
+
+    def GetAssignments(self, Name):
+        items = self._m.data.groups.get(Name)
+        if items is None:
+            return (1, 0, (), ())
+        return (0, len(items), tuple(t for t, _ in items), tuple(n for _, n in items))
+
+
+class _FakeStaticLinear(object):
+    def __init__(self, model):
+        self._m = model
+
+    def SetCase(self, Name):
+        self._m.modify()
+        self._m.cases.setdefault(Name, [])
+        return 0
+
+    def SetLoads(self, Name, NumberLoads, LoadType, LoadName, SF):
+        self._m.modify()
+        self._m.cases[Name] = [(LoadType[i], LoadName[i], SF[i]) for i in range(NumberLoads)]
+        return 0
+
+    def GetLoads(self, Name):
+        loads = self._m.cases.get(Name)
+        if loads is None:
+            return (1, 0, (), (), ())
+        return (0, len(loads), tuple(l[0] for l in loads), tuple(l[1] for l in loads), tuple(l[2] for l in loads))
+
+
+class _FakeLoadCases(object):
+    def __init__(self, model):
+        self._m = model
+        self.StaticLinear = _FakeStaticLinear(model)
+
+    def GetNameList(self):
+        names = tuple(self._m.cases)
+        return (0, len(names), names)
+
+
+class _FakeLoadPatterns(object):
+    def __init__(self, model):
+        self._m = model
+
+    def Add(self, Name, MyType, SelfWTMultiplier=0, AddLoadCase=True):
+        self._m.modify()
+        self._m.patterns[Name] = MyType
+        if AddLoadCase:
+            self._m.cases[Name] = [('Load', Name, 1)]
+        return 0
+
+
+class _FakePointObj(object):
+    def __init__(self, model):
+        self._m = model
+
+    def _points(self, Name, ItemType):
+        if ItemType == 0:
+            return [Name]
+        if ItemType == 1:
+            return [n for t, n in self._m.data.groups.get(Name, []) if t == 1]
+        return [n for t, n in self._m.selection if t == 1]
+
+    def SetLoadForce(self, Name, LoadPat, Value, Replace=False, CSys='Global', ItemType=0):
+        if self._m.locked:
+            return 1
+        for point in self._points(Name, ItemType):
+            key = (LoadPat, point)
+            current = self._m.loads.get(key) if not Replace else None
+            value = [float(v) for v in Value]
+            if current is not None:
+                value = [a + b for a, b in zip(current, value)]
+            self._m.loads[key] = value
+        return 0
+
+    def DeleteLoadForce(self, Name, LoadPat, ItemType=0):
+        if self._m.locked:
+            return 1
+        for point in self._points(Name, ItemType):
+            self._m.loads.pop((LoadPat, point), None)
+        return 0
+
+
+class _FakeAnalyze(object):
+    def __init__(self, model):
+        self._m = model
+
+    def SetRunCaseFlag(self, Name, Run, All=False):
+        if All:
+            for case in self._m.cases:
+                self._m.run_flags[case] = Run
+        else:
+            self._m.run_flags[Name] = Run
+        return 0
+
+    def RunAnalysis(self):
+        if not self._m.filename:
+            return 1
+        # SAP2000 分析前先存檔
+        self._m.save_file()
+        self._m.results = {}
+        for case, loads in self._m.cases.items():
+            if not self._m.run_flags.get(case, True):
+                continue
+            self._m.results[case] = self._m.solve(loads)
+        self._m.locked = True
+        return 0
+
+    def GetCaseStatus(self):
+        names = tuple(self._m.cases)
+        status = tuple(4 if name in self._m.results else 1 for name in names)
+        return (0, len(names), names, status)
+
+
+class _FakeResultsSetup(object):
+    def __init__(self, model):
+        self._m = model
+
+    def DeselectAllCasesAndCombosForOutput(self):
+        self._m.output_cases = set()
+        return 0
+
+    def SetCaseSelectedForOutput(self, Name, Selected=True):
+        if Selected:
+            self._m.output_cases.add(Name)
+        else:
+            self._m.output_cases.discard(Name)
+        return 0
+
+
+class _FakeResults(object):
+    def __init__(self, model):
+        self._m = model
+        self.Setup = _FakeResultsSetup(model)
+
+    def _points(self, Name, ItemTypeElm):
+        if ItemTypeElm in (0, 1):
+            return [Name] if Name in self._m.data.mass else []
+        if ItemTypeElm == 2:
+            return self._m.data.elements(self._m.data.groups.get(Name, []))
+        return self._m.data.elements(self._m.selection)
+
+    def JointDispl(self, Name, ItemTypeElm=0):
+        points = self._points(Name, ItemTypeElm)
+        cols = [[] for _ in range(11)]
+        for case in self._m.output_cases:
+            disp = self._m.results.get(case)
+            if disp is None:
+                continue
+            for point in points:
+                values = disp[point]
+                cols[0].append(point)
+                cols[1].append(point)
+                cols[2].append(case)
+                cols[3].append('')
+                cols[4].append(0)
+                for i in range(6):
+                    cols[5 + i].append(values[i])
+        return (0, len(cols[0])) + tuple(tuple(c) for c in cols)
+
+    def AssembledJointMass(self, Name, itemTypeElm):
+        if not self._m.results:
+            return (1, 0, (), (), (), (), (), (), ())
+        points = self._points(Name, itemTypeElm)
+        cols = [tuple(self._m.data.mass[p][i] for p in points) for i in range(6)]
+        return (0, len(points), tuple(points)) + tuple(cols)
+
+
+class _FakeDatabaseTables(object):
+    def __init__(self, model):
+        self._m = model
+
+    def GetTableForEditingArray(self, TableKey, GroupName, TableVersion=0, FieldsKeysIncluded=None, NumberRecords=0, TableData=None):
+        if TableKey != JOINT_FORCE_TABLE:
+            return (1, 0, (), 0, ())
+        data = []
+        for (pattern, point), value in self._m.loads.items():
+            data.extend([point, pattern, 'GLOBAL'] + [repr(v) for v in value])
+        return (0, 1, tuple(JOINT_FORCE_FIELDS), len(self._m.loads), tuple(data))
+
+    def GetTableForDisplayArray(self, TableKey, FieldKeyList, GroupName, TableVersion=0, FieldsKeysIncluded=None, NumberRecords=0, TableData=None):
+        # 物件與元素資料表屬於分析模型，須於分析後讀取
+        fields = ELEMENT_TABLE_FIELDS.get(TableKey)
+        if fields is None or not self._m.results:
+            return (1, 0, (), 0, ())
+        data = self._m.data
+        records = []
+        if TableKey.endswith('Joints'):
+            records = [[name, name] for name in data.joints]
+            records += [[name, ''] for names in data.mesh.values() for name in names]
+        elif TableKey.endswith('Frames'):
+            for frame, (joint_i, joint_j) in data.frames.items():
+                points = [joint_i] + data.mesh.get(frame, []) + [joint_j]
+                for i in range(len(points) - 1):
+                    records.append([f"{frame}-{i + 1}", frame, points[i], points[i + 1]])
+        return (0, 1, tuple(fields), len(records), tuple(v for record in records for v in record))
+
+    def SetTableForEditingArray(self, TableKey, TableVersion, FieldsKeysIncluded, NumberRecords, TableData):
+        if TableKey != JOINT_FORCE_TABLE or self._m.locked:
+            return (1, TableVersion)
+        self._m.pending_table = (list(FieldsKeysIncluded), NumberRecords, list(TableData))
+        return (0, TableVersion)
+
+    def ApplyEditedTables(self, FillImportLog=True, *args):
+        if self._m.pending_table is None:
+            return (0, 0, 0, 0, 0, '')
+        fields, number, data = self._m.pending_table
+        self._m.pending_table = None
+        num_fields = len(fields)
+        loads = {}
+        for i in range(number):
+            record = dict(zip(fields, data[i * num_fields:(i + 1) * num_fields]))
+            loads[(record['LoadPat'], record['Joint'])] = [float(record[k] or 0) for k in JOINT_FORCE_FIELDS[3:]]
+        self._m.loads = loads
+        return (0, 0, 0, 0, 0, '')
+
+
+class FakeSapModel(object):
+    """
+    模擬 SapObject.SapModel，提供 sapcore.Sap2000 使用到的 OAPI 呼叫，回傳值格式與 win32com 相同。
+    """
+    def __init__(self, data, tables=True):
+        self.data = data
+        self.reset()
+        self.File = _FakeFile(self)
+        self.SelectObj = _FakeSelectObj(self)
+        self.GroupDef = _FakeGroupDef(self)
+        self.LoadCases = _FakeLoadCases(self)
+        self.LoadPatterns = _FakeLoadPatterns(self)
+        self.PointObj = _FakePointObj(self)
+        self.Analyze = _FakeAnalyze(self)
+        self.Results = _FakeResults(self)
+        if tables:
+            self.DatabaseTables = _FakeDatabaseTables(self)
+
+    def reset(self):
+        self.filename = ''
+        self.units = 12
+        self.locked = False
+        self.cases = {'DEAD': [('Load', 'DEAD', 1)]}
+        self.patterns = {'DEAD': 1}
+        self.run_flags = {}
+        self.results = {}
+        self.output_cases = set()
+        self.selection = {}
+        self.loads = {}
+        self.pending_table = None
+
+    def save_file(self):
+        """
+        將載重案例、載重模式與節點載重寫入模型檔案，使存檔後的檔案內容與 SAP2000 相同地隨模型改變。
+        檔案不存在時（例如回放錄製的工作階段）不寫入。
+        """
+        if not self.filename or not os.path.isfile(self.filename):
+            return
+        state = {
+            'cases': self.cases,
+            'patterns': self.patterns,
+            'loads': {f"{pattern}|{point}": value for (pattern, point), value in self.loads.items()},
+        }
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump(state, f, sort_keys=True)
+
+    def modify(self):
+        """修改模型前解鎖並刪除分析結果，與 SAP2000 行為相同。"""
+        self.locked = False
+        self.results = {}
+
+    def solve(self, loads):
+        """依線性疊加計算載重案例的節點位移，僅加速度載重產生位移。"""
+        disp = {p: [0.0] * 6 for p in self.data.mass}
+        for load_type, name, sf in loads:
+            if load_type != 'Accel' or name not in self.data.shape:
+                continue
+            scale = sf / G
+            for point, values in self.data.shape[name].items():
+                row = disp[point]
+                for i in range(6):
+                    row[i] += values[i] * scale
+        return disp
+
+    def InitializeNewModel(self, Units=12):
+        self.reset()
+        self.units = Units
+        return 0
+
+    def SetPresentUnits(self, Units):
+        self.units = Units
+        return 0
+
+    def GetDatabaseUnits(self):
+        return 12
+
+    def GetModelFilename(self, IncludePath=True):
+        return self.filename if IncludePath else os.path.basename(self.filename)
+
+    def GetPresentCoordSystem(self):
+        return 'GLOBAL'
+
+    def GetModelIsLocked(self):
+        return self.locked
+
+    def SetModelIsLocked(self, Locked):
+        if not Locked:
+            self.results = {}
+        self.locked = Locked
+        return 0
+
+
+class FakeSapObject(object):
+    """模擬 SAP2000.SapObject。"""
+    def __init__(self, backend):
+        self._backend = backend
+        self.SapModel = FakeSapModel(backend.model, backend.tables)
+
+    def ApplicationStart(self, Units=12, Visible=True, FileName=''):
+        return 0
+
+    def ApplicationExit(self, FileSave=True):
+        if FileSave:
+            self.SapModel.save_file()
+        self._backend.exit_instance()
+        return 0
+
+
+class FakeSapBackend(object):
+    """
+    純 Python 的 SAP2000 後端，可於無 SAP2000 的 Linux 環境執行並量測整個流程。
+
+    參數:
+        model (FakeModel): 模擬模型資料，預設為 FakeModel.synthetic()。
+        latency (float): 每次 OAPI 呼叫的延遲秒數，模擬 COM 往返時間。
+        call_latency (dict): 個別呼叫的延遲秒數，例如 {'SapModel.Analyze.RunAnalysis': 5.0}。
+        tables (bool): 是否提供 DatabaseTables 介面，False 時模擬舊版 SAP2000。
+    """
+    def __init__(self, model=None, latency=0.0, call_latency=None, tables=True):
+        self.model = model if model is not None else FakeModel.synthetic()
+        self.latency = latency
+        self.call_latency = dict(call_latency or {})
+        self.tables = tables
+        self.error = FakeSapError
+        self.call_counts = {}
+        # terminate 收到的 PID，可用於確認僅結束自己啟動的實例
+        self.terminated = []
+        self._instance = None
+        self._next_pid = 10000
+        self._lock = threading.Lock()
+
+    def init_thread(self):
+        pass
+
+    def attach(self):
+        if self._instance is None:
+            raise FakeSapError("沒有正在運行的模擬 SAP2000 實例")
+        return self._instance
+
+    def start(self):
+        self._instance = _Proxy(FakeSapObject(self), self, '')
+        self._next_pid += 1
+        return self._instance, self._next_pid
+
+    def exit_instance(self):
+        self._instance = None
+
+    def terminate(self, pid, timeout=0):
+        self.terminated.append(pid)
+        self._instance = None
+
+    def on_call(self, name):
+        """記錄呼叫次數並加入延遲。"""
+        with self._lock:
+            self.call_counts[name] = self.call_counts.get(name, 0) + 1
+        delay = self.call_latency.get(name, self.latency)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_benchmark(num_groups, joints_per_group, latency, solver_time):
+    """
+    以模擬後端執行週期與地震力流程，回傳各流程耗時與 OAPI 呼叫次數。
+    """
+    import sapcore
+
+    backend = FakeSapBackend(
+        FakeModel.synthetic(num_groups, joints_per_group),
+        latency=latency,
+        call_latency={'SapModel.Analyze.RunAnalysis': solver_time},
+    )
+    sapcore.set_default_backend(backend)
+    groups = [gp for gp in backend.model.groups if gp != 'ALL']
+    factors = [0.3] * len(groups)
+
+    timing = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_path = os.path.join(work_dir, 'fake.sdb')
+        open(model_path, 'wb').close()
+
+        start = time.perf_counter()
+        sapcore.run_analysis_period(model_path, groups, groups, groups[:2], use_cache=False)
+        timing['period'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sapcore.run_analysis_eqforce(model_path, groups, groups, groups[:2], factors, factors, [0.2, 0.2], 0.9, use_cache=False)
+        timing['eqforce'] = time.perf_counter() - start
+    sapcore.set_default_backend(None)
+
+    return timing, backend.call_counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="以模擬 SAP2000 後端量測 PyreEQ 流程耗時")
+    parser.add_argument('--groups', type=int, default=100, help="群組（橋墩）數量")
+    parser.add_argument('--joints', type=int, default=200, help="每個群組的節點數量")
+    parser.add_argument('--latency', type=float, default=0.0, help="每次 OAPI 呼叫延遲秒數")
+    parser.add_argument('--solver-time', type=float, default=0.0, help="RunAnalysis 延遲秒數")
+    args = parser.parse_args()
+
+    timing, counts = run_benchmark(args.groups, args.joints, args.latency, args.solver_time)
+    sys.stdout.write("\n--- Benchmark ---\n")
+    for stage, seconds in timing.items():
+        sys.stdout.write(f"{stage:<10} {seconds:10.3f} s\n")
+    sys.stdout.write("\n--- OAPI calls ---\n")
+    for name, count in sorted(counts.items(), key=lambda kv: -kv[1]):
+        sys.stdout.write(f"{name:<55} {count:8d}\n")
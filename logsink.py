@@ -0,0 +1,130 @@
+import os
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+
+# GUI 由緩衝區取出訊息的間隔（毫秒）
+FLUSH_INTERVAL_MS = 100
+# 尚未顯示的訊息上限（字元數），超過時捨棄最舊的訊息，日誌檔仍完整寫入
+MAX_PENDING_CHARS = 200000
+# 日誌檔輪替大小與保留份數
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+class LogSink(object):
+    """
+    取代 sys.stdout 的執行緒安全輸出緩衝區。
+
+    write 僅將文字加入緩衝區即返回，可由任何執行緒呼叫；
+    GUI 以固定間隔呼叫 drain 一次取出累積的文字顯示，日誌檔與原始終端則由背景執行緒批次寫入，
+    網路磁碟等較慢的寫入不會阻塞 GUI。
+
+    參數:
+        log_path (str): 日誌檔路徑，None 表示不寫檔；檔案超過 max_bytes 時輪替為 .1、.2...。
+        stream: 同步輸出的原始串流（例如 sys.__stdout__），None 表示不輸出。
+        max_pending (int): 尚未取出的文字上限（字元數）。
+        max_bytes (int): 日誌檔輪替大小。
+        backup_count (int): 日誌檔保留份數。
+    """
+    def __init__(self, log_path=None, stream=None, max_pending=MAX_PENDING_CHARS,
+                 max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_chars = 0
+        self._dropped = 0
+        self._unwritten = []
+        # 通知背景執行緒有待寫入的文字或需結束
+        self._wakeup = threading.Condition(self._lock)
+        self._closing = False
+        self._writer = None
+        self.max_pending = max_pending
+        self.stream = stream
+        self._handler = None
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            self._handler = RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            # 寫入的文字已含換行
+            self._handler.terminator = ''
+        if self._handler is not None or self.stream is not None:
+            self._writer = threading.Thread(target=self._write_loop, name='LogSinkWriter', daemon=True)
+            self._writer.start()
+
+    def write(self, text):
+        """加入一段輸出文字，不等待顯示或寫檔。"""
+        text = str(text)
+        if not text:
+            return
+        with self._lock:
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            if self._writer is not None:
+                self._unwritten.append(text)
+                self._wakeup.notify()
+            # 超過上限時捨棄最舊的訊息，至少保留最新一段
+            while self._pending_chars > self.max_pending and len(self._pending) > 1:
+                dropped = self._pending.pop(0)
+                self._pending_chars -= len(dropped)
+                self._dropped += len(dropped)
+
+    def flush(self):
+        # stdout 預設有 write 及 flush，實際輸出由背景執行緒批次處理
+        pass
+
+    def drain(self):
+        """
+        取出目前累積的文字供 GUI 顯示，不寫入檔案或終端。
+
+        回傳:
+            str: 自上次 drain 以來的輸出，無新輸出時為空字串。
+        """
+        with self._lock:
+            pending = self._pending
+            dropped = self._dropped
+            self._pending = []
+            self._pending_chars = 0
+            self._dropped = 0
+
+        text = ''.join(pending)
+        if dropped:
+            text = f"[警告]：輸出過多，已略過 {dropped} 個字元，完整內容請見日誌檔。\n" + text
+        return text
+
+    def _write_loop(self):
+        """背景執行緒：等待新文字，批次寫入日誌檔與原始串流，直到 close。"""
+        while True:
+            with self._lock:
+                while not self._unwritten and not self._closing:
+                    self._wakeup.wait()
+                unwritten = self._unwritten
+                self._unwritten = []
+                closing = self._closing
+            if unwritten:
+                self._emit(''.join(unwritten))
+            if closing and not unwritten:
+                return
+
+    def _emit(self, chunk):
+        if self._handler is not None:
+            self._handler.emit(logging.makeLogRecord({'msg': chunk}))
+        if self.stream is not None:
+            try:
+                self.stream.write(chunk)
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        """寫出剩餘的文字並關閉日誌檔，回傳尚未顯示的文字。"""
+        if self._writer is not None:
+            with self._lock:
+                self._closing = True
+                self._wakeup.notify()
+            self._writer.join()
+            self._writer = None
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+        return self.drain()
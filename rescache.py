@@ -0,0 +1,229 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+from contextlib import contextmanager
+
+# 快取資料夾建立於模型檔案同一目錄下
+CACHE_DIRNAME = '.pyreeq_cache'
+INDEX_FILENAME = 'index.json'
+# 跨程序鎖定索引讀寫的鎖定檔
+LOCK_FILENAME = 'index.lock'
+# 快取容量上限，超過時依最久未使用（LRU）順序刪除
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 40
+# 群組列表快取的格式版本，格式變更時遞增使舊快取失效
+GROUP_CACHE_VERSION = 1
+
+# 檔案雜湊值記憶 {(絕對路徑, mtime_ns, 大小): 雜湊}，修改時間與大小未變時不重新讀檔
+_hash_memo = {}
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    跨程序的獨占檔案鎖，Windows 以 msvcrt、其他平台以 fcntl 實作，阻塞直到取得為止。
+
+    參數:
+        lock_path (str): 鎖定檔路徑，不存在時建立。
+    """
+    with open(lock_path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 重試約 10 秒後仍未取得時拋出，繼續等待
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    以 SHA-256 計算檔案內容雜湊值。
+    同一程序內檔案修改時間與大小未變時，直接回傳先前的結果。
+
+    參數:
+        path (str): 檔案完整路徑。
+        chunk_size (int): 每次讀取的位元組數。
+
+    回傳:
+        str: 十六進位雜湊字串。
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    digest = _hash_memo.get(memo_key)
+    if digest is not None:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _hash_memo[memo_key] = digest
+    return digest
+
+
+def make_key(model_path, units, unit_cases, groups, fetch_mode='group'):
+    """
+    組合快取鍵值：模型內容雜湊、單位、單位載重案例定義、群組列表與結果讀取模式。
+    鍵值不含檔案路徑，因此同一模型複製到其他路徑或工作站仍可命中。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        units (int): SAP2000 單位代碼。
+        unit_cases (dict): 單位載重案例定義，例如 {'UNIT-X': ['Accel', 'UX', 9.81]}。
+        groups (dict): 各方向群組列表，例如 {'X': [...], 'Y': [...], 'Z': [...]}。
+        fetch_mode (str): sapcore.RESULTS_FETCH_MODE，不同模式的群組節點可能不同。
+
+    回傳:
+        str: 快取鍵值。
+    """
+    payload = {
+        'model': file_hash(model_path),
+        'units': units,
+        'unit_cases': unit_cases,
+        'groups': groups,
+        'fetch_mode': fetch_mode,
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def make_group_key(model_path):
+    """
+    群組列表與群組成員快取的鍵值，僅由模型內容雜湊決定。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+
+    回傳:
+        str: 快取鍵值。
+    """
+    text = json.dumps({'model': file_hash(model_path), 'groups': GROUP_CACHE_VERSION}, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultsCache(object):
+    """
+    模型旁的節點位移與組裝質量快取。
+    每筆資料以 gzip 壓縮的 JSON 儲存，index.json 記錄大小與最後使用時間，
+    儲存後依容量與筆數上限以 LRU 順序淘汰舊資料。
+    """
+    def __init__(self, model_path, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(model_path)), CACHE_DIRNAME)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def load(self, key):
+        """
+        讀取快取資料，並更新其最後使用時間。
+
+        回傳:
+            dict: 快取資料，未命中或檔案損毀時回傳 None。
+        """
+        if not os.path.isdir(self.cache_dir):
+            return None
+
+        with self._locked():
+            index = self._read_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+
+            path = os.path.join(self.cache_dir, entry['file'])
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                index.pop(key, None)
+                self._write_index(index)
+                return None
+
+            entry['last_access'] = time.time()
+            self._write_index(index)
+        return data
+
+    def save(self, key, data, label=''):
+        """
+        寫入快取資料並執行淘汰。
+
+        參數:
+            key (str): make_key 產生的鍵值。
+            data (dict): 可序列化為 JSON 的資料。
+            label (str): 記錄於索引中的說明文字（例如模型檔名）。
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        filename = f"{key}.json.gz"
+        path = os.path.join(self.cache_dir, filename)
+        # 暫存檔名含程序 ID，多個工作程序同時寫入同一鍵值時不互相覆寫
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+        # 索引的讀取、修改、寫入與淘汰須在同一鎖定內完成，避免遺失其他程序新增的項目
+        with self._locked():
+            os.replace(tmp_path, path)
+            index = self._read_index()
+            index[key] = {
+                'file': filename,
+                'size': os.path.getsize(path),
+                'last_access': time.time(),
+                'label': label,
+            }
+            self._evict(index, keep=key)
+            self._write_index(index)
+
+    def _locked(self):
+        """鎖定快取索引，供多個程序或執行緒同時使用同一快取資料夾。"""
+        return file_lock(os.path.join(self.cache_dir, LOCK_FILENAME))
+
+    def _evict(self, index, keep=None):
+        """依最後使用時間由舊到新刪除，直到符合容量與筆數上限。"""
+        order = sorted(index, key=lambda k: index[k]['last_access'])
+        total = sum(entry['size'] for entry in index.values())
+        for key in order:
+            if total <= self.max_bytes and len(index) <= self.max_entries:
+                break
+            if key == keep:
+                continue
+            entry = index.pop(key)
+            total -= entry['size']
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except OSError:
+                pass
+
+    # 以下方法須於 _locked() 內呼叫
+    def _read_index(self):
+        path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        if not os.path.isdir(self.cache_dir):
+            return
+        path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
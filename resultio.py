@@ -0,0 +1,202 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from eqengine import NodeTable
+from s2kio import S2K_EXTENSIONS, iter_s2k_tables
+
+# SAP2000 匯出的分析結果資料表名稱（大小寫不拘）
+DISPLACEMENT_TABLE = "JOINT DISPLACEMENTS"
+MASS_TABLE = "ASSEMBLED JOINT MASSES"
+# 各方向單位載重案例、位移欄位與質量欄位，對應 collect_joint_results 的 get_disp/get_mass 參數
+AXIS_RESULTS = {
+    'X': ('UNIT-X', 'U1'),
+    'Y': ('UNIT-Y', 'U2'),
+    'Z': ('UNIT-Z', 'U3'),
+}
+RESULT_COLUMNS = ('U1', 'U2', 'U3')
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+ACCESS_EXTENSIONS = ('.mdb', '.accdb')
+TEXT_EXTENSIONS = ('.txt',) + S2K_EXTENSIONS
+
+
+def _read_text_tables(path, encoding=None):
+    """
+    以 s2kio 逐行讀取文字格式的結果檔，只保留需要的欄位並依欄累積。
+
+    回傳:
+        dict: {資料表名稱（大寫）: DataFrame}。
+    """
+    fields = {
+        DISPLACEMENT_TABLE: ('Joint', 'OutputCase') + RESULT_COLUMNS,
+        MASS_TABLE: ('Joint',) + RESULT_COLUMNS,
+    }
+    columns = {table: {field: [] for field in names} for table, names in fields.items()}
+    for table, record in iter_s2k_tables(path, list(fields), encoding):
+        for field, values in columns[table].items():
+            values.append(record.get(field))
+    return {table: pd.DataFrame(data) for table, data in columns.items()}
+
+
+def _read_excel_tables(path):
+    """
+    讀取 SAP2000 匯出的 Excel 結果檔，每個資料表一個工作表，
+    第一列為資料表名稱、第二列為欄位名稱、第三列為單位。
+    """
+    with pd.ExcelFile(path) as book:
+        sheets = {name.strip().upper(): name for name in book.sheet_names}
+        tables = {}
+        for table in (DISPLACEMENT_TABLE, MASS_TABLE):
+            if table in sheets:
+                tables[table] = book.parse(sheets[table], header=1, dtype={'Joint': str, 'OutputCase': str})
+    return tables
+
+
+def _read_access_tables(path):
+    """讀取 SAP2000 匯出的 Access 結果檔，需安裝 pyodbc 及 Microsoft Access 驅動程式。"""
+    try:
+        import pyodbc
+    except ImportError:
+        raise ImportError("讀取 Access 結果檔需要安裝 pyodbc（pip install pyodbc），或改由 SAP2000 匯出為文字或 Excel。")
+
+    conn = pyodbc.connect(f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={os.path.abspath(path)};")
+    try:
+        names = {row.table_name.strip().upper(): row.table_name for row in conn.cursor().tables(tableType='TABLE')}
+        tables = {}
+        for table in (DISPLACEMENT_TABLE, MASS_TABLE):
+            if table in names:
+                tables[table] = pd.read_sql(f"SELECT * FROM [{names[table]}]", conn)
+    finally:
+        conn.close()
+    return tables
+
+
+def _to_node_table(frame):
+    """
+    將結果資料表轉為含 U1、U2、U3 欄位的 NodeTable。
+    無法轉為數值的資料列（例如 Excel 的單位列）略過。
+    """
+    values = {column: pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64)
+              if column in frame else np.full(len(frame), np.nan)
+              for column in RESULT_COLUMNS}
+    valid = frame['Joint'].notna().to_numpy() & ~np.all([np.isnan(v) for v in values.values()], axis=0)
+    names = frame['Joint'].to_numpy()[valid]
+    return NodeTable([str(name) for name in names], **{column: v[valid] for column, v in values.items()})
+
+
+def read_joint_results(path, encoding=None):
+    """
+    讀取 SAP2000 匯出的 "Joint Displacements" 與 "Assembled Joint Masses" 資料表，
+    依副檔名判斷格式：文字（.txt/.s2k/.$2k）、Excel（.xlsx/.xls）或 Access（.mdb/.accdb）。
+
+    參數:
+        path (str): 結果檔路徑。
+        encoding (str): 文字檔編碼，None 表示自動判斷。
+
+    回傳:
+        dict:
+            - disp (dict): {載重案例名稱: 含 U1、U2、U3 欄位的 NodeTable}。
+            - mass (NodeTable): 含 U1、U2、U3 欄位的組裝質量。
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXCEL_EXTENSIONS:
+        tables = _read_excel_tables(path)
+    elif ext in ACCESS_EXTENSIONS:
+        tables = _read_access_tables(path)
+    elif ext in TEXT_EXTENSIONS:
+        tables = _read_text_tables(path, encoding)
+    else:
+        raise ValueError(f"不支援的結果檔格式：{ext}")
+
+    for table in (DISPLACEMENT_TABLE, MASS_TABLE):
+        if table not in tables:
+            raise ValueError(f"結果檔缺少資料表：{table}")
+
+    frame = tables[DISPLACEMENT_TABLE]
+    disp = {}
+    for case, group in frame.groupby(frame['OutputCase'].astype(str), sort=False):
+        table = _to_node_table(group)
+        # Excel 的單位列（OutputCase 為 'Text'）沒有數值，不列為載重案例
+        if len(table):
+            disp[case] = table
+    return {'disp': disp, 'mass': _to_node_table(tables[MASS_TABLE])}
+
+
+def split_by_group(table, column, members, gp_list, data_key):
+    """
+    依群組成員將整體結果拆為 get_disp/get_mass 的格式，成員中沒有結果的節點略過。
+
+    參數:
+        table (NodeTable): read_joint_results 的位移或質量結果表。
+        column (str): 'U1'、'U2' 或 'U3'。
+        members (dict): {群組名稱: [節點名稱]}。
+        gp_list (list): 群組名稱列表。
+        data_key (str): 'node_disp' 或 'node_mass'。
+
+    回傳:
+        dict: {群組名稱: {'node_num', 'node_name', data_key}}。
+    """
+    values = table[column]
+    result = {}
+    for gp in gp_list:
+        names = []
+        rows = []
+        for name in members.get(gp, []):
+            row = table.row(name)
+            if row is not None:
+                names.append(name)
+                rows.append(row)
+        result[gp] = {'node_num': len(names), 'node_name': names, data_key: values[rows].tolist()}
+    return result
+
+
+def unmatched_joints(results, members):
+    """
+    結果檔中不屬於任何群組的節點，例如網格分割自動產生、不是點物件的節點。
+
+    參數:
+        results (dict): read_joint_results 的回傳值。
+        members (dict): {群組名稱: [節點名稱]}。
+
+    回傳:
+        list: 依結果檔順序排列的節點名稱。
+    """
+    grouped = set()
+    for names in members.values():
+        grouped.update(names)
+    unmatched = {}
+    for table in [results['mass']] + list(results['disp'].values()):
+        for name in table.names:
+            if name not in grouped:
+                unmatched[name] = None
+    return list(unmatched)
+
+
+def results_to_joint_data(results, members, groups_x, groups_y, groups_z):
+    """
+    將 read_joint_results 的結果轉為與 sapcore.collect_joint_results 相同的各方向位移與質量。
+    群組成員僅含點物件，結果檔中不屬於任何群組的節點（如網格分割節點）不計入並提出警告。
+
+    參數:
+        results (dict): read_joint_results 的回傳值。
+        members (dict): {群組名稱: [節點名稱]}，例如 sapcore.load_group_info 的 members。
+        groups_x, groups_y, groups_z (list): 各方向群組名稱列表。
+
+    回傳:
+        tuple: (jointdisp, jointmass)，各為 {'X': ..., 'Y': ..., 'Z': ...}。
+    """
+    unmatched = unmatched_joints(results, members)
+    if unmatched:
+        print(f"[警告]：結果檔中有 {len(unmatched)} 個節點不屬於任何群組（例如 {'、'.join(unmatched[:5])}），"
+              "可能為網格分割產生的節點，未計入週期與地震力。")
+
+    jointdisp = {}
+    jointmass = {}
+    for axis, groups in (('X', groups_x), ('Y', groups_y), ('Z', groups_z)):
+        case, column = AXIS_RESULTS[axis]
+        if case not in results['disp']:
+            raise ValueError(f"結果檔缺少載重案例 {case} 的節點位移")
+        jointdisp[axis] = split_by_group(results['disp'][case], column, members, groups, 'node_disp')
+        jointmass[axis] = split_by_group(results['mass'], column, members, groups, 'node_mass')
+    return jointdisp, jointmass
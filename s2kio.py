@@ -0,0 +1,268 @@
+import os
+import re
+import sys
+import datetime
+import locale
+
+import numpy as np
+
+from eqengine import NodeTable
+
+# SAP2000 文字檔（.s2k/.$2k）中使用的單位字串，與 MODEL_UNITS=12 (Ton_m_C) 對應
+S2K_UNITS = "Ton, m, C"
+# 載重模式型態 5=QUAKE 於文字檔中的名稱
+S2K_QUAKE = "QUAKE"
+# SAP2000 文字檔副檔名
+S2K_EXTENSIONS = ('.s2k', '.$2k')
+# 離線讀取所需的資料表名稱（大小寫不拘）
+PROGRAM_CONTROL_TABLE = "PROGRAM CONTROL"
+GROUP_DEFINITIONS_TABLE = "GROUPS 1 - DEFINITIONS"
+GROUP_ASSIGNMENTS_TABLE = "GROUPS 2 - ASSIGNMENTS"
+JOINT_COORDINATES_TABLE = "JOINT COORDINATES"
+# 新舊版本的節點附加質量資料表名稱
+JOINT_ADDED_MASS_TABLES = ("JOINT ADDED MASS ASSIGNMENTS", "JOINT ADDED MASS")
+# 非 UTF-8 資料列的解碼方式，None 表示系統預設編碼（中文 Windows 為 cp950）
+FALLBACK_ENCODING = None
+# 欄位格式 Key=Value，含空白的值以雙引號包覆
+_FIELD_RE = re.compile(r'([^\s=]+)=("[^"]*"|\S*)')
+
+
+def _s2k_value(value):
+    """將欄位值轉為 s2k 格式，含空白的字串以雙引號包覆。"""
+    if isinstance(value, float):
+        return format(value, '.12g')
+    text = str(value)
+    if not text or ' ' in text or '=' in text:
+        return f'"{text}"'
+    return text
+
+
+def _s2k_record(fields):
+    """
+    將一筆記錄組成 s2k 資料列，例如 '   Joint=1   LoadPat=EQL'。
+
+    參數:
+        fields (list): [(欄位名稱, 值)]。
+    """
+    return '   ' + '   '.join(f"{key}={_s2k_value(value)}" for key, value in fields)
+
+
+def write_joint_loads_s2k(output_path, joint_loads, coordsys='GLOBAL', units=S2K_UNITS):
+    """
+    將節點力寫為 SAP2000 文字格式的資料表片段，可於 SAP2000 以匯入方式一次加入模型。
+
+    內容包含載重模式、線性靜力載重案例及 "Joint Loads - Force" 資料表，
+    各載重模式建立同名載重案例並以比例 1 引用，與 run_analysis_eqforce 的設定相同。
+
+    參數:
+        output_path (str): 輸出檔案完整路徑（.s2k 或 .$2k）。
+        joint_loads (dict): {載重模式名稱: [(節點名稱, 六分量載重)]}。
+        coordsys (str): 載重座標系統名稱。
+        units (str): 檔案數值單位。
+    """
+    patterns = list(joint_loads.keys())
+    saved_on = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    with open(output_path, 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write(f"$ PyreEQ seismic joint loads, generated {saved_on}\n\n")
+
+        f.write('TABLE:  "PROGRAM CONTROL"\n')
+        f.write(_s2k_record([('ProgramName', 'SAP2000'), ('CurrUnits', units)]) + '\n\n')
+
+        f.write('TABLE:  "LOAD PATTERN DEFINITIONS"\n')
+        for pattern in patterns:
+            f.write(_s2k_record([('LoadPat', pattern), ('DesignType', S2K_QUAKE), ('SelfWtMult', 0)]) + '\n')
+        f.write('\n')
+
+        f.write('TABLE:  "LOAD CASE DEFINITIONS"\n')
+        for pattern in patterns:
+            f.write(_s2k_record([
+                ('Case', pattern), ('Type', 'LinStatic'), ('InitialCond', 'Zero'),
+                ('DesTypeOpt', 'Prog Det'), ('DesignType', S2K_QUAKE), ('RunCase', 'Yes'),
+            ]) + '\n')
+        f.write('\n')
+
+        f.write('TABLE:  "CASE - STATIC 1 - LOAD ASSIGNMENTS"\n')
+        for pattern in patterns:
+            f.write(_s2k_record([
+                ('Case', pattern), ('LoadType', 'Load pattern'), ('LoadName', pattern), ('LoadSF', 1),
+            ]) + '\n')
+        f.write('\n')
+
+        f.write('TABLE:  "JOINT LOADS - FORCE"\n')
+        for pattern, loads in joint_loads.items():
+            for node, forcedof in loads:
+                f.write(_s2k_record(
+                    [('Joint', node), ('LoadPat', pattern), ('CoordSys', coordsys)]
+                    + [(dof, float(value)) for dof, value in zip(('F1', 'F2', 'F3', 'M1', 'M2', 'M3'), forcedof)]
+                ) + '\n')
+        f.write('\n')
+
+        f.write('END TABLE DATA\n')
+
+
+def parse_s2k_record(line):
+    """
+    解析一筆 s2k 資料列。
+
+    參數:
+        line (str): 例如 '   Joint=1   CoordSys=GLOBAL   XorR=0'。
+
+    回傳:
+        dict: {欄位名稱: 字串值}，雙引號已移除。
+    """
+    if '"' not in line:
+        parts = line.replace('=', ' ').split()
+        # 每個欄位恰好拆為名稱與值兩段時可直接配對，空值等特殊情形改以正規表示式解析
+        if len(parts) == 2 * line.count('='):
+            return dict(zip(parts[::2], parts[1::2]))
+    record = {}
+    for key, value in _FIELD_RE.findall(line):
+        if value.startswith('"'):
+            value = value[1:-1]
+        record[key] = value
+    return record
+
+
+def _decode_line(raw, encoding):
+    """依指定編碼解碼；未指定時先以 UTF-8 解碼，失敗再以 FALLBACK_ENCODING 解碼。"""
+    if encoding is not None:
+        return raw.decode(encoding, errors='replace')
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode(FALLBACK_ENCODING or locale.getpreferredencoding(False), errors='replace')
+
+
+def iter_s2k_tables(path, tables=None, encoding=None):
+    """
+    逐行讀取 SAP2000 文字檔，依序產生指定資料表的記錄，不將整個檔案載入記憶體。
+    非指定資料表的資料列僅檢查是否為新資料表開頭即略過，不解碼也不解析。
+
+    參數:
+        path (str): .s2k/.$2k 檔案路徑。
+        tables (list): 欲讀取的資料表名稱（大小寫不拘），None 表示全部。
+        encoding (str): 檔案編碼，None 表示逐行判斷（UTF-8 或系統預設編碼，例如 cp950）。
+
+    產生:
+        tuple: (資料表名稱（大寫）, parse_s2k_record 的記錄)。
+    """
+    wanted = None if tables is None else {name.upper() for name in tables}
+
+    current = None
+    pending = ''
+    with open(path, 'rb') as f:
+        for raw in f:
+            raw = raw.strip()
+            if raw.startswith(b'TABLE:'):
+                name = _decode_line(raw[6:], encoding).strip().strip('"').upper()
+                current = name if wanted is None or name in wanted else None
+                pending = ''
+                continue
+            if raw.startswith(b'END TABLE DATA'):
+                break
+            if current is None or not raw or raw.startswith(b'$'):
+                continue
+
+            text = _decode_line(raw, encoding)
+            if pending:
+                text = pending + ' ' + text
+                pending = ''
+            # 行尾 ' _' 表示資料列延續至下一行
+            if text.endswith(' _'):
+                pending = text[:-2]
+                continue
+            yield current, parse_s2k_record(text)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def read_s2k_model(path, encoding=None):
+    """
+    單次讀取 SAP2000 文字檔，建立群組成員索引、節點座標與節點附加質量，不需啟動 SAP2000。
+
+    群組成員僅包含節點（ObjectType=Joint），與 sapcore.get_group_members 相同；
+    數值維持檔案的單位（見 units），不另行換算。
+
+    參數:
+        path (str): .s2k/.$2k 檔案路徑。
+        encoding (str): 檔案編碼，None 表示自動判斷。
+
+    回傳:
+        dict:
+            - units (str): PROGRAM CONTROL 的 CurrUnits，例如 'Ton, m, C'，無此資料表時為 None。
+            - groups (list): 群組名稱，依定義順序。
+            - members (dict): {群組名稱: [節點名稱]}。
+            - joints (NodeTable): 節點 Global 座標欄位 x、y、z。
+            - added_mass (NodeTable): 節點附加質量欄位 mass1、mass2、mass3。
+    """
+    tables = [PROGRAM_CONTROL_TABLE, GROUP_DEFINITIONS_TABLE, GROUP_ASSIGNMENTS_TABLE, JOINT_COORDINATES_TABLE]
+    tables += list(JOINT_ADDED_MASS_TABLES)
+    added_mass_tables = set(JOINT_ADDED_MASS_TABLES)
+
+    units = None
+    members = {}
+    joint_name, joint_x, joint_y, joint_z = [], [], [], []
+    mass_name, mass_1, mass_2, mass_3 = [], [], [], []
+
+    for table, record in iter_s2k_tables(path, tables, encoding):
+        if table == GROUP_ASSIGNMENTS_TABLE:
+            joints = members.setdefault(record.get('GroupName', ''), [])
+            if record.get('ObjectType', '').lower() == 'joint':
+                joints.append(sys.intern(record.get('ObjectLabel', '')))
+        elif table == JOINT_COORDINATES_TABLE:
+            joint_name.append(record.get('Joint', ''))
+            if 'GlobalX' in record:
+                xyz = (record.get('GlobalX'), record.get('GlobalY'), record.get('GlobalZ'))
+            elif record.get('CoordSys', 'GLOBAL').upper() == 'GLOBAL' and record.get('CoordType', 'Cartesian') == 'Cartesian':
+                xyz = (record.get('XorR'), record.get('Y'), record.get('Z'))
+            else:
+                # 非 Global 直角座標且未輸出 Global 座標時無法換算
+                xyz = (None, None, None)
+            joint_x.append(_float(xyz[0]))
+            joint_y.append(_float(xyz[1]))
+            joint_z.append(_float(xyz[2]))
+        elif table in added_mass_tables:
+            mass_name.append(record.get('Joint', ''))
+            mass_1.append(_float(record.get('Mass1', 0)))
+            mass_2.append(_float(record.get('Mass2', 0)))
+            mass_3.append(_float(record.get('Mass3', 0)))
+        elif table == GROUP_DEFINITIONS_TABLE:
+            members.setdefault(record.get('GroupName', ''), [])
+        elif table == PROGRAM_CONTROL_TABLE:
+            units = record.get('CurrUnits', units)
+
+    return {
+        'units': units,
+        'groups': list(members),
+        'members': members,
+        'joints': NodeTable(joint_name, x=np.array(joint_x), y=np.array(joint_y), z=np.array(joint_z)),
+        'added_mass': NodeTable(mass_name, mass1=np.array(mass_1), mass2=np.array(mass_2), mass3=np.array(mass_3)),
+    }
+
+
+def find_text_export(model_path):
+    """
+    取得可離線讀取的文字檔：模型本身為 .s2k/.$2k 時回傳本身，
+    否則尋找同路徑、同檔名且不早於模型檔的 .s2k/.$2k 匯出檔。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+
+    回傳:
+        str: 文字檔路徑，找不到時為 None。
+    """
+    root, ext = os.path.splitext(model_path)
+    if ext.lower() in S2K_EXTENSIONS:
+        return model_path
+    model_mtime = os.path.getmtime(model_path)
+    for text_ext in S2K_EXTENSIONS:
+        text_path = root + text_ext
+        if os.path.exists(text_path) and os.path.getmtime(text_path) >= model_mtime:
+            return text_path
+    return None
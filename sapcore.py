@@ -0,0 +1,2616 @@
+import os
+import math
+import gc
+import inspect
+import tempfile
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from eqengine import NodeTable, node_sort_key, cal_period_vec, eqforce_basis, scale_eqforce, sweep_eqforce, directional_response
+from rescache import ResultsCache, make_key, make_group_key
+from s2kio import write_joint_loads_s2k, find_text_export, read_s2k_model
+from resultio import read_joint_results, results_to_joint_data
+from spectrum import check_design, eqfactors_from_periods, vertical_eqfactors
+from sapprofile import instrument_class, profile_run, profile_stage, stage
+
+# SAP2000 內建包含所有物件的群組名稱
+ALL_GROUP = 'ALL'
+# 模型單位代碼，12=Ton_m_C
+MODEL_UNITS = 12
+# 單位加速度載重案例及其加速度方向，加速度值與 eqengine.G 一致
+UNIT_LOAD_CASES = {"UNIT-X": "UX", "UNIT-Y": "UY", "UNIT-Z": "UZ"}
+UNIT_ACCEL = 9.81
+# 地震力載重模式及其施力分量索引（0=F1, 1=F2, 2=F3）
+EQ_LOAD_DOF = {'EQL': 0, 'EQT': 1, 'EQV': 2}
+# 參數化分析各方向的載重模式名稱字首，情境依序命名為 EQL_01、EQL_02...
+SWEEP_PATTERN_PREFIX = {'X': 'EQL', 'Y': 'EQT'}
+# 任意水平方向地震力的載重模式名稱字首，各角度依序命名為 EQA_01、EQA_02...
+DIRECTION_PATTERN_PREFIX = 'EQA'
+# 地震力明細工作表的欄位順序 [(Excel 欄名, NodeTable 欄位)]
+EQFORCE_DETAIL_COLUMNS = [
+    ('Mass', 'mass'), ('Displacement', 'disp'), ('wu', 'wu'), ('wuu', 'wuu'),
+    ('Force_Origin', 'eqforce_origin'), ('Force', 'eqforce'),
+]
+# 節點力互動式資料表名稱及欄位
+JOINT_FORCE_TABLE = "Joint Loads - Force"
+JOINT_FORCE_FIELDS = ['Joint', 'LoadPat', 'CoordSys', 'F1', 'F2', 'F3', 'M1', 'M2', 'M3']
+# 節點結果讀取模式：'group' 逐群組、'all' 全部節點單次讀取、'selection' 已選取節點單次讀取
+# 'all' / 'selection' 依分析模型的物件與元素資料表拆分結果，群組成員含網格自動分割產生的節點，
+# 與逐群組讀取相同；無法讀取資料表時僅含點物件並提出警告
+RESULTS_FETCH_MODE = 'all'
+# 分析模型的物件與元素資料表 {物件型態: (資料表名稱, 物件欄位, [點元素欄位])}，物件型態同 GroupDef.GetAssignments
+ELEMENT_TABLES = {
+    1: ("Objects And Elements - Joints", 'JointObject', ['JointElem']),
+    2: ("Objects And Elements - Frames", 'FrameObject', ['ElemJtI', 'ElemJtJ']),
+    5: ("Objects And Elements - Areas", 'AreaObject', ['ElemJt1', 'ElemJt2', 'ElemJt3', 'ElemJt4']),
+}
+# ApplicationExit 後等待 SAP2000 程序自行結束的秒數，逾時才強制終止
+SHUTDOWN_TIMEOUT = 30
+# 輸出檔名是否加上模型檔名字首（例如 A_01_period_results.xlsx），批次工作程序設為 True，
+# 避免同資料夾的多個模型互相覆寫
+OUTPUT_PREFIX_MODEL = False
+# 開啟模型時是否附加到正在運行的 SAP2000；預設各自啟動專屬實例，附加的實例結束時不關閉
+ATTACH_EXISTING = False
+
+def model_output_path(model_path, filename):
+    """
+    計算結果輸出檔的完整路徑，位於模型同資料夾。
+    OUTPUT_PREFIX_MODEL 為 True 時檔名加上模型檔名字首。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        filename (str): 輸出檔名，例如 '01_period_results.xlsx'。
+
+    回傳:
+        str: 輸出檔完整路徑。
+    """
+    if OUTPUT_PREFIX_MODEL:
+        filename = f"{os.path.splitext(os.path.basename(model_path))[0]}_{filename}"
+    return os.path.join(os.path.dirname(model_path), filename)
+
+class ComBackend(object):
+    """
+    以 win32com 連接實際 SAP2000 的後端。
+    Sap2000 透過後端取得 SapObject，其餘呼叫皆直接作用於 SapObject.SapModel，
+    因此可替換為 fakesap.FakeSapBackend 等不需 SAP2000 的實作。
+    """
+    PROGRAM_NAME = "SAP2000.exe"
+
+    def __init__(self):
+        import pythoncom
+        import win32com.client as win32
+        self._pythoncom = pythoncom
+        self._win32 = win32
+        # 附加或啟動失敗時拋出的例外型態
+        self.error = pythoncom.com_error
+
+    def init_thread(self):
+        """於目前執行緒初始化 COM。"""
+        self._pythoncom.CoInitialize()
+
+    def attach(self):
+        """附加到正在運行的 SAP2000 實例。"""
+        return self._win32.GetActiveObject("SAP2000.SapObject")
+
+    def process_ids(self):
+        """
+        目前所有 SAP2000 程序的 PID。
+        """
+        import psutil
+        return {
+            proc.pid for proc in psutil.process_iter(['name'])
+            if (proc.info['name'] or '').lower() == self.PROGRAM_NAME.lower()
+        }
+
+    @contextmanager
+    def _start_lock(self):
+        """
+        跨程序的啟動鎖，避免多個 PyreEQ 同時啟動 SAP2000 時誤認彼此的 PID。
+        """
+        import msvcrt
+        lock_path = os.path.join(tempfile.gettempdir(), 'pyreeq_sap_start.lock')
+        with open(lock_path, 'a+b') as f:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 重試約 10 秒後仍未取得時拋出，繼續等待
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def start(self):
+        """
+        啟動新的 SAP2000 實例。
+
+        回傳:
+            tuple: (SapObject, PID)，無法辨識新程序時 PID 為 None。
+        """
+        with self._start_lock():
+            before = self.process_ids()
+            sapobject = self._win32.Dispatch("SAP2000.SapObject")
+            sapobject.ApplicationStart()
+            started = self.process_ids() - before
+
+        if len(started) != 1:
+            print("[警告]：無法辨識新啟動的 SAP2000 程序，結束時僅以 ApplicationExit 關閉。")
+            return sapobject, None
+        return sapobject, started.pop()
+
+    def terminate(self, pid, timeout=SHUTDOWN_TIMEOUT):
+        """
+        等待指定 PID 的 SAP2000 程序於 ApplicationExit 後自行結束，逾時才強制終止。
+        僅處理本程式啟動的程序，不影響其他使用者或其他 PyreEQ 工作的 SAP2000。
+
+        參數:
+            pid (int): Sap2000.launch_sap 啟動的程序 PID。
+            timeout (float): 等待秒數。
+        """
+        import psutil
+        try:
+            proc = psutil.Process(pid)
+            # PID 可能已被其他程式重複使用
+            if proc.name().lower() != self.PROGRAM_NAME.lower():
+                return
+            proc.wait(timeout)
+        except psutil.NoSuchProcess:
+            return
+        except psutil.TimeoutExpired:
+            print(f"[警告]：SAP2000 (PID: {pid}) 未於 {timeout} 秒內結束，強制終止。")
+            try:
+                proc.kill()
+                proc.wait(5)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
+                pass
+
+# 未指定後端時使用的後端，None 表示 ComBackend
+_default_backend = None
+
+def set_default_backend(backend):
+    """
+    設定 Sap2000 未指定後端時使用的後端，例如於 Linux 以 FakeSapBackend 執行整個流程。
+
+    參數:
+        backend: 具 init_thread、attach、start、terminate 與 error 的後端物件，None 表示還原為 ComBackend。
+            start 回傳 (SapObject, PID)，terminate(pid, timeout) 僅結束該 PID 的程序。
+    """
+    global _default_backend
+    _default_backend = backend
+
+def get_default_backend():
+    """
+    取得預設後端，首次使用時才建立 ComBackend，避免非 Windows 環境匯入 win32com。
+    設定環境變數 PYREEQ_RECORD=<錄製檔路徑> 時，以 saprecord.RecordingBackend 錄製所有 OAPI 呼叫。
+    """
+    global _default_backend
+    if _default_backend is None:
+        record_path = os.environ.get('PYREEQ_RECORD')
+        if record_path:
+            from saprecord import RecordingBackend
+            _default_backend = RecordingBackend(record_path, ComBackend())
+        else:
+            _default_backend = ComBackend()
+    return _default_backend
+
+def annotate_backend(session, name, **kwargs):
+    """
+    將流程呼叫及其引數記錄於具 annotate 的後端（例如 RecordingBackend），供回放時重新執行。
+    """
+    backend = _default_backend
+    if session is not None and session.backend is not None:
+        backend = session.backend
+    if backend is not None and hasattr(backend, 'annotate'):
+        backend.annotate(name, dict(kwargs, session=session is not None))
+
+@instrument_class
+class Sap2000(object):
+    """
+    一個用於與 SAP2000 應用程式進行 COM 互動的包裝類別。
+    提供了開啟、儲存、分析模型以及獲取結果等多種方法。
+    """
+    def __init__(self, backend=None, attach_existing=False):
+        self.backend = backend if backend is not None else get_default_backend()
+        # False 時一律啟動新實例，供多個工作同時執行
+        self.attach_existing = attach_existing
+        self.SapObject = None
+        self.SapModel = None
+        # 是否由本物件啟動 SAP2000；僅本物件啟動的實例於 closeModel 時關閉
+        self.started = False
+        # 由本物件啟動的 SAP2000 程序 PID，附加到既有實例或無法辨識時為 None
+        self.pid = None
+        self.units = None
+        # 群組成員索引快取 {群組名稱: [點物件名稱]}，開啟模型時清除
+        self.group_members = {}
+        # 組裝質量快取 {(名稱, 查詢型態): AssembledJointMass 回傳值}，模型或單位變更時清除
+        self.mass_cache = {}
+        # 物件的點元素索引 {(物件型態, 物件名稱): [點元素名稱]}、群組的點元素 {群組名稱: [點元素名稱]}，
+        # 以及無法對應至任何物件的結果節點，網格於分析時產生，開啟模型或分析時清除
+        self.joint_elements = None
+        self.group_elements = {}
+        self.ungrouped_joints = None
+        # 存檔關閉後以新模型內容重新寫入的快取 [(檢查函式, 寫入函式)]，開啟模型時清除，見 closeModel
+        self.after_save = []
+
+    def launch_sap(self):
+        """
+        僅啟動或附加到 SAP2000 實例，但不初始化新模型。
+        attach_existing 為 False 時不附加，直接啟動新實例。
+
+        例外:
+            RuntimeError: 無法啟動 SAP2000。
+        """
+        sapobject = None
+        if self.attach_existing:
+            try:
+                # 嘗試獲取一個正在運行的 SAP2000 實例
+                sapobject = self.backend.attach()
+                print("[警告]：已附加到現有的 SAP2000 實例，模型將於該實例中開啟，結束時不會關閉該實例。")
+            except self.backend.error:
+                print("[訊息]：未找到正在運行的 SAP2000 實例，正在啟動新實例...")
+
+        if sapobject is None:
+            # 如果沒有正在運行的實例或不附加，則創建一個新的
+            try:
+                sapobject, self.pid = self.backend.start()
+                self.started = True
+            except self.backend.error as e:
+                raise RuntimeError(
+                    "無法啟動 SAP2000。請檢查 SAP2000 是否已正確安裝，並手動關閉所有背景中的 'SAP2000.exe' 程序後再試。"
+                ) from e
+
+        self.SapObject = sapobject
+        self.SapModel = self.SapObject.SapModel
+
+    def initializeNewModel(self, unitsTag=12):
+        """
+        確保 SAP2000 實例已啟動並初始化一個新模型。
+        此方法會先嘗試附加到一個正在運行的 SAP2000 實例，如果失敗，則會啟動一個新的實例。
+        """
+        self.launch_sap()
+        # 清除當前模型並初始化一個新模型
+        self.SapModel.InitializeNewModel(unitsTag)
+        print("[訊息]：SAP2000 模型已初始化。")
+
+    def file_OpenFile(self, FileName):
+        """
+        開啟現有的 Sap2000 模型檔案。
+        支援副檔名：.sdb（標準 Sap2000 檔案）、$2k/.s2k（文字檔）、.xlsx/.xls（Excel 檔案）、.mdb（Access 檔案）。
+
+        參數：
+            FileName (str): 欲於 Sap2000 開啟的模型檔案完整路徑。
+        """
+        self.SapModel.File.OpenFile(FileName)
+        self.units = None
+        self.group_members = {}
+        self.mass_cache = {}
+        self.joint_elements = None
+        self.group_elements = {}
+        self.ungrouped_joints = None
+        self.after_save = []
+
+    def file_Save(self, FileName):
+        """
+        儲存目前 Sap2000 模型檔案。
+
+        參數：
+            FileName (str): 儲存檔案的完整路徑，建議使用 .sdb 副檔名。
+                若未指定檔名，則以目前檔名儲存。若模型尚未儲存過且未指定檔名，將回傳錯誤。
+
+        回傳：
+            int: 儲存成功回傳 0，否則回傳非 0。
+        """
+        self.SapModel.File.Save(FileName)  # eg."C:\SapAPI\x.sdb"
+
+    def closeModel(self):
+        """
+        ---close SAP2000 model---
+        """
+        # close SAP2000 model
+        # self.SapObject.ApplicationExit(True) #True means save the model before close,False otherwise.
+        # self.SapModel=0 # release the memory
+        # self.SapObject=0 # release the memory
+        # 1. 嘗試優雅地關閉應用程式；附加的實例屬於使用者或其他工作，不關閉也不儲存
+        cache_writes = []
+        if self.SapObject is not None and self.started:
+            # 存檔會改變模型內容雜湊；先確認待寫入的快取仍對應目前模型，存檔後再以新鍵值寫入
+            for check, write in self.after_save:
+                try:
+                    if check is None or check(self):
+                        cache_writes.append(write)
+                except Exception:
+                    pass
+            try:
+                print("Attempting ApplicationExit...")
+                self.SapObject.ApplicationExit(True) 
+            except Exception:
+                pass # 忽略錯誤，繼續強制終止
+        self.after_save = []
+                
+        # 2. 清理 Python 變數和 COM 引用
+        # 確保 SapModel 和 SapObject 變數都被釋放
+        self.SapModel = None
+        self.SapObject = None
+        self.started = False
+        gc.collect() 
+        
+        # 3. 等待本物件啟動的 SAP2000 程序結束，逾時才強制終止；附加的實例不終止
+        if self.pid is not None:
+            self.backend.terminate(self.pid, SHUTDOWN_TIMEOUT)
+            self.pid = None
+
+        # 4. 程序結束、模型檔案寫入完成後更新快取
+        for write in cache_writes:
+            try:
+                write()
+            except OSError as e:
+                print(f"[警告]：無法更新結果快取：{e}")
+
+        print("SAP2000 shutdown process complete.")
+
+
+    def setUnits(self, unitsTag):
+        """
+        設定目前 Sap2000 模型的單位。
+
+        參數：
+            unitsTag (int): 單位代碼。
+                1=lb_in_F, 2=lb_ft_F, 3=kip_in_F, 4=kip_ft_F, 5=kN_mm_C, 6=kN_m_C,
+                7=kgf_mm_C, 8=kgf_m_C, 9=N_mm_C, 10=N_m_C, 11=Ton_mm_C, 12=Ton_m_C,
+                13=kN_cm_C, 14=kgf_cm_C, 15=N_cm_C, 16=Ton_cm_C。
+        """
+        self.SapModel.SetPresentUnits(unitsTag)
+        if unitsTag != self.units:
+            self.mass_cache = {}
+        self.units = unitsTag
+
+    def getModelFilename(self, IncludePath=True):
+        """
+        取得目前 Sap2000 模型的檔案名稱。
+
+        參數：
+            IncludePath (bool): 是否包含完整路徑。
+
+        回傳：
+            str: 模型檔案名稱，模型尚未儲存時為空字串。
+        """
+        ret = self.SapModel.GetModelFilename(IncludePath)
+        return ret
+
+    def getDatabaseUnits(self):
+        """
+        取得模型資料庫單位代碼，互動式資料表的數值以此單位表示。
+
+        回傳：
+            int: 單位代碼，定義同 setUnits。
+        """
+        ret = self.SapModel.GetDatabaseUnits()
+        return ret
+
+    def getCoordSystem(self):
+        """
+        ---get the name of the present coordinate system---
+        """
+        currentCoordSysName = self.SapModel.GetPresentCoordSystem()
+
+        return currentCoordSysName
+    
+    def getModelIsLocked(self):
+        """
+        The function returns True if the model is locked and False if it is unlocked.
+        """
+        IsLocked = self.SapModel.GetModelIsLocked()
+
+        return IsLocked
+    
+    def setModelIsLocked(self, locker):
+        """
+        The item is True if the model is to be locked and False if it is to be unlocked.
+        參數：
+            locker (bool): 模型鎖定狀態。
+        """
+        IsLocked = self.SapModel.SetModelIsLocked(locker)
+
+        return IsLocked
+
+    def clearSelection(self):
+        """
+        This function deselects all objects in the model. 
+        It returns zero if the selection status is successfully set, otherwise it returns nonzero.
+        """
+        self.SapModel.SelectObj.ClearSelection()
+
+    def selectGroup(self, groupname):
+        """
+        This function selects or deselects all objects in the specified group.
+        """
+        self.SapModel.SelectObj.Group(groupname)
+
+    def getSelected(self):
+        """
+        This function retrieves a list of selected objects.
+        """
+        ret = self.SapModel.SelectObj.GetSelected()
+
+        return ret
+    
+    def groupdef_getnamelist(self):
+        """
+        取得目前 Sap2000 模型的群組名稱列表。
+
+        Returns:
+            bool: 讀取是否成功。
+            int: 群組數量。
+            list: 群組名稱（list of str）。
+        """
+        ret = self.SapModel.GroupDef.GetNameList()
+        return ret
+
+    def groupdef_getassignments(self, name):
+        """
+        取得指定群組內的物件指派。
+
+        參數：
+            name (str): 群組名稱。
+
+        Returns:
+            int: 物件數量。
+            list: 物件型態（list of int）。1=Point, 2=Frame, 3=Cable, 4=Tendon, 5=Area, 6=Solid, 7=Link。
+            list: 物件名稱（list of str）。
+        """
+        ret = self.SapModel.GroupDef.GetAssignments(name)
+        return ret
+
+    def loadcases_getnamelist(self):
+        """
+        取得目前 Sap2000 模型的載重名稱列表。
+
+        Returns:
+            bool: 讀取是否成功。
+            int: 群組數量。
+            list: 群組名稱（list of str）。
+        """
+        ret = self.SapModel.LoadCases.GetNameList()
+        return ret
+
+    def define_LoadPatterns_Add(self,name,myType,SelfWTMultiplier=0,AddLoadCase=True):
+        """
+        新增一個載重模式（Load Pattern）。
+
+        參數：
+            name (str): 載重模式名稱。
+            myType (int): 載重模式型態，對應 eLoadPatternType 列舉值。
+                1=DEAD, 2=SUPERDEAD, 3=LIVE, 4=REDUCELIVE, 5=QUAKE, 6=WIND, 7=SNOW, 8=OTHER, 9=MOVE, 10=TEMPERATURE,
+                11=ROOFLIVE, 12=NOTIONAL, 13=PATTERNLIVE, 14=WAVE, 15=BRAKING, 16=CENTRIFUGAL, 17=FRICTION, 18=ICE,
+                19=WINDONLIVELOAD, 20=HORIZONTALEARTHPRESSURE, 21=VERTICALEARTHPRESSURE, 22=EARTHSURCHARGE, 23=DOWNDRAG,
+                24=VEHICLECOLLISION, 25=VESSELCOLLISION, 26=TEMPERATUREGRADIENT, 27=SETTLEMENT, 28=SHRINKAGE, 29=CREEP,
+                30=WATERLOADPRESSURE, 31=LIVELOADSURCHARGE, 32=LOCKEDINFORCES, 33=PEDESTRIANLL, 34=PRESTRESS,
+                35=HYPERSTATIC, 36=BOUYANCY, 37=STREAMFLOW, 38=IMPACT, 39=CONSTRUCTION。
+            SelfWTMultiplier (float): 自重乘數。
+            AddLoadCase (bool): 是否自動新增對應的線性靜力載重案例。
+        """
+        self.SapModel.LoadPatterns.Add(name,myType,SelfWTMultiplier,AddLoadCase)
+
+
+    def define_LoadCases_StaticLinear_SetCase(self, name):
+        """
+        初始化一個靜力線性載重案例。
+
+        參數：
+            name (str): 載重案例名稱（可為新建或既有）。
+        """
+        self.SapModel.LoadCases.StaticLinear.SetCase(name)
+
+    def define_LoadCases_StaticLinear_SetLoads(self, name, numberLoads, loadType, loadName, scaleFactor):
+        """
+        設定指定分析案例的載重資料。
+
+        參數：
+            name (str): 既有靜力線性載重案例名稱。
+            numberLoads (int): 指定案例的載重數量。
+            loadType (list of str): 載重型態（'Load' 或 'Accel'）。
+            loadName (list of str): 載重名稱。若 loadType 為 'Load'，此為已定義載重名稱；若為 'Accel'，此為 UX、UY、UZ、RX、RY 或 RZ。
+            scaleFactor (list of float): 各載重的比例因子。對於 Accel UX/UY/UZ 單位為 L/s²，其餘無單位。
+        """
+        self.SapModel.LoadCases.StaticLinear.SetLoads(name, numberLoads, loadType, loadName, scaleFactor)
+
+    def define_LoadCases_StaticLinear_GetLoads(self, name):
+        """
+        取得指定靜力線性載重案例的載重資料。
+
+        參數：
+            name (str): 既有靜力線性載重案例名稱。
+
+        回傳：
+            int: 載重數量。
+            list of str: 載重型態（'Load' 或 'Accel'）。
+            list of str: 載重名稱。
+            list of float: 各載重的比例因子。
+        """
+        ret = self.SapModel.LoadCases.StaticLinear.GetLoads(name)
+        return ret
+
+    def deltet_Pointobj_Deleteloadforce(self, name, loadpat, ItemTypeElm):
+        """
+        This function deletes all point load assignments, for the specified load pattern, from the specified point object(s).
+
+        參數：
+            Name (str): The name of a point object or a group depending on the value selected for ItemType item.
+            LoadPat (str): The name of a defined load pattern.
+            ItemType(int): This is one of the following items from the eItemType enumeration.
+                            Object = 0
+                            Group = 1
+                            SelectedObjects = 2
+        """
+        self.SapModel.PointObj.DeleteLoadForce(name, loadpat, ItemTypeElm)
+
+    def analyze_SetRunCaseFlag(self, Name, Run, All=False):
+        """
+        設定載重案例的執行旗標。
+
+        參數：
+            Name (str): 欲設定執行旗標的載重案例名稱。
+            Run (bool): 是否執行該載重案例。
+            All (bool): 若為 True，則所有載重案例皆依 Run 設定，忽略 Name。
+        """
+        self.SapModel.Analyze.SetRunCaseFlag(Name, Run, All)
+
+    def analyze_GetCaseStatus(self):
+        """
+        取得所有載重案例的分析狀態。
+
+        回傳：
+            int: 載重案例數量。
+            list of str: 載重案例名稱。
+            list of int: 分析狀態。1=Not run, 2=Could not start, 3=Not finished, 4=Finished。
+        """
+        ret = self.SapModel.Analyze.GetCaseStatus()
+        return ret
+
+    def analyze_RunAnalysis(self):
+        """
+        執行模型分析。
+
+        注意：模型必須已儲存（有檔案路徑）才能進行分析。若為新建模型，請先呼叫 File.Save。
+        成功時回傳 0，否則回傳非 0。
+        """
+        ret = self.SapModel.Analyze.RunAnalysis()
+        self.mass_cache = {}
+        self.joint_elements = None
+        self.group_elements = {}
+        self.ungrouped_joints = None
+        return ret
+
+    def results_JointDispl(self, Name, ItemTypeElm=0):
+        """
+        回傳指定點元素的相對位移結果。
+
+        參數
+        ------
+        Name : str
+            現有點物件、點元素或群組名稱，依 ItemTypeElm 決定。
+        ItemTypeElm : int, 預設 0
+            查詢型態：
+                0 - ObjectElm：依點物件名稱
+                1 - Element：依點元素名稱
+                2 - GroupElm：群組內所有點元素
+                3 - SelectionElm：所有已選取點元素（忽略 Name）
+
+        回傳
+        ------
+        tuple
+            (index, NumberResults, Obj, Elm, LoadCase, StepType, StepNum, U1, U2, U3, R1, R2, R3)
+            NumberResults : int
+                結果總數。
+            Obj : list of str
+                各結果對應的點物件名稱（可能為空字串）。
+            Elm : list of str
+                各結果對應的點元素名稱。
+            LoadCase : list of str
+                各結果對應的分析案例或組合名稱。
+            StepType : list of str
+                各結果的步驟型態。
+            StepNum : list of int
+                各結果的步驟編號。
+            U1, U2, U3 : list of float
+                各結果於局部 1、2、3 軸方向的位移 [長度]。
+            R1, R2, R3 : list of float
+                各結果於局部 1、2、3 軸的轉角 [弧度]。
+        """
+        result = self.SapModel.Results.JointDispl(Name, ItemTypeElm)
+        return result
+
+    def results_AssembledJointMass(self, Name, itemTypeElm):
+        """
+        回傳指定點元素的組裝質量資訊。
+        Note: V19之後SAP才有AssembledJointMass_1，語法不同。
+
+        參數
+        ------
+        Name : str
+            現有點元素或群組名稱，依 itemTypeElm 決定。
+        itemTypeElm : int
+            查詢型態：
+                0 - ObjectElm：依點物件名稱
+                1 - Element：依點元素名稱
+                2 - GroupElm：群組內所有點元素
+                3 - SelectionElm：所有已選取點元素（忽略 Name）
+
+        回傳
+        ------
+        tuple
+            (index, NumberResults, PointElm, MassSource, U1, U2, U3, R1, R2, R3)
+            NumberResults : int
+                結果總數。
+            PointElm : list of str
+                各結果對應的點元素名稱。
+            U1, U2, U3 : list of float
+                各結果於局部 1、2、3 軸方向的平移質量 [質量]。
+            R1, R2, R3 : list of float
+                各結果於局部 1、2、3 軸的轉動慣量 [質量×長度^2]。
+        """
+        result = self.SapModel.Results.AssembledJointMass(Name, itemTypeElm)
+        return result
+
+    def results_AssembledJointMass_cached(self, Name, itemTypeElm):
+        """
+        同 results_AssembledJointMass，但保留完整回傳值（U1~U3、R1~R3）供各方向與群組共用。
+        已選取節點（itemTypeElm=3）的結果隨選取內容變動，不予快取。
+        """
+        if itemTypeElm == 3:
+            return self.results_AssembledJointMass(Name, itemTypeElm)
+
+        key = (Name, itemTypeElm)
+        if key not in self.mass_cache:
+            self.mass_cache[key] = self.results_AssembledJointMass(Name, itemTypeElm)
+        return self.mass_cache[key]
+    
+    def results_Setup_DeselectAllCasesAndCombosForOutput(self):
+        """
+        取消所有載重案例與組合的輸出選取。
+        """
+        self.SapModel.Results.Setup.DeselectAllCasesAndCombosForOutput()
+
+    def results_Setup_SetCaseSelectedForOutput(self,Name,Selected=True):
+        """
+        設定指定載重案例是否選取為輸出。
+
+        參數：
+            Name (str): 載重案例名稱。
+            Selected (bool): 是否選取為輸出，預設為 True。
+        """
+        self.SapModel.Results.Setup.SetCaseSelectedForOutput(Name,Selected)
+
+    def assign_PointObj_SetLoadForce(self,name,loadPat,value,Replace=False,CSys="Global",ItemType=0):
+        """
+        指定點物件的節點力。
+
+        參數：
+            name (str): 點物件名稱或群組名稱，依 ItemType 決定。
+            loadPat (str): 載重模式名稱。
+            value (list of float): 六個分量的點載重值。
+                value[0]: F1 [力]
+                value[1]: F2 [力]
+                value[2]: F3 [力]
+                value[3]: M1 [力×長度]
+                value[4]: M2 [力×長度]
+                value[5]: M3 [力×長度]
+            Replace (bool): 若為 True，則先刪除舊有載重再指定新載重。
+            CSys (str): 載重所用座標系統名稱，預設為 Global。
+            ItemType (int): 指定對象型態：0=Object，1=Group，2=SelectedObjects。
+                0: 指定 name 為單一點物件。
+                1: 指定 name 為群組。
+                2: 指定所有已選取點物件，忽略 name。
+        """
+        self.SapModel.PointObj.SetLoadForce(name,loadPat,value,Replace,CSys,ItemType)
+
+    def databasetables_GetTableForEditingArray(self, TableKey, GroupName):
+        """
+        讀取可編輯的互動式資料表。
+
+        參數：
+            TableKey (str): 資料表名稱，例如 'Joint Loads - Force'。
+            GroupName (str): 群組名稱，僅回傳該群組內物件的資料。
+
+        回傳：
+            tuple: (ret, TableVersion, FieldsKeysIncluded, NumberRecords, TableData)
+                TableData 為依記錄展開的一維字串陣列，每筆記錄依 FieldsKeysIncluded 順序排列。
+        """
+        ret = self.SapModel.DatabaseTables.GetTableForEditingArray(TableKey, GroupName, 0, [], 0, [])
+        return ret
+
+    def databasetables_GetTableForDisplayArray(self, TableKey, GroupName):
+        """
+        讀取顯示用的資料表（含分析模型資料表，例如 'Objects And Elements - Joints'），讀取全部欄位。
+
+        參數：
+            TableKey (str): 資料表名稱。
+            GroupName (str): 群組名稱，僅回傳該群組內物件的資料。
+
+        回傳：
+            tuple: (ret, TableVersion, FieldsKeysIncluded, NumberRecords, TableData)
+                TableData 為依記錄展開的一維字串陣列，每筆記錄依 FieldsKeysIncluded 順序排列。
+        """
+        ret = self.SapModel.DatabaseTables.GetTableForDisplayArray(TableKey, [], GroupName, 0, [], 0, [])
+        return ret
+
+    def databasetables_SetTableForEditingArray(self, TableKey, TableVersion, FieldsKeysIncluded, NumberRecords, TableData):
+        """
+        設定互動式資料表的編輯內容，須再呼叫 databasetables_ApplyEditedTables 才會寫入模型。
+        設定內容會取代該資料表全部記錄。
+
+        參數：
+            TableKey (str): 資料表名稱。
+            TableVersion (int): 由 GetTableForEditingArray 取得的版本。
+            FieldsKeysIncluded (list of str): 欄位名稱。
+            NumberRecords (int): 記錄數量。
+            TableData (list of str): 依記錄展開的一維字串陣列。
+        """
+        ret = self.SapModel.DatabaseTables.SetTableForEditingArray(TableKey, TableVersion, FieldsKeysIncluded, NumberRecords, TableData)
+        return ret
+
+    def databasetables_ApplyEditedTables(self, FillImportLog=True):
+        """
+        將已設定的互動式資料表寫入模型。
+
+        回傳：
+            tuple: (ret, NumFatalErrors, NumErrorMsgs, NumWarnMsgs, NumInfoMsgs, ImportLog)
+        """
+        ret = self.SapModel.DatabaseTables.ApplyEditedTables(FillImportLog, 0, 0, 0, 0, "")
+        return ret
+
+class ComThread(object):
+    """
+    持有 SAP2000 連線的長駐 COM 執行緒。
+
+    所有交給它的工作依序在同一個已初始化 COM 的執行緒中執行，
+    因此 Sap2000 的呼叫不會跨執行緒，SAP2000 忙碌時新的工作排隊等候，呼叫端不會被阻塞。
+
+    參數:
+        backend: 初始化 COM 所用的後端，None 表示 get_default_backend()。
+    """
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.thread_id = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='pyreeq-com', initializer=self._init_thread
+        )
+
+    def _init_thread(self):
+        self.thread_id = threading.get_ident()
+        backend = self.backend if self.backend is not None else get_default_backend()
+        backend.init_thread()
+
+    def on_thread(self):
+        """目前是否在 COM 執行緒中。"""
+        return self.thread_id == threading.get_ident()
+
+    def pending(self):
+        """尚未完成（執行中或排隊中）的工作數。"""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        將 func(*args, **kwargs) 排入 COM 執行緒。
+
+        回傳:
+            concurrent.futures.Future: 工作結果；例外亦由 Future 回傳。
+        """
+        future = self._executor.submit(func, *args, **kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def call(self, func, *args, **kwargs):
+        """於 COM 執行緒執行並等待結果；已在 COM 執行緒中時直接執行。"""
+        if self.on_thread():
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    def cancel_pending(self):
+        """取消尚未開始的工作，執行中的工作不受影響。"""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+
+    def shutdown(self, wait=True):
+        """取消排隊中的工作並結束執行緒。"""
+        self.cancel_pending()
+        self._executor.shutdown(wait=wait)
+
+class SapSession(object):
+    """
+    在整個 GUI 流程中保持單一 SAP2000 實例與已開啟的模型。
+    檔案選擇、週期計算與地震力計算共用同一個 Sap2000 物件；實例失效時於下次取用時重新連線，
+    僅在程式結束或切換模型時關閉 SAP2000。
+
+    所有 SAP2000 呼叫都在工作階段專屬的 ComThread 中依序執行：GUI 以 submit 將流程排入該執行緒，
+    命令列與批次模式直接呼叫的流程則由 session_thread 轉交該執行緒並等待結果，因此實例不會因換執行緒而重新啟動。
+    """
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.sapmodel = None
+        self.model_path = None
+        self._thread_id = None
+        # 前次地震力計算的分配基準 (鍵值, 基準)，見 eqforce_basis_key
+        self.eqforce_basis = None
+        # 首次 submit 或 call 時建立的 COM 執行緒
+        self.com = None
+
+    def submit(self, func, *args, **kwargs):
+        """
+        將使用本工作階段的流程排入 COM 執行緒，例如
+        session.submit(run_analysis_period, model_path, gx, gy, gz, session=session)。
+
+        回傳:
+            concurrent.futures.Future: 流程的回傳值或例外。
+        """
+        if self.com is None:
+            self.com = ComThread(self.backend)
+        return self.com.submit(func, *args, **kwargs)
+
+    def call(self, func, *args, **kwargs):
+        """於 COM 執行緒執行並等待結果，供非 COM 執行緒中的流程操作 SAP2000。"""
+        if self.com is None:
+            self.com = ComThread(self.backend)
+        return self.com.call(func, *args, **kwargs)
+
+    def busy(self):
+        """COM 執行緒是否有執行中或排隊中的工作。"""
+        return self.com is not None and self.com.pending() > 0
+
+    def is_alive(self):
+        """
+        以輕量的 COM 呼叫確認 SAP2000 實例仍可回應。
+        """
+        if self.sapmodel is None or self.sapmodel.SapModel is None:
+            return False
+        try:
+            self.sapmodel.getModelFilename()
+            return True
+        except Exception:
+            return False
+
+    def has_model(self, model_path):
+        """
+        工作階段中是否已開啟指定模型。
+        """
+        return self.sapmodel is not None and self._same_path(self.model_path, model_path)
+
+    def acquire(self, model_path):
+        """
+        取得已開啟指定模型的 Sap2000 物件，必要時啟動、重新連線或開啟模型。
+
+        參數:
+            model_path (str): SAP2000 模型檔案的完整路徑。
+
+        回傳:
+            Sap2000: 已開啟模型的 Sap2000 物件。
+        """
+        if self.model_path is not None and not self._same_path(self.model_path, model_path):
+            print("[訊息]：已切換模型，關閉目前的 SAP2000 實例。")
+            self.shutdown()
+
+        if self.sapmodel is None:
+            self.sapmodel = Sap2000(self.backend, attach_existing=ATTACH_EXISTING)
+
+        # COM 參照僅能在建立它的執行緒中使用；流程經 session_thread 一律於 COM 執行緒執行，
+        # 於其他執行緒直接呼叫或實例失效時，先捨棄舊實例再重新啟動
+        if self._thread_id != threading.get_ident() or not self.is_alive():
+            if self.sapmodel.SapObject is not None:
+                self._discard_instance()
+            self.sapmodel.backend.init_thread()
+            self.sapmodel.launch_sap()
+            self._thread_id = threading.get_ident()
+
+        if not self._same_path(self.sapmodel.getModelFilename(), model_path):
+            print(f"[訊息]：正在開啟模型檔案：{model_path}...")
+            self.sapmodel.file_OpenFile(model_path)
+            print("[訊息]：模型已成功開啟！")
+        self.sapmodel.setUnits(MODEL_UNITS)
+        self.model_path = model_path
+
+        return self.sapmodel
+
+    def _discard_instance(self):
+        """
+        捨棄無法再使用的 SAP2000 實例，不存檔。
+        其 COM 參照屬於其他執行緒或已失效，無法以 ApplicationExit 關閉，本工作階段啟動的程序直接終止，
+        避免遺留無人使用的 SAP2000；附加的實例屬於使用者，僅釋放參照。
+        """
+        sapmodel = self.sapmodel
+        print("[訊息]：目前的 SAP2000 實例無法於此執行緒使用或已失效，重新啟動 SAP2000。")
+        sapmodel.SapModel = None
+        sapmodel.SapObject = None
+        sapmodel.started = False
+        sapmodel.after_save = []
+        gc.collect()
+        if sapmodel.pid is not None:
+            sapmodel.backend.terminate(sapmodel.pid, 0)
+            sapmodel.pid = None
+
+    def shutdown(self):
+        """
+        關閉 SAP2000 實例並清除工作階段。
+        使用 COM 執行緒時，取消排隊中的工作，於 COM 執行緒關閉 SAP2000 後結束該執行緒。
+        """
+        com = self.com
+        if com is not None and not com.on_thread():
+            com.cancel_pending()
+            com.call(self.shutdown)
+            com.shutdown()
+            self.com = None
+            return
+
+        if self.sapmodel is not None:
+            self.sapmodel.closeModel()
+            print("[訊息]：SAP2000關閉。")
+        self.sapmodel = None
+        self.model_path = None
+        self._thread_id = None
+        self.eqforce_basis = None
+
+    @staticmethod
+    def _same_path(path_a, path_b):
+        if not path_a or not path_b:
+            return False
+        return os.path.normcase(os.path.abspath(path_a)) == os.path.normcase(os.path.abspath(path_b))
+
+def session_thread(func):
+    """
+    流程裝飾器：提供 session 時整個流程於工作階段的 COM 執行緒執行並等待結果，
+    使 Sap2000 物件不跨執行緒使用；已在 COM 執行緒中（例如 GUI 以 submit 排入的流程）時直接執行。
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = signature.bind_partial(*args, **kwargs).arguments.get('session')
+        if session is not None:
+            return session.call(func, *args, **kwargs)
+        return func(*args, **kwargs)
+    return wrapper
+
+def unit_results_current(sapmodel):
+    """
+    檢查模型中單位載重案例的分析結果是否仍有效。
+    SAP2000 模型鎖定時無法修改，解鎖即刪除分析結果；因此模型仍鎖定、UNIT-X/Y/Z 皆已完成分析，
+    且案例定義與本程式設定相同時，既有結果即對應目前模型。
+
+    參數:
+        sapmodel (Sap2000): 已開啟模型的 Sap2000 物件。
+
+    回傳:
+        bool: 結果可直接沿用時回傳 True。
+    """
+    if not sapmodel.getModelIsLocked():
+        return False
+
+    status = sapmodel.analyze_GetCaseStatus()
+    finished = {name for name, st in zip(status[2], status[3]) if st == 4}
+    for lc, dir_name in UNIT_LOAD_CASES.items():
+        if lc not in finished:
+            return False
+        res = sapmodel.define_LoadCases_StaticLinear_GetLoads(lc)
+        if list(res[2]) != ["Accel"] or list(res[3]) != [dir_name]:
+            return False
+        if not math.isclose(res[4][0], UNIT_ACCEL):
+            return False
+
+    return True
+
+@session_thread
+@profile_stage('open')
+def open_sap_model(model_path, session=None):
+    """
+    開啟 SAP2000 模型並設定單位，不執行分析。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000 實例與已開啟模型。
+
+    回傳:
+        Sap2000: 已開啟模型的 Sap2000 物件。
+
+    例外:
+        FileNotFoundError: 找不到模型檔案。
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"找不到模型檔案 -> {model_path}")
+
+    if session is not None:
+        return session.acquire(model_path)
+
+    sapmodel = Sap2000(attach_existing=ATTACH_EXISTING)
+    sapmodel.initializeNewModel()
+
+    print(f"[訊息]：正在開啟模型檔案：{model_path}...")
+    sapmodel.file_OpenFile(model_path)
+    print("[訊息]：模型已成功開啟！")
+    sapmodel.setUnits(MODEL_UNITS)
+
+    return sapmodel
+
+@session_thread
+def setup_and_run_sap_analysis(model_path, session=None, reuse_results=True):
+    """
+    開啟 SAP2000 模型，設定並執行分析。
+
+    1. 開啟並準備 SAP2000 模型。
+    2. 設定並執行單位力載重分析。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000 實例與已開啟模型。
+        reuse_results (bool): 單位載重結果仍有效時，沿用既有結果而不重新分析。
+
+    回傳:
+        Sap2000: 已執行分析的 Sap2000 物件。
+    """
+    # --- 1. 模型物件創建及控制 ---
+    sapmodel = open_sap_model(model_path, session)
+
+    # --- 2. 分析用力量加載及計算 ---
+    if reuse_results and unit_results_current(sapmodel):
+        print("[訊息]：單位載重分析結果仍有效，沿用既有結果。")
+        return sapmodel
+
+    with stage('unit_case_setup'):
+        status_lock = sapmodel.getModelIsLocked()
+        if status_lock:
+            sapmodel.setModelIsLocked(False)
+        for lc, dir_name in UNIT_LOAD_CASES.items():
+            sapmodel.define_LoadCases_StaticLinear_SetCase(lc)
+            sapmodel.define_LoadCases_StaticLinear_SetLoads(lc, 1, ["Accel"], [dir_name], [UNIT_ACCEL])
+        print("[訊息]：單位均佈力載重設定完成！")
+
+        _, num_lc, namelist_lc = sapmodel.loadcases_getnamelist()
+        namelist_lc = list(namelist_lc)
+        eqlc_list = list(UNIT_LOAD_CASES.keys())
+        #sapmodel.file_Save(model_path)
+        for lc in namelist_lc:
+            if lc in eqlc_list:
+                sapmodel.analyze_SetRunCaseFlag(lc, True)
+            else:
+                sapmodel.analyze_SetRunCaseFlag(lc, False)
+
+    runstatus = sapmodel.analyze_RunAnalysis()
+    if runstatus != 0:
+        print("[警告]：模型分析未成功執行。")
+    else:
+        print("[訊息]：模型分析完成！")
+    
+    return sapmodel
+
+def get_group_members(sapobj, gp_list):
+    """
+    取得群組內的點物件名稱，並快取於 Sap2000 物件內。
+    同一群組於各方向與質量查詢中只需向 SAP2000 讀取一次。
+
+    參數:
+        sapobj (Sap2000): 已開啟模型的 Sap2000 物件。
+        gp_list (list): 群組名稱列表。
+
+    回傳:
+        dict: {群組名稱: [點物件名稱]}。
+    """
+    for gp in gp_list:
+        if gp not in sapobj.group_members:
+            res = sapobj.groupdef_getassignments(gp)
+            sapobj.group_members[gp] = [name for objtype, name in zip(res[2], res[3]) if objtype == 1]
+
+    return {gp: sapobj.group_members[gp] for gp in gp_list}
+
+def read_joint_elements(sapobj):
+    """
+    由分析模型的物件與元素資料表讀取各物件的點元素。
+    框架與面物件對應其元素的端點，包含網格自動分割產生的節點。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+
+    回傳:
+        dict: {(物件型態, 物件名稱): [點元素名稱]}。
+
+    例外:
+        RuntimeError: 無法讀取點物件的資料表；框架與面物件的資料表無法讀取時視為模型沒有該類物件。
+    """
+    elements = {}
+    for objtype, (table, obj_field, elm_fields) in ELEMENT_TABLES.items():
+        ret = sapobj.databasetables_GetTableForDisplayArray(table, ALL_GROUP)
+        if ret[0] != 0:
+            if objtype == 1:
+                raise RuntimeError(f"無法讀取資料表 {table}")
+            continue
+        fields = list(ret[2])
+        num_fields = len(fields)
+        col_obj = fields.index(obj_field)
+        cols = [fields.index(field) for field in elm_fields if field in fields]
+        data = list(ret[4])
+        for i in range(ret[3]):
+            record = data[i * num_fields:(i + 1) * num_fields]
+            if not record[col_obj]:
+                continue
+            names = elements.setdefault((objtype, record[col_obj]), {})
+            names.update(dict.fromkeys(record[col] for col in cols if record[col]))
+    return {item: list(names) for item, names in elements.items()}
+
+def get_joint_elements(sapobj):
+    """
+    取得各物件的點元素索引，並快取於 Sap2000 物件內直到下次分析。
+    無法讀取物件與元素資料表時（例如舊版 SAP2000 無此介面），僅以點物件對應同名點元素。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+
+    回傳:
+        dict: {(物件型態, 物件名稱): [點元素名稱]}。
+    """
+    if sapobj.joint_elements is None:
+        try:
+            sapobj.joint_elements = read_joint_elements(sapobj)
+        except Exception as e:
+            print(f"[警告]：無法讀取物件與元素資料表（{e}），群組成員僅含點物件，不含網格自動分割產生的節點。")
+            points = get_group_members(sapobj, [ALL_GROUP])[ALL_GROUP]
+            sapobj.joint_elements = {(1, name): [name] for name in points}
+    return sapobj.joint_elements
+
+def get_group_elements(sapobj, gp_list):
+    """
+    取得群組內所有物件的點元素名稱，與 SAP2000 以群組讀取結果（GroupElm）的節點相同，
+    並快取於 Sap2000 物件內直到下次分析。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+        gp_list (list): 群組名稱列表。
+
+    回傳:
+        dict: {群組名稱: [點元素名稱]}。
+    """
+    elements = get_joint_elements(sapobj)
+    for gp in gp_list:
+        if gp not in sapobj.group_elements:
+            res = sapobj.groupdef_getassignments(gp)
+            names = {}
+            for item in zip(res[2], res[3]):
+                names.update(dict.fromkeys(elements.get(item, [])))
+            sapobj.group_elements[gp] = list(names)
+
+    return {gp: sapobj.group_elements[gp] for gp in gp_list}
+
+def warn_ungrouped_joints(sapobj, node_names):
+    """
+    檢查單次讀取的結果中無法對應至任何物件的節點，每次分析只提出一次警告。
+    這些節點不屬於任何群組，不計入週期與地震力。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+        node_names (sequence): 結果中的點元素名稱。
+
+    回傳:
+        list: 無法對應的點元素名稱。
+    """
+    if sapobj.ungrouped_joints is not None:
+        return sapobj.ungrouped_joints
+
+    grouped = set()
+    for names in get_joint_elements(sapobj).values():
+        grouped.update(names)
+    sapobj.ungrouped_joints = [name for name in dict.fromkeys(node_names) if name not in grouped]
+    if sapobj.ungrouped_joints:
+        print(f"[警告]：結果中有 {len(sapobj.ungrouped_joints)} 個節點不屬於任何群組"
+              f"（例如 {'、'.join(sapobj.ungrouped_joints[:5])}），可能為網格分割產生的節點，未計入週期與地震力；"
+              "請將 RESULTS_FETCH_MODE 設為 'group' 逐群組讀取。")
+    return sapobj.ungrouped_joints
+
+def read_group_info(sapobj, progress=None):
+    """
+    由 SAP2000 讀取模型的群組名稱列表與各群組的點物件。
+
+    參數:
+        sapobj (Sap2000): 已開啟模型的 Sap2000 物件。
+        progress (callable): progress(已完成群組數, 群組總數)。
+
+    回傳:
+        dict: groups（群組名稱列表）與 members（{群組名稱: [點物件名稱]}）。
+    """
+    groups = list(sapobj.groupdef_getnamelist()[2])
+    members = {}
+    for i, gp in enumerate(groups):
+        members.update(get_group_members(sapobj, [gp]))
+        if progress is not None:
+            progress(i + 1, len(groups))
+    return {'groups': groups, 'members': members}
+
+def load_group_info(model_path, session=None, use_cache=True, progress=None, allow_sap=True):
+    """
+    取得模型的群組名稱列表與各群組的點物件，優先使用模型旁的快取。
+
+    快取鍵值為模型內容雜湊（同一程序內以修改時間與大小判斷是否需重新計算雜湊），
+    命中時不啟動 SAP2000。模型為 .s2k/.$2k 文字檔或同路徑有較新的文字匯出檔時，以 s2kio 離線讀取；
+    否則於工作階段的 COM 執行緒讀取，SAP2000 保持開啟供後續計算沿用。
+    工作階段中已開啟同一模型時一律由 SAP2000 讀取（可能含未存檔的修改），不以目前檔案的鍵值寫入快取；
+    SAP2000 關閉存檔後，群組未再變更者以存檔後的鍵值寫入。
+    本函式可於 COM 執行緒以外的背景執行緒呼叫，SAP2000 忙碌時等候其完成。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        session (SapSession): 若提供，則由工作階段開啟模型；否則開啟後關閉 SAP2000。
+        use_cache (bool): 是否讀寫快取。
+        progress (callable): progress(已完成群組數, 群組總數)，由讀取 SAP2000 的執行緒呼叫。
+        allow_sap (bool): 無快取及文字檔時是否開啟 SAP2000 讀取；False 時拋出 ValueError。
+
+    回傳:
+        dict: groups（群組名稱列表）與 members（{群組名稱: [點物件名稱]}）。
+
+    例外:
+        FileNotFoundError: 找不到模型檔案。
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"找不到模型檔案 -> {model_path}")
+
+    cache = None
+    key = None
+    label = os.path.basename(model_path)
+    live = session is not None and session.has_model(model_path)
+    if use_cache:
+        cache = ResultsCache(model_path)
+        key = make_group_key(model_path)
+        if not live:
+            data = cache.load(key)
+            if data is not None:
+                print("[訊息]：已由快取讀取群組列表。")
+                return data
+
+    def unchanged(data):
+        def check(sapobj):
+            # 群組成員索引快取可能早於使用者的修改，重新讀取後比較
+            sapobj.group_members = {}
+            return read_group_info(sapobj) == data
+        return check
+
+    def read_from_sap():
+        sapmodel = open_sap_model(model_path, session)
+        data = read_group_info(sapmodel, progress)
+        if cache is not None:
+            sapmodel.after_save.append((
+                None if session is None else unchanged(data),
+                lambda: cache.save(make_group_key(model_path), data, label=label),
+            ))
+        if session is None:
+            sapmodel.closeModel()
+        return data
+
+    text_path = None if live else find_text_export(model_path)
+    if text_path is not None:
+        print(f"[訊息]：由文字檔讀取群組列表：{text_path}")
+        model = read_s2k_model(text_path)
+        data = {'groups': model['groups'], 'members': model['members']}
+    elif not allow_sap:
+        raise ValueError(
+            f"找不到群組成員來源：{model_path} 沒有群組快取，也沒有同檔名且不早於模型的 .s2k/.$2k 匯出檔；"
+            "請由 SAP2000 匯出文字檔，或先以 SAP2000 讀取一次群組列表"
+        )
+    elif session is not None:
+        data = session.call(read_from_sap)
+    else:
+        data = read_from_sap()
+
+    if cache is not None and not live:
+        cache.save(key, data, label=label)
+    return data
+
+def fetch_joint_results(sapobj, result_func, gp_list, fetch_mode):
+    """
+    以單次 COM 呼叫讀取所有相關節點的結果。
+
+    參數:
+        sapobj (Sap2000): 已開啟模型的 Sap2000 物件。
+        result_func (callable): results_JointDispl 或 results_AssembledJointMass。
+        gp_list (list): 群組名稱列表，'selection' 模式時用於選取物件。
+        fetch_mode (str): 'all' 以內建 ALL 群組讀取全部節點；'selection' 先選取群組再讀取已選取節點。
+
+    回傳:
+        tuple: result_func 的原始回傳值。
+    """
+    if fetch_mode == 'all':
+        return result_func(ALL_GROUP, 2)
+    if fetch_mode == 'selection':
+        sapobj.clearSelection()
+        for gp in gp_list:
+            sapobj.selectGroup(gp)
+        res = result_func('', 3)
+        sapobj.clearSelection()
+        return res
+    raise ValueError(f"未知的結果讀取模式：{fetch_mode}")
+
+def split_results_by_group(sapobj, gp_list, node_names, node_values, data_key):
+    """
+    依群組的點元素，將整批節點結果拆分至各群組。
+    群組的點元素含框架與面物件自動分割產生的節點，見 get_group_elements；
+    結果中無法對應至任何物件的節點提出警告，見 warn_ungrouped_joints。
+
+    參數:
+        sapobj (Sap2000): 已開啟模型的 Sap2000 物件。
+        gp_list (list): 群組名稱列表。
+        node_names (sequence): 結果中的點元素名稱。
+        node_values (sequence): 對應 node_names 的結果數值。
+        data_key (str): 輸出數值欄位名稱，'node_disp' 或 'node_mass'。
+
+    回傳:
+        dict: 與 get_disp / get_mass 相同格式的字典。
+    """
+    members = get_group_elements(sapobj, gp_list)
+    warn_ungrouped_joints(sapobj, node_names)
+    row_by_node = {name: i for i, name in enumerate(node_names)}
+
+    split = {}
+    for gp in gp_list:
+        rows = [row_by_node[node] for node in members[gp] if node in row_by_node]
+        split[gp] = {}
+        split[gp]['node_num'] = len(rows)
+        split[gp]['node_name'] = [node_names[i] for i in rows]
+        split[gp][data_key] = [node_values[i] for i in rows]
+
+    return split
+
+@profile_stage('get_disp')
+def get_disp(sapobj, lc_dir, gp_list, disp_note, fetch_mode='group'):
+    """
+    讀取指定載重案例下各群組的節點位移。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+        lc_dir (str): 載重案例名稱。
+        gp_list (list): 群組名稱列表。
+        disp_note (int): results_JointDispl 回傳值中欲取用的欄位索引。
+        fetch_mode (str): 'group' 逐群組讀取；'all' / 'selection' 單次讀取後於本地依群組拆分。
+    """
+    jointdisp = {}
+    sapobj.results_Setup_DeselectAllCasesAndCombosForOutput()
+    sapobj.results_Setup_SetCaseSelectedForOutput(lc_dir, Selected=True)
+
+    if fetch_mode != 'group':
+        res = fetch_joint_results(sapobj, sapobj.results_JointDispl, gp_list, fetch_mode)
+        return split_results_by_group(sapobj, gp_list, res[3], res[disp_note], 'node_disp')
+
+    for lcg in gp_list:
+        res = None
+        res = sapobj.results_JointDispl(lcg, ItemTypeElm=2)
+        jointdisp[lcg] = {}
+        jointdisp[lcg]['node_num'] = res[1]
+        jointdisp[lcg]['node_name'] = res[3]
+        jointdisp[lcg]['node_disp'] = res[disp_note]
+        
+    return jointdisp
+
+@profile_stage('get_disp')
+def get_disp_components(sapobj, lc_dir, gp_list, disp_notes, fetch_mode='group'):
+    """
+    單次讀取指定載重案例的節點位移，並取出多個位移分量。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+        lc_dir (str): 載重案例名稱。
+        gp_list (list): 群組名稱列表。
+        disp_notes (list): results_JointDispl 回傳值中欲取用的欄位索引，例如 [7, 8]。
+        fetch_mode (str): 同 get_disp。
+
+    回傳:
+        dict: {欄位索引: get_disp 格式的字典}。
+    """
+    sapobj.results_Setup_DeselectAllCasesAndCombosForOutput()
+    sapobj.results_Setup_SetCaseSelectedForOutput(lc_dir, Selected=True)
+
+    if fetch_mode != 'group':
+        res = fetch_joint_results(sapobj, sapobj.results_JointDispl, gp_list, fetch_mode)
+        return {
+            note: split_results_by_group(sapobj, gp_list, res[3], res[note], 'node_disp')
+            for note in disp_notes
+        }
+
+    components = {note: {} for note in disp_notes}
+    for lcg in gp_list:
+        res = sapobj.results_JointDispl(lcg, ItemTypeElm=2)
+        for note in disp_notes:
+            components[note][lcg] = {'node_num': res[1], 'node_name': res[3], 'node_disp': res[note]}
+    return components
+
+@profile_stage('get_mass')
+def get_mass(sapobj, gp_list, disp_note, fetch_mode='group'):
+    """
+    讀取各群組的節點組裝質量。
+
+    參數:
+        sapobj (Sap2000): 已完成分析的 Sap2000 物件。
+        gp_list (list): 群組名稱列表。
+        disp_note (int): results_AssembledJointMass 回傳值中欲取用的欄位索引。
+        fetch_mode (str): 'group' 逐群組讀取；'all' / 'selection' 單次讀取後於本地依群組拆分。
+    """
+    jointmass = {}
+    sapobj.results_Setup_DeselectAllCasesAndCombosForOutput()
+
+    if fetch_mode != 'group':
+        res = fetch_joint_results(sapobj, sapobj.results_AssembledJointMass_cached, gp_list, fetch_mode)
+        return split_results_by_group(sapobj, gp_list, res[2], res[disp_note], 'node_mass')
+
+    for gp in gp_list:
+        res = sapobj.results_AssembledJointMass_cached(gp, 2)
+        jointmass[gp] = {}
+        jointmass[gp]['node_num'] = res[1]
+        jointmass[gp]['node_name'] = res[2]
+        jointmass[gp]['node_mass'] = res[disp_note]
+        
+    return jointmass
+
+@session_thread
+def collect_joint_results(model_path, groups_x, groups_y, groups_z, session=None, use_cache=True, results_path=None):
+    """
+    取得三方向各群組的節點位移與組裝質量，優先使用模型旁的結果快取。
+
+    快取鍵值包含模型檔案內容雜湊、單位、單位載重案例定義與群組列表；命中時不啟動 SAP2000。
+    若工作階段中已開啟同一模型，則以 SAP2000 內的模型為準（可能含未存檔的修改），不以目前檔案的鍵值寫入快取。
+    SAP2000 關閉時會存檔而改變檔案內容，屆時單位載重結果仍有效者再以存檔後的鍵值寫入，供下次執行命中。
+    提供 results_path 時改由 SAP2000 匯出的結果檔讀取，群組成員由群組快取或 .s2k/.$2k 匯出檔取得，
+    不使用結果快取，也不啟動 SAP2000；兩者皆無時拋出 ValueError。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups_x (list): X 方向群組名稱列表。
+        groups_y (list): Y 方向群組名稱列表。
+        groups_z (list): Z 方向群組名稱列表。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000。
+        use_cache (bool): 是否讀寫結果快取。
+        results_path (str): 含 UNIT-X/Y/Z 的 "Joint Displacements" 與 "Assembled Joint Masses" 匯出檔
+            （文字、Excel 或 Access），見 resultio.read_joint_results。
+
+    回傳:
+        tuple: (sapmodel, jointdisp, jointmass)
+            - sapmodel (Sap2000): 已完成分析的 Sap2000 物件，由快取或結果檔讀取時為 None。
+            - jointdisp (dict): {'X': ..., 'Y': ..., 'Z': ...}，各為 get_disp 格式。
+            - jointmass (dict): {'X': ..., 'Y': ..., 'Z': ...}，各為 get_mass 格式。
+    """
+    if results_path is not None:
+        info = load_group_info(model_path, use_cache=use_cache, allow_sap=False)
+        with stage('read_results'):
+            results = read_joint_results(results_path)
+            jointdisp, jointmass = results_to_joint_data(results, info['members'], groups_x, groups_y, groups_z)
+        print(f"[訊息]：已由結果檔讀取節點位移與質量：{results_path}")
+        return None, jointdisp, jointmass
+
+    cache = None
+    key = None
+    live = session is not None and session.has_model(model_path)
+    if use_cache and os.path.exists(model_path):
+        cache = ResultsCache(model_path)
+        unit_cases = {lc: ["Accel", dir_name, UNIT_ACCEL] for lc, dir_name in UNIT_LOAD_CASES.items()}
+        key_args = (MODEL_UNITS, unit_cases, {'X': groups_x, 'Y': groups_y, 'Z': groups_z}, RESULTS_FETCH_MODE)
+        # 分析前先存檔會改變檔案內容，鍵值須於分析前計算
+        key = make_key(model_path, *key_args)
+        if not live:
+            data = cache.load(key)
+            if data is not None:
+                print("[訊息]：已由結果快取讀取節點位移與質量，略過 SAP2000 分析。")
+                return None, data['disp'], data['mass']
+
+    sapmodel = setup_and_run_sap_analysis(model_path, session)
+    # 由 SAP2000 重新讀取的結果可能含未存檔的修改，工作階段中既有的分配基準不再可靠
+    if session is not None:
+        session.eqforce_basis = None
+
+    jointdisp = {
+        'X': get_disp(sapmodel, 'UNIT-X', groups_x, 7, RESULTS_FETCH_MODE),
+        'Y': get_disp(sapmodel, 'UNIT-Y', groups_y, 8, RESULTS_FETCH_MODE),
+        'Z': get_disp(sapmodel, 'UNIT-Z', groups_z, 9, RESULTS_FETCH_MODE),
+    }
+    jointmass = {
+        'X': get_mass(sapmodel, groups_x, 3, RESULTS_FETCH_MODE),
+        'Y': get_mass(sapmodel, groups_y, 4, RESULTS_FETCH_MODE),
+        'Z': get_mass(sapmodel, groups_z, 5, RESULTS_FETCH_MODE),
+    }
+
+    if cache is not None:
+        data = {'disp': jointdisp, 'mass': jointmass}
+        label = os.path.basename(model_path)
+        if not live:
+            cache.save(key, data, label=label)
+        sapmodel.after_save.append(
+            (unit_results_current, lambda: cache.save(make_key(model_path, *key_args), data, label=label))
+        )
+
+    return sapmodel, jointdisp, jointmass
+
+def cal_period(jointdisp, jointmass, group):
+    """
+    以 Rayleigh 法計算各群組的週期，逐節點以字典配對位移與質量。
+    此為參考計算路徑，流程中使用結果相同的 eqengine.cal_period_vec。
+
+    參數:
+        jointdisp (dict): get_disp 的回傳值。
+        jointmass (dict): get_mass 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+
+    回傳:
+        dict: {群組: 結果}，結果含 period、beta、zeta 及 nodes
+            （NodeTable，列為位移與質量節點的聯集，欄位 mass、disp，缺少的值為 NaN）。
+    """
+    g = 9.81  # 重力加速度，與前面設定的 'Accel' 載重一致
+    dict_period = {}
+    for gp in group:
+        dict_disp = jointdisp[gp]
+        dict_mass = jointmass[gp]
+
+        # 依據節點名稱('node_name')將位移與質量進行配對。
+        # 這樣可以確保即使節點順序不同也能正確匹配。
+        disp_by_node = dict(zip(dict_disp['node_name'], dict_disp['node_disp']))
+        mass_by_node = dict(zip(dict_mass['node_name'], dict_mass['node_mass']))
+
+        # 針對共通節點計算 位移 * 質量
+        wu = {node: disp_by_node[node] * mass_by_node[node] for node in disp_by_node.keys() & mass_by_node.keys()}
+        # 針對共通節點計算 位移 * 位移 * 質量
+        wuu = {node: disp_by_node[node] * disp_by_node[node] * mass_by_node[node] for node in disp_by_node.keys() & mass_by_node.keys()}
+
+        beta = abs(sum(wu.values()))
+        zeta = sum(wuu.values())
+
+        # 根據 Rayleigh's method 計算週期
+        # T = 2 * pi * sqrt( (sum(m*u^2)) / (g * sum(m*u)) )
+        period = 2 * math.pi * math.sqrt(zeta / (g * beta))
+
+        dict_period[gp] = {}
+        dict_period[gp]['period'] = period
+        dict_period[gp]['beta'] = beta
+        dict_period[gp]['zeta'] = zeta
+        dict_period[gp]['nodes'] = NodeTable.from_dicts(mass=mass_by_node, disp=disp_by_node)
+
+    return dict_period
+
+def merge_group_data(data_dict, new_group_name):
+    """
+    將來自多個群組的資料字典合併為單一群組。
+    處理重複節點時，會保留第一個遇到的節點資料。
+
+    Args:
+        data_dict (dict): 來自 get_disp 或 get_mass 的字典，例如 {'Pier1': {...}, 'Pier2': {...}}。
+        new_group_name (str): 新合併群組的名稱。
+        
+    Returns:
+        dict: 包含單一合併群組條目的字典，例如 {'Piers_Combined': {...}}。
+    """
+    if not data_dict:
+        return {new_group_name: {'node_num': 0, 'node_name': [], 'node_data': []}}
+
+    # 確定資料是位移('node_disp')還是質量('node_mass')
+    first_group_data = next(iter(data_dict.values()))
+    data_key = 'node_disp' if 'node_disp' in first_group_data else 'node_mass'
+
+    all_node_names = []
+    all_node_data = []
+
+    for group_data in data_dict.values():
+        all_node_names.extend(group_data.get('node_name', []))
+        all_node_data.extend(group_data.get(data_key, []))
+
+    # 透過字典來處理重複節點，保留第一個出現的值
+    unique_nodes = {}
+    for name, data_val in zip(all_node_names, all_node_data):
+        if name not in unique_nodes:
+            unique_nodes[name] = data_val
+            
+    merged_data = {
+        'node_num': len(unique_nodes),
+        'node_name': list(unique_nodes.keys()),
+        data_key: list(unique_nodes.values())
+    }
+    
+    return {new_group_name: merged_data}
+
+def node_table_frame(nodes, columns, rows=None):
+    """
+    將 NodeTable 轉為依節點名稱排序的 DataFrame，作為 Excel 明細工作表。
+
+    參數:
+        nodes (NodeTable): 群組結果表。
+        columns (list): [(Excel 欄名, 結果表欄位)]，結果表中不存在的欄位略過。
+        rows (ndarray): 輸出的列索引，None 表示全部節點。
+
+    回傳:
+        DataFrame: 第一欄為 'Node'，其餘依 columns 順序排列，缺值為空白。
+    """
+    if rows is None:
+        rows = np.arange(len(nodes))
+    names = [nodes.names[i] for i in rows]
+    order = np.asarray(sorted(range(len(names)), key=lambda i: node_sort_key(names[i])), dtype=np.intp)
+    rows = np.asarray(rows, dtype=np.intp)[order]
+
+    frame = {'Node': [names[i] for i in order]}
+    for label, key in columns:
+        if key in nodes:
+            frame[label] = nodes[key][rows]
+    return pd.DataFrame(frame)
+
+@profile_stage('export_excel')
+def export_results_to_excel(period_x, period_y, period_z, output_path):
+    """
+    將計算結果彙整並輸出至包含多個工作表的 Excel 檔案。
+
+    - 'Period Calculation': 週期計算總覽。
+    - 'Group-Direction': 各群組與方向的詳細節點質量與位移。
+
+    參數:
+        period_x (dict): X 方向的週期計算結果。
+        period_y (dict): Y 方向的週期計算結果。
+        period_z (dict): Z 方向的週期計算結果。
+        output_path (str): Excel 檔案的完整輸出路徑。
+    """
+    # 1. 彙整總覽結果
+    all_results = []
+    for direction, period_data in [('X', period_x), ('Y', period_y), ('Z', period_z)]:
+        for group_name, data in period_data.items():
+            all_results.append({
+                'Group': group_name,
+                'Direction': direction,
+                'Period (s)': data['period'],
+                'Sum(wu)': data['beta'],
+                'Sum(wuu)': data['zeta']
+            })
+    df_results = pd.DataFrame(all_results)
+
+    # 2. 使用 pd.ExcelWriter 寫入多個工作表
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        # 2a. 寫入週期計算總表
+        df_results.to_excel(writer, index=False, sheet_name='Period Calculation', float_format="%.4f")
+
+        # 2b. 遍歷每個方向和群組，寫入詳細的 disp 和 mass 工作表
+        for direction, period_data in [('X', period_x), ('Y', period_y), ('Z', period_z)]:
+            for group_name, data in period_data.items():
+                nodes = data['nodes']
+                if not len(nodes):
+                    continue
+
+                df_details = node_table_frame(nodes, [('Mass', 'mass'), ('Displacement', 'disp')])
+                sheet_name = f"{group_name}-{direction}"[:31]
+                df_details.to_excel(writer, index=False, sheet_name=sheet_name, float_format="%.6e")
+
+    print(f"[訊息]：計算結果已成功匯出至：{output_path}")
+
+def periods_from_results(jointdisp, jointmass, groups_x, groups_y):
+    """
+    由各方向節點位移與質量計算週期，Z 方向所有群組合併為單一群組 'StructZdir'。
+
+    參數:
+        jointdisp, jointmass (dict): collect_joint_results 回傳的各方向位移與質量。
+        groups_x, groups_y (list): X、Y 方向群組名稱列表。
+
+    回傳:
+        tuple: (period_x, period_y, period_z)。
+    """
+    jointdisp_x = jointdisp['X']
+    jointdisp_y = jointdisp['Y']
+    jointmass_x = jointmass['X']
+    jointmass_y = jointmass['Y']
+
+    # 對於 Z 方向，獲取結果後合併為一個群組
+    raw_jointdisp_z = jointdisp['Z']
+    raw_jointmass_z = jointmass['Z']
+    merged_z_group_name = 'StructZdir'
+    jointdisp_z = merge_group_data(raw_jointdisp_z, merged_z_group_name)
+    jointmass_z = merge_group_data(raw_jointmass_z, merged_z_group_name)
+
+    with stage('cal_period'):
+        period_x = cal_period_vec(jointdisp_x, jointmass_x, groups_x)
+        period_y = cal_period_vec(jointdisp_y, jointmass_y, groups_y)
+        # Z 方向週期計算使用合併後的單一群組
+        period_z = cal_period_vec(jointdisp_z, jointmass_z, [merged_z_group_name])
+
+    print("[訊息]：週期計算完成！")
+    return period_x, period_y, period_z
+
+@session_thread
+@profile_run('01_period_profile.json', model_output_path)
+def run_analysis_period(model_path, groups_x, groups_y, groups_z, session=None, use_cache=True, results_path=None):
+    """
+    執行完整的 SAP2000 週期分析流程，並回傳結果。
+    執行完整的 SAP2000 週期分析與結果匯出流程。
+
+    1. 開啟模型並執行分析。
+    2. 提取位移與質量，計算各群組與方向的週期。
+    3. 將結果印至主控台並匯出至 Excel 檔案。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups_x (list): 要在 X 方向分析的群組名稱列表。
+        groups_y (list): 要在 Y 方向分析的群組名稱列表。
+        groups_z (list): 要在 Z 方向分析的群組名稱列表。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000，結束後不關閉。
+        use_cache (bool): 是否使用模型旁的結果快取，命中時不啟動 SAP2000。
+        results_path (str): SAP2000 匯出的結果檔，提供時不啟動 SAP2000，見 collect_joint_results。
+
+    回傳:
+        tuple: (period_x, period_y, period_z)
+            - period_x (dict): X 方向的週期計算結果。
+            - period_y (dict): Y 方向的週期計算結果。
+            - period_z (dict): Z 方向的週期計算結果。
+    """
+    annotate_backend(session, 'run_analysis_period', model_path=model_path,
+                     groups_x=groups_x, groups_y=groups_y, groups_z=groups_z, use_cache=use_cache,
+                     results_path=results_path)
+
+    # --- 1. 開啟模型並執行分析，並獲取位移與質量 ---
+    sapmodel, jointdisp, jointmass = collect_joint_results(
+        model_path, groups_x, groups_y, groups_z, session, use_cache, results_path
+    )
+
+    # --- 2. 計算週期 ---
+    period_x, period_y, period_z = periods_from_results(jointdisp, jointmass, groups_x, groups_y)
+
+    # 關閉 SAP2000
+    #sapmodel.file_Save(model_path)
+    if session is None and sapmodel is not None:
+        sapmodel.closeModel()
+
+
+    # --- 3. 輸出週期結果 ---
+    # print("\n--- Calculated Periods ---")
+    # for group_name, data in period_x.items():
+    #     print(f"Direction: X, Group: {group_name:<10} Period: {data['period']:.4f} s")
+    # for group_name, data in period_y.items():
+    #     print(f"Direction: Y, Group: {group_name:<10} Period: {data['period']:.4f} s")
+    # for group_name, data in period_z.items():
+    #     print(f"Direction: Z, Group: {group_name:<10} Period: {data['period']:.4f} s")
+
+    output_excel_path = model_output_path(model_path, '01_period_results.xlsx')
+    export_results_to_excel(period_x, period_y, period_z, output_excel_path)
+    print("[訊息]：計算輸出完成！")
+    return period_x, period_y, period_z
+
+def cal_eqforce(jointdisp, jointmass, group, eqfactor, vpa):
+    """
+    依第一振態分配各群組的節點地震力，逐節點以字典配對位移與質量。
+    此為參考計算路徑，流程中使用結果相同的 eqengine.cal_eqforce_vec。
+
+    參數:
+        jointdisp (dict): get_disp 的回傳值。
+        jointmass (dict): get_mass 的回傳值。
+        group (list): 欲計算的群組名稱列表。
+        eqfactor (list of float): 與 group 順序對應的地震力係數。
+        vpa (float): 分配力總和須達總基底剪力的比例下限。
+
+    回傳:
+        dict: {群組: 結果}，結果含 beta、zeta、eqfactor、TotalMass、BaseShear 及 nodes
+            （NodeTable，列為位移與質量節點的聯集，欄位 mass、disp、wu、wuu、eqforce_origin、eqforce；
+            wu 以後的欄位僅共通節點有值，其餘為 NaN）。
+    """
+    dict_eqforce = {}
+    for gp in group:
+        dict_disp = jointdisp[gp]
+        dict_mass = jointmass[gp]
+
+        # 依據節點名稱('node_name')將位移與質量進行配對。
+        # 這樣可以確保即使節點順序不同也能正確匹配。
+        disp_by_node = dict(zip(dict_disp['node_name'], dict_disp['node_disp']))
+        mass_by_node = dict(zip(dict_mass['node_name'], dict_mass['node_mass']))
+
+        # 針對共通節點計算 位移 * 質量
+        wu = {node: disp_by_node[node] * mass_by_node[node] for node in disp_by_node.keys() & mass_by_node.keys()}
+        # 針對共通節點計算 位移 * 位移 * 質量
+        wuu = {node: disp_by_node[node] * disp_by_node[node] * mass_by_node[node] for node in disp_by_node.keys() & mass_by_node.keys()}
+
+        beta = abs(sum(wu.values()))
+        zeta = sum(wuu.values())
+        all_mass = sum(mass_by_node.values())
+        baseshear = all_mass * 9.81 * eqfactor[group.index(gp)]
+        baseshear_vpa = baseshear * vpa
+
+        # 計算節點地震力
+        # [sum(wu)/sum(wuu)]*wu*(V/W) = (beta/zeta)*wu*eqfactor
+        eqf_temp = {node: (beta/zeta) * eqfactor[group.index(gp)]*9.81 * mass_by_node[node] * disp_by_node[node] for node in disp_by_node.keys() & mass_by_node.keys()}
+
+        sumeqf = abs(sum(eqf_temp.values()))
+        if sumeqf >= baseshear_vpa:
+            eqf = eqf_temp
+        else:
+            print("[警告]：第一振態分佈力總和未達總基底剪力{}%！".format(vpa*100))
+            scaling_factor = baseshear_vpa / sumeqf
+            eqf = {node: force * scaling_factor for node, force in eqf_temp.items()}
+
+        dict_eqforce[gp] = {}
+        dict_eqforce[gp]['beta'] = beta
+        dict_eqforce[gp]['zeta'] = zeta
+        dict_eqforce[gp]['eqfactor'] = eqfactor[group.index(gp)]
+        dict_eqforce[gp]['TotalMass'] = all_mass
+        dict_eqforce[gp]['BaseShear'] = baseshear
+        dict_eqforce[gp]['nodes'] = NodeTable.from_dicts(
+            mass=mass_by_node, disp=disp_by_node, wu=wu, wuu=wuu, eqforce_origin=eqf_temp, eqforce=eqf
+        )
+
+    return dict_eqforce
+
+def cal_eqvforce(jointdisp, jointmass, group, eqfactor):
+    dict_eqforce = {}
+    # 默認第一組為上構，第二組為下構
+    for gp in group:
+        dict_mass = jointmass[gp]
+        mass_by_node = dict(zip(dict_mass['node_name'], dict_mass['node_mass']))
+        nodes = NodeTable.from_dicts(mass=mass_by_node)
+        # 計算節點地震力
+        eqf = eqfactor[group.index(gp)]*9.81 * nodes['mass']
+
+        dict_eqforce[gp] = {}
+        dict_eqforce[gp]['eqfactor'] = eqfactor[group.index(gp)]
+        dict_eqforce[gp]['nodes'] = nodes.with_columns(eqforce=eqf)
+
+    return dict_eqforce
+
+def merge_force_data(force_data_dict):
+    """
+    將來自多個群組的節點地震力合併為單一字典，後面的群組覆蓋前面群組的重複節點。
+
+    Args:
+        force_data_dict (dict): 一個字典，其鍵為群組名稱，值為 nodes 結果表含 'eqforce' 欄位的字典。
+                                e.g., {'Group1': {'nodes': NodeTable(['Node1'], eqforce=[10])}, ...}
+
+    Returns:
+        dict: 一個包含所有合併後節點力的單一字典。
+                e.g., {'Node1': 10, 'Node2': 20}
+    """
+    merged_forces = {}
+    for group_data in force_data_dict.values():
+        nodes = group_data.get('nodes')
+        if nodes is not None and 'eqforce' in nodes:
+            merged_forces.update(nodes.to_dict('eqforce'))
+    return merged_forces
+
+@profile_stage('export_excel')
+def export_eqforce_to_excel(eqforce_x, eqforce_y, eqforce_z, output_path):
+    """
+    將計算出的地震力結果彙整並輸出至包含多個工作表的 Excel 檔案。
+
+    - 'EQForce Summary': 各群組與方向的總地震力。
+    - 'Group-Direction': 各群組與方向的詳細節點力、質量與位移。
+
+    參數:
+        eqforce_x (dict): X 方向的地震力計算結果。
+        eqforce_y (dict): Y 方向的地震力計算結果。
+        eqforce_z (dict): Z 方向的地震力計算結果。
+        output_path (str): Excel 檔案的完整輸出路徑。
+    """
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        # 1. 彙整總覽結果
+        summary_data = []
+        for direction, force_data in [('X', eqforce_x), ('Y', eqforce_y), ('Z', eqforce_z)]:
+            for group_name, data in force_data.items():
+                total_force = data['nodes'].sum('eqforce')
+                summary_data.append({
+                    'Group': group_name,
+                    'Direction': direction,
+                    'Total Force': total_force,
+                    'EQ Factor': data.get('eqfactor'),
+                    'Sum(wu) (beta)': data.get('beta'),
+                    'Sum(wuu) (zeta)': data.get('zeta'),
+                    'Total Mass': data.get('TotalMass'),
+                    'Base Shear': data.get('BaseShear')
+                })
+        df_summary = pd.DataFrame(summary_data)
+        # 調整總覽表的欄位順序
+        summary_cols = ['Group', 'Direction', 'Total Force', 'EQ Factor', 'Sum(wu) (beta)', 'Sum(wuu) (zeta)', 'Total Mass', 'Base Shear']
+        # 篩選掉值全為 None 的欄位 (例如 Z 方向沒有 beta, zeta)
+        df_summary = df_summary.dropna(axis=1, how='all')
+        # 確保欄位順序正確
+        ordered_cols = [col for col in summary_cols if col in df_summary.columns]
+        df_summary[ordered_cols].to_excel(writer, sheet_name='EQForce Summary', index=False, float_format="%.4f")
+
+        # 2. 遍歷每個方向和群組，寫入詳細的節點力工作表
+        for direction, force_data in [('X', eqforce_x), ('Y', eqforce_y), ('Z', eqforce_z)]:
+            for group_name, data in force_data.items():
+                nodes = data['nodes']
+                # 僅輸出有地震力的節點；Z 方向沒有位移及 wu、wuu 等中間計算值
+                rows = np.flatnonzero(nodes.valid('eqforce'))
+                if not len(rows):
+                    continue
+
+                df_details = node_table_frame(nodes, EQFORCE_DETAIL_COLUMNS, rows)
+
+                sheet_name = f"{group_name}-{direction}"[:31]
+                df_details.to_excel(writer, index=False, sheet_name=sheet_name, float_format="%.6e")
+
+    print(f"[訊息]：地震力計算結果已成功匯出至：{output_path}")
+
+def define_eq_load_cases(sapmodel, cases):
+    """
+    建立尚未存在的地震載重模式（QUAKE）及同名線性靜力載重案例。
+
+    參數:
+        sapmodel (Sap2000): 已開啟模型的 Sap2000 物件。
+        cases (list): 載重模式名稱列表。
+    """
+    lc_list = sapmodel.loadcases_getnamelist()
+    for case in cases:
+        if case not in lc_list[2]:
+            sapmodel.define_LoadPatterns_Add(case,5)
+            sapmodel.define_LoadCases_StaticLinear_SetCase(case)
+            sapmodel.define_LoadCases_StaticLinear_SetLoads(case, 1, ["Load"], [case], [1])
+
+def selected_points(sapmodel, group):
+    """
+    選取群組並回傳被選取的點物件名稱（依 SAP2000 回傳順序）。
+
+    參數:
+        sapmodel (Sap2000): 已開啟模型的 Sap2000 物件。
+        group (list): 群組名稱列表。
+
+    回傳:
+        list: 點物件名稱。
+    """
+    sapmodel.clearSelection()
+    for sg in group:
+        sapmodel.selectGroup(sg)
+    res = sapmodel.getSelected()
+    objname = list(res[3])  # res[3]為object name, res[2]為object type
+    objtype = list(res[2])
+    return [objn for i, objn in enumerate(objname) if objtype[i] == 1]
+
+def build_joint_loads(sapmodel, group, EQF, dof):
+    """
+    選取群組內的點物件，組成待施加的節點力列表。
+
+    參數:
+        sapmodel (Sap2000): 已開啟模型的 Sap2000 物件。
+        group (list): 群組名稱列表。
+        EQF (dict): {節點名稱: 節點力}。
+        dof (int): 施力分量索引，0=F1, 1=F2, 2=F3。
+
+    回傳:
+        list: [(點物件名稱, 六分量載重)]。
+    """
+    return points_to_joint_loads(selected_points(sapmodel, group), EQF, dof)
+
+def points_to_joint_loads(points, EQF, dof):
+    """
+    依點物件順序組成節點力列表，略過沒有節點力的點物件。
+
+    參數:
+        points (list): selected_points 的回傳值。
+        EQF (dict): {節點名稱: 節點力}。
+        dof (int): 施力分量索引，0=F1, 1=F2, 2=F3。
+
+    回傳:
+        list: [(點物件名稱, 六分量載重)]。
+    """
+    loads = []
+    for objn in points:
+        value = EQF.get(objn)
+        if value is None:
+            continue
+        forcedof = [0, 0, 0, 0, 0, 0]
+        forcedof[dof] = value
+        loads.append((objn, forcedof))
+
+    return loads
+
+def forces_to_joint_loads(EQF, dof):
+    """
+    不經 SAP2000 選取，直接以節點力字典組成節點力列表（供文字檔輸出使用）。
+
+    參數:
+        EQF (dict): {節點名稱: 節點力}。
+        dof (int): 施力分量索引，0=F1, 1=F2, 2=F3。
+
+    回傳:
+        list: [(節點名稱, 六分量載重)]。
+    """
+    loads = []
+    for node, value in EQF.items():
+        forcedof = [0, 0, 0, 0, 0, 0]
+        forcedof[dof] = value
+        loads.append((node, forcedof))
+    return loads
+
+def apply_joint_loads_bulk(sapmodel, joint_loads, coordsys):
+    """
+    以互動式資料表一次寫入所有節點力。
+    保留其他載重模式的既有記錄，並以新資料取代 joint_loads 內各載重模式的記錄。
+
+    參數:
+        sapmodel (Sap2000): 已開啟且解鎖的 Sap2000 物件。
+        joint_loads (dict): {載重模式名稱: [(點物件名稱, 六分量載重)]}。
+        coordsys (str): 載重座標系統名稱。
+    """
+    # 資料表數值以資料庫單位表示，與程式使用單位不同時改用逐點施加
+    if sapmodel.getDatabaseUnits() != MODEL_UNITS:
+        raise RuntimeError("資料庫單位與程式使用單位不同")
+
+    ret = sapmodel.databasetables_GetTableForEditingArray(JOINT_FORCE_TABLE, ALL_GROUP)
+    if ret[0] != 0:
+        raise RuntimeError(f"無法讀取資料表 {JOINT_FORCE_TABLE}")
+    table_version = ret[1]
+    fields = list(ret[2]) or list(JOINT_FORCE_FIELDS)
+    num_fields = len(fields)
+    col_pattern = fields.index('LoadPat')
+    data = list(ret[4])
+
+    records = []
+    for i in range(ret[3]):
+        record = data[i * num_fields:(i + 1) * num_fields]
+        if record[col_pattern] not in joint_loads:
+            records.append(record)
+
+    for lclabel, loads in joint_loads.items():
+        for objn, forcedof in loads:
+            values = dict(zip(JOINT_FORCE_FIELDS[3:], (format(v, '.12g') for v in forcedof)))
+            values.update({'Joint': objn, 'LoadPat': lclabel, 'CoordSys': coordsys})
+            records.append([values.get(field, '') for field in fields])
+
+    table_data = [value for record in records for value in record]
+    ret = sapmodel.databasetables_SetTableForEditingArray(JOINT_FORCE_TABLE, table_version, fields, len(records), table_data)
+    if (ret[0] if isinstance(ret, tuple) else ret) != 0:
+        raise RuntimeError(f"無法設定資料表 {JOINT_FORCE_TABLE}")
+
+    ret = sapmodel.databasetables_ApplyEditedTables(True)
+    if ret[0] != 0 or ret[1] > 0 or ret[2] > 0:
+        raise RuntimeError(ret[5])
+
+def apply_joint_loads_pointwise(sapmodel, joint_loads, coordsys):
+    """
+    逐點呼叫 SetLoadForce 施加節點力。
+    先以 ALL 群組刪除各載重模式既有的節點力，因此逐點指派不需再 Replace。
+
+    參數:
+        sapmodel (Sap2000): 已開啟且解鎖的 Sap2000 物件。
+        joint_loads (dict): {載重模式名稱: [(點物件名稱, 六分量載重)]}。
+        coordsys (str): 載重座標系統名稱。
+    """
+    for lclabel, loads in joint_loads.items():
+        sapmodel.deltet_Pointobj_Deleteloadforce(ALL_GROUP, lclabel, 1)
+        for objn, forcedof in loads:
+            sapmodel.assign_PointObj_SetLoadForce(objn, lclabel, forcedof, Replace=False, CSys=coordsys, ItemType=0)
+
+@profile_stage('eqforce_apply')
+def apply_joint_loads(sapmodel, joint_loads, coordsys):
+    """
+    施加節點力，優先使用互動式資料表整批寫入，失敗時（例如舊版 SAP2000 無此介面）改為逐點施加。
+
+    參數:
+        sapmodel (Sap2000): 已開啟且解鎖的 Sap2000 物件。
+        joint_loads (dict): {載重模式名稱: [(點物件名稱, 六分量載重)]}。
+        coordsys (str): 載重座標系統名稱。
+    """
+    try:
+        apply_joint_loads_bulk(sapmodel, joint_loads, coordsys)
+        return
+    except Exception as e:
+        print(f"[警告]：無法以資料表整批施加節點力（{e}），改為逐點施加。")
+    apply_joint_loads_pointwise(sapmodel, joint_loads, coordsys)
+
+@session_thread
+@profile_run('02_eqforce_profile.json', model_output_path)
+def run_analysis_eqforce(model_path, groups_x, groups_y, groups_z, eqfactor_x, eqfactor_y, eqfactor_z, v_percent, session=None, use_cache=True, load_output='sap', results_path=None, reuse_basis=True):
+    """
+    執行完整的地震力計算、施加與結果匯出流程。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups_x, groups_y, groups_z (list): 各方向群組名稱列表。
+        eqfactor_x, eqfactor_y, eqfactor_z (list of float): 與群組順序對應的地震力係數。
+        v_percent (float): 分配力總和須達總基底剪力的比例下限。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000，結束後不關閉；
+            同一模型與群組再次計算時沿用工作階段中的分配基準，僅縮放並施加地震力。
+        use_cache (bool): 是否使用模型旁的結果快取。
+        load_output (str): 節點力輸出方式。
+            'sap'  - 施加至 SAP2000 模型。
+            's2k'  - 僅輸出 SAP2000 文字格式檔 02_eqforce_loads.s2k，不開啟 SAP2000 施加。
+            'both' - 施加至模型並輸出文字格式檔。
+        results_path (str): SAP2000 匯出的結果檔，見 collect_joint_results；
+            搭配 load_output='s2k' 時整個流程不需 SAP2000。
+        reuse_basis (bool): 是否沿用工作階段中的分配基準。基準鍵值僅含模型檔案路徑、修改時間、大小與群組，
+            無法察覺於 SAP2000 中尚未存檔的修改（例如質量變更）；此時應設為 False，或先重新計算週期。
+
+    回傳:
+        tuple: (eqforce_x, eqforce_y, eqforce_z)，各方向 cal_eqforce_vec / cal_eqvforce 的結果。
+    """
+    if load_output not in ('sap', 's2k', 'both'):
+        raise ValueError(f"未知的節點力輸出方式：{load_output}")
+    annotate_backend(session, 'run_analysis_eqforce', model_path=model_path,
+                     groups_x=groups_x, groups_y=groups_y, groups_z=groups_z,
+                     eqfactor_x=eqfactor_x, eqfactor_y=eqfactor_y, eqfactor_z=eqfactor_z,
+                     v_percent=v_percent, use_cache=use_cache, load_output=load_output, results_path=results_path,
+                     reuse_basis=reuse_basis)
+
+    # --- 1. 開啟模型並執行分析 ---
+    # --- 2. 獲取分析結果 ---
+    # 工作階段保有同一模型與群組的分配基準時，僅重新縮放並施加，不重新分析
+    basis_key = eqforce_basis_key(model_path, groups_x, groups_y, groups_z)
+    if (reuse_basis and results_path is None and session is not None and session.eqforce_basis is not None
+            and session.eqforce_basis[0] == basis_key):
+        print("[訊息]：模型與群組未變更，沿用前次分析的振態分布，僅重新計算並施加地震力。")
+        sapmodel = None
+        basis = session.eqforce_basis[1]
+    else:
+        # 命中結果快取時，SAP2000 僅於施加地震力時開啟
+        sapmodel, jointdisp, jointmass = collect_joint_results(
+            model_path, groups_x, groups_y, groups_z, session, use_cache, results_path
+        )
+        basis = build_eqforce_basis(jointdisp, jointmass, groups_x, groups_y, groups_z)
+        if session is not None and results_path is None:
+            # SAP2000 分析前會存檔，鍵值以分析後的檔案計算
+            session.eqforce_basis = (eqforce_basis_key(model_path, groups_x, groups_y, groups_z), basis)
+
+    return eqforce_from_results(
+        model_path, sapmodel, basis, groups_x, groups_y, groups_z,
+        eqfactor_x, eqfactor_y, eqfactor_z, v_percent, session, load_output
+    )
+
+def eqforce_basis_key(model_path, groups_x, groups_y, groups_z):
+    """
+    地震力分配基準的鍵值：模型路徑、檔案修改時間與大小及各方向群組。
+    """
+    stat = os.stat(model_path)
+    return (
+        os.path.normcase(os.path.abspath(model_path)), stat.st_mtime_ns, stat.st_size,
+        tuple(groups_x), tuple(groups_y), tuple(groups_z),
+    )
+
+def build_eqforce_basis(jointdisp, jointmass, groups_x, groups_y, groups_z):
+    """
+    由節點位移與質量建立各方向與係數無關的分配基準。
+
+    回傳:
+        dict: {'X': eqforce_basis, 'Y': eqforce_basis, 'Z': {群組: get_mass 結果}}。
+    """
+    with stage('cal_eqforce'):
+        return {
+            'X': eqforce_basis(jointdisp['X'], jointmass['X'], groups_x),
+            'Y': eqforce_basis(jointdisp['Y'], jointmass['Y'], groups_y),
+            'Z': {gp: jointmass['Z'][gp] for gp in groups_z},
+        }
+
+def eqforce_from_results(model_path, sapmodel, basis, groups_x, groups_y, groups_z,
+                         eqfactor_x, eqfactor_y, eqfactor_z, v_percent, session=None, load_output='sap'):
+    """
+    由分配基準計算、施加並匯出地震力（run_analysis_eqforce 的步驟 3 至 6）。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        sapmodel (Sap2000): 已開啟模型的 Sap2000 物件，None 表示施加時才開啟。
+        basis (dict): build_eqforce_basis 的回傳值。
+        其餘參數同 run_analysis_eqforce。
+
+    回傳:
+        tuple: (eqforce_x, eqforce_y, eqforce_z)。
+    """
+    # --- 3. 計算分析橫力 ---
+    # 計算X, Y方向地震節點力
+    with stage('cal_eqforce'):
+        eqforce_x = scale_eqforce(basis['X'], groups_x, eqfactor_x, v_percent)
+        eqforce_y = scale_eqforce(basis['Y'], groups_y, eqfactor_y, v_percent)
+
+    # 將各群組的地震力合併為單一字典
+    EQF_x = merge_force_data(eqforce_x)
+    EQF_y = merge_force_data(eqforce_y)
+    
+    # --- 4. 計算分析垂直力 ---
+    # 計算Z方向地震節點力
+    with stage('cal_eqvforce'):
+        eqforce_z = cal_eqvforce(None, basis['Z'], groups_z, eqfactor_z)
+    
+    # 將各群組的地震力合併為單一字典
+    EQF_z = merge_force_data(eqforce_z)
+    print("[訊息]：分布力計算完成！")
+
+    # --- 5. Assign地震力 ---
+    presentcoordsystem = 'GLOBAL'
+    if load_output in ('sap', 'both'):
+        if sapmodel is None:
+            sapmodel = open_sap_model(model_path, session)
+        presentcoordsystem = sapmodel.getCoordSystem()
+        status_lock = sapmodel.getModelIsLocked()
+        if status_lock:
+            sapmodel.setModelIsLocked(False)
+        # EQ Load Cases設定
+        define_eq_load_cases(sapmodel, ['EQL', 'EQT', 'EQV'])
+
+        # 地震力加載
+        joint_loads = {
+            'EQL': build_joint_loads(sapmodel, groups_x, EQF_x, EQ_LOAD_DOF['EQL']),
+            'EQT': build_joint_loads(sapmodel, groups_y, EQF_y, EQ_LOAD_DOF['EQT']),
+            'EQV': build_joint_loads(sapmodel, groups_z, EQF_z, EQ_LOAD_DOF['EQV']),
+        }
+        apply_joint_loads(sapmodel, joint_loads, presentcoordsystem)
+        print("[訊息]：地震力施加完成！")
+    else:
+        joint_loads = {
+            'EQL': forces_to_joint_loads(EQF_x, EQ_LOAD_DOF['EQL']),
+            'EQT': forces_to_joint_loads(EQF_y, EQ_LOAD_DOF['EQT']),
+            'EQV': forces_to_joint_loads(EQF_z, EQ_LOAD_DOF['EQV']),
+        }
+
+    if load_output in ('s2k', 'both'):
+        output_s2k_path = model_output_path(model_path, '02_eqforce_loads.s2k')
+        write_joint_loads_s2k(output_s2k_path, joint_loads, presentcoordsystem)
+        print(f"[訊息]：節點地震力文字檔已輸出至：{output_s2k_path}")
+
+    # 關閉 SAP2000
+    #sapmodel.file_Save(model_path)
+    if session is None and sapmodel is not None:
+        sapmodel.closeModel()
+        print("[訊息]：SAP2000關閉。")
+
+    # --- 6. 輸出地震力結果 ---
+    output_excel_path = model_output_path(model_path, '02_eqforce_results.xlsx')
+    export_eqforce_to_excel(eqforce_x, eqforce_y, eqforce_z, output_excel_path)
+    return eqforce_x, eqforce_y, eqforce_z
+
+@session_thread
+@profile_run('03_combined_profile.json', model_output_path)
+def run_analysis_combined(model_path, groups_x, groups_y, groups_z, design, v_percent, session=None, use_cache=True, load_output='sap', results_path=None):
+    """
+    單次開啟模型完成週期、地震力加速度係數與地震力計算及施加。
+
+    單位載重分析只執行一次，週期結果直接代入 spectrum 依鐵路橋梁耐震設計規範[110年]
+    計算各群組係數，取代先執行週期、以外部 Excel 計算係數、再執行地震力的流程。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups_x, groups_y, groups_z (list): 各方向群組名稱列表，Z 方向第一組為上構，其餘為下構。
+        design (dict): 設計參數，見 spectrum.design_params，例如
+            {'SDS': 0.8, 'SD1': 0.45, 'I': 1.25, 'alpha_y': 1.2, 'R': 3.0, 'alpha_v': 0.5, 'Y': {'R': 4.0}}。
+        v_percent (float): 分配力總和須達總基底剪力的比例下限。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000，結束後不關閉。
+        use_cache (bool): 是否使用模型旁的結果快取。
+        load_output (str): 節點力輸出方式，同 run_analysis_eqforce。
+        results_path (str): SAP2000 匯出的結果檔，見 collect_joint_results。
+
+    回傳:
+        tuple: (periods, eqfactors, eqforces)，各為 X、Y、Z 三方向結果的 tuple。
+    """
+    annotate_backend(session, 'run_analysis_combined', model_path=model_path,
+                     groups_x=groups_x, groups_y=groups_y, groups_z=groups_z, design=design,
+                     v_percent=v_percent, use_cache=use_cache, load_output=load_output, results_path=results_path)
+    # 設計參數不完整時於開啟 SAP2000 前停止
+    check_design(design)
+
+    # --- 1. 開啟模型並執行分析，並獲取位移與質量 ---
+    sapmodel, jointdisp, jointmass = collect_joint_results(
+        model_path, groups_x, groups_y, groups_z, session, use_cache, results_path
+    )
+
+    # --- 2. 計算週期並輸出 ---
+    period_x, period_y, period_z = periods_from_results(jointdisp, jointmass, groups_x, groups_y)
+    output_excel_path = model_output_path(model_path, '01_period_results.xlsx')
+    export_results_to_excel(period_x, period_y, period_z, output_excel_path)
+
+    # --- 3. 計算地震力加速度係數 ---
+    with stage('cal_coefficient'):
+        eqfactor_x = eqfactors_from_periods(period_x, design, 'X')
+        eqfactor_y = eqfactors_from_periods(period_y, design, 'Y')
+        eqfactor_z = vertical_eqfactors(groups_z, design)
+    for axis, period, eqfactor in (('X', period_x, eqfactor_x), ('Y', period_y, eqfactor_y)):
+        for (gp, data), factor in zip(period.items(), eqfactor):
+            print(f"[訊息]：{axis} 方向 {gp}：T = {data['period']:.4f} s，係數 = {factor:.4f}")
+    for gp, factor in zip(groups_z, eqfactor_z):
+        print(f"[訊息]：Z 方向 {gp}：係數 = {factor:.4f}")
+
+    # --- 4. 計算、施加並輸出地震力 ---
+    basis = build_eqforce_basis(jointdisp, jointmass, groups_x, groups_y, groups_z)
+    if session is not None and results_path is None:
+        session.eqforce_basis = (eqforce_basis_key(model_path, groups_x, groups_y, groups_z), basis)
+    eqforces = eqforce_from_results(
+        model_path, sapmodel, basis, groups_x, groups_y, groups_z,
+        eqfactor_x, eqfactor_y, eqfactor_z, v_percent, session, load_output
+    )
+    return (period_x, period_y, period_z), (eqfactor_x, eqfactor_y, eqfactor_z), eqforces
+
+def export_sweep_to_excel(sweep, patterns, output_path):
+    """
+    將參數化分析的各情境摘要匯出至 Excel，每個指標一個工作表（列為情境、欄為群組）。
+
+    參數:
+        sweep (dict): eqengine.sweep_eqforce 的回傳值。
+        patterns (list): 各情境對應的載重模式名稱，未寫入 SAP2000 時為 None。
+        output_path (str): 輸出 Excel 檔案的完整路徑。
+    """
+    index = pd.RangeIndex(1, len(sweep['v_percent']) + 1, name='Scenario')
+    scenarios = pd.DataFrame({'v_percent': sweep['v_percent'], 'LoadPattern': patterns or ''}, index=index)
+    try:
+        with pd.ExcelWriter(output_path) as writer:
+            scenarios.to_excel(writer, sheet_name='Scenarios')
+            for key in ('eqfactor', 'BaseShear', 'SumForce', 'ModalRatio', 'ScaleRatio'):
+                pd.DataFrame(sweep[key], index=index, columns=sweep['group']).to_excel(writer, sheet_name=key)
+        print(f"[訊息]：參數化分析結果已成功匯出至：{output_path}")
+    except Exception as e:
+        print(f"[錯誤]：匯出 Excel 時發生錯誤：{e}")
+
+@session_thread
+@profile_run('04_eqforce_sweep_profile.json', model_output_path)
+def run_eqforce_sweep(model_path, groups, eqfactors, v_percents, direction='X', session=None, use_cache=True, write_patterns=False, reuse_basis=True):
+    """
+    單一方向的地震力參數化分析：一次計算多組 (eqfactor, v_percent) 情境下各群組節點力。
+
+    單位載重分析最多執行一次（工作階段保有相同群組的分配基準時不執行），
+    各情境僅為分配基準的縮放；write_patterns 為 True 時，每個情境寫入各自的載重模式
+    （例如 EQL_01…EQL_N），並以單次資料表操作施加。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups (list): 群組名稱列表。
+        eqfactors (array_like): (情境數, 群組數) 或 (情境數,) 的地震力係數。
+        v_percents (float or array_like): 各情境分配力總和須達總基底剪力的比例下限。
+        direction (str): 'X' 或 'Y'。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000 與分配基準，結束後不關閉。
+        use_cache (bool): 是否使用模型旁的結果快取。
+        write_patterns (bool): 是否將各情境寫入 SAP2000 載重模式。
+        reuse_basis (bool): 是否沿用工作階段中的分配基準，限制同 run_analysis_eqforce。
+
+    回傳:
+        dict: eqengine.sweep_eqforce 的結果，另含 'pattern'（各情境載重模式名稱或 None）。
+    """
+    if direction not in SWEEP_PATTERN_PREFIX:
+        raise ValueError(f"參數化分析僅支援 X、Y 方向：{direction}")
+    annotate_backend(session, 'run_eqforce_sweep', model_path=model_path, groups=groups,
+                     eqfactors=eqfactors, v_percents=v_percents, direction=direction,
+                     use_cache=use_cache, write_patterns=write_patterns, reuse_basis=reuse_basis)
+
+    # --- 1. 取得分配基準 ---
+    # 鍵值為 (路徑, 修改時間, 大小, X 群組, Y 群組, Z 群組)，本方向群組須與工作階段的基準完全相同才沿用，
+    # 重新計算時保留其他方向的基準，使後續 run_analysis_eqforce 仍可沿用
+    sapmodel = None
+    axis_index = 3 + ('X', 'Y', 'Z').index(direction)
+    model_key = eqforce_basis_key(model_path, [], [], [])[:3]
+
+    def session_basis():
+        cached = session.eqforce_basis if session is not None else None
+        return cached if cached is not None and cached[0][:3] == model_key else None
+
+    cached = session_basis() if reuse_basis else None
+    if cached is not None and cached[0][axis_index] == tuple(groups):
+        print("[訊息]：沿用前次分析的振態分布，不重新分析。")
+        basis = cached[1]
+    else:
+        groups_xyz = {axis: (groups if axis == direction else []) for axis in ('X', 'Y', 'Z')}
+        sapmodel, jointdisp, jointmass = collect_joint_results(
+            model_path, groups_xyz['X'], groups_xyz['Y'], groups_xyz['Z'], session, use_cache
+        )
+        basis = build_eqforce_basis(jointdisp, jointmass, groups_xyz['X'], groups_xyz['Y'], groups_xyz['Z'])
+        # SAP2000 分析前會存檔，鍵值以分析後的檔案計算
+        model_key = eqforce_basis_key(model_path, [], [], [])[:3]
+        if session is not None:
+            # 由 SAP2000 重新讀取時 collect_joint_results 已清除舊基準，僅合併仍有效的其他方向
+            cached = session_basis() if reuse_basis else None
+            if cached is not None:
+                basis_key = cached[0][:axis_index] + (tuple(groups),) + cached[0][axis_index + 1:]
+                basis = dict(cached[1], **{direction: basis[direction]})
+            else:
+                basis_key = model_key + tuple(tuple(groups_xyz[axis]) for axis in ('X', 'Y', 'Z'))
+            session.eqforce_basis = (basis_key, basis)
+
+    # --- 2. 計算各情境節點力 ---
+    with stage('cal_eqforce_sweep'):
+        sweep = sweep_eqforce(basis[direction], groups, eqfactors, v_percents)
+    num_scenario = len(sweep['v_percent'])
+    print(f"[訊息]：{num_scenario} 個情境的分布力計算完成！")
+
+    # --- 3. 寫入 SAP2000 載重模式 ---
+    patterns = None
+    if write_patterns:
+        width = max(2, len(str(num_scenario)))
+        patterns = [f"{SWEEP_PATTERN_PREFIX[direction]}_{i + 1:0{width}d}" for i in range(num_scenario)]
+        if sapmodel is None:
+            sapmodel = open_sap_model(model_path, session)
+        presentcoordsystem = sapmodel.getCoordSystem()
+        if sapmodel.getModelIsLocked():
+            sapmodel.setModelIsLocked(False)
+        define_eq_load_cases(sapmodel, patterns)
+
+        points = selected_points(sapmodel, groups)
+        dof = EQ_LOAD_DOF[SWEEP_PATTERN_PREFIX[direction]]
+        joint_loads = {}
+        for i, pattern in enumerate(patterns):
+            EQF = {}
+            for j, names in enumerate(sweep['node_name']):
+                EQF.update(zip(names, sweep['eqforce'][i, j, :len(names)].tolist()))
+            joint_loads[pattern] = points_to_joint_loads(points, EQF, dof)
+        apply_joint_loads(sapmodel, joint_loads, presentcoordsystem)
+        print(f"[訊息]：已施加 {patterns[0]}～{patterns[-1]} 地震力！")
+
+    if session is None and sapmodel is not None:
+        sapmodel.closeModel()
+        print("[訊息]：SAP2000關閉。")
+
+    # --- 4. 輸出摘要 ---
+    output_excel_path = model_output_path(model_path, '04_eqforce_sweep.xlsx')
+    export_sweep_to_excel(sweep, patterns, output_excel_path)
+    sweep['pattern'] = patterns
+    return sweep
+
+def align_directional_data(disp_x, disp_y, mass_x, mass_y):
+    """
+    將單一群組 UNIT-X、UNIT-Y 的兩個水平位移分量及兩方向質量依節點名稱對齊。
+
+    參數:
+        disp_x, disp_y (dict): get_disp_components 回傳值中該群組的 {7: ..., 8: ...}。
+        mass_x, mass_y (dict): 該群組 get_mass 的 U1、U2 質量結果。
+
+    回傳:
+        tuple: (node_name, disp, mass)，disp 含 'xx'、'xy'、'yx'、'yy'，mass 含 'x'、'y'，皆為 ndarray。
+    """
+    columns = {
+        'xx': disp_x[7], 'xy': disp_x[8], 'yx': disp_y[7], 'yy': disp_y[8],
+        'mx': mass_x, 'my': mass_y,
+    }
+    values = {}
+    for key, data in columns.items():
+        value_key = 'node_mass' if key.startswith('m') else 'node_disp'
+        values[key] = dict(zip(data['node_name'], data[value_key]))
+
+    node_name = [name for name in values['xx'] if all(name in column for column in values.values())]
+    arrays = {key: np.array([column[name] for name in node_name], dtype=np.float64) for key, column in values.items()}
+    disp = {key: arrays[key] for key in ('xx', 'xy', 'yx', 'yy')}
+    mass = {'x': arrays['mx'], 'y': arrays['my']}
+    return node_name, disp, mass
+
+def export_direction_sweep_to_excel(angles, responses, patterns, output_path):
+    """
+    將各角度、各群組的週期與地震力摘要匯出至 Excel（列為角度、欄為群組）。
+
+    參數:
+        angles (ndarray): 方向角（度）。
+        responses (dict): {群組: eqengine.directional_response 的回傳值}。
+        patterns (list): 各角度對應的載重模式名稱，未寫入 SAP2000 時為 None。
+        output_path (str): 輸出 Excel 檔案的完整路徑。
+    """
+    index = pd.Index(angles, name='Angle(deg)')
+    keys = ['period', 'TotalMass']
+    if responses and 'eqforce' in next(iter(responses.values())):
+        keys += ['eqfactor', 'BaseShear', 'SumForce', 'ScaleRatio']
+    try:
+        with pd.ExcelWriter(output_path) as writer:
+            pd.DataFrame({'LoadPattern': patterns or ''}, index=index).to_excel(writer, sheet_name='Angles')
+            for key in keys:
+                table = pd.DataFrame({gp: response[key] for gp, response in responses.items()}, index=index)
+                table.to_excel(writer, sheet_name=key)
+        print(f"[訊息]：方向分析結果已成功匯出至：{output_path}")
+    except Exception as e:
+        print(f"[錯誤]：匯出 Excel 時發生錯誤：{e}")
+
+def direction_factors(eqfactor, num_group, num_angle):
+    """
+    將 run_direction_sweep 的地震力係數展開為形狀 (群組數, 角度數)。
+
+    參數:
+        eqfactor (float, list or array_like): 單一數值、長度為群組數或角度數的一維陣列，或形狀 (群組數, 角度數)。
+        num_group (int): 群組數量。
+        num_angle (int): 角度數量。
+
+    回傳:
+        ndarray: 形狀 (群組數, 角度數) 的係數。
+
+    例外:
+        ValueError: 形狀不符，或一維陣列長度同時等於群組數與角度數而無法判斷。
+    """
+    factors = np.asarray(eqfactor, dtype=np.float64)
+    if factors.ndim == 0 or factors.shape == (1,):
+        return np.full((num_group, num_angle), float(factors.reshape(-1)[0]))
+    if factors.ndim == 1:
+        size = len(factors)
+        if size == num_group and size == num_angle:
+            raise ValueError(
+                f"係數數量 ({size}) 同時等於群組數量與角度數量，無法判斷為各群組或各角度的係數；"
+                f"請改以形狀 ({num_group}, {num_angle}) 指定"
+            )
+        if size == num_group:
+            return np.repeat(factors[:, None], num_angle, axis=1)
+        if size == num_angle:
+            return np.repeat(factors[None, :], num_group, axis=0)
+        raise ValueError(f"係數數量 ({size}) 與群組數量 ({num_group}) 及角度數量 ({num_angle}) 皆不一致")
+    if factors.shape != (num_group, num_angle):
+        raise ValueError(f"係數形狀 {factors.shape} 與 (群組數量, 角度數量) = ({num_group}, {num_angle}) 不一致")
+    return factors
+
+@session_thread
+@profile_run('05_direction_sweep_profile.json', model_output_path)
+def run_direction_sweep(model_path, groups, angles, eqfactor=None, v_percent=0.9, session=None, write_patterns=False):
+    """
+    任意水平方向的週期與地震力分析。
+
+    單位載重為線性反應，θ 方向的反應由既有 UNIT-X、UNIT-Y 的 U1、U2 位移疊加而得，
+    不需另外定義載重案例或重新分析；所有角度以向量化方式一次計算。
+
+    參數:
+        model_path (str): SAP2000 模型檔案的完整路徑。
+        groups (list): 群組名稱列表。
+        angles (array_like): 方向角（度），自 Global X 軸逆時針量測。
+        eqfactor (float, list or array_like): 地震力係數，可為單一數值、各群組一值、各角度一值，
+            或形狀 (群組數, 角度數)，見 direction_factors；None 時僅計算週期。
+        v_percent (float): 分配力總和須達總基底剪力的比例下限。
+        session (SapSession): 若提供，則沿用工作階段中的 SAP2000，結束後不關閉。
+        write_patterns (bool): 是否將各角度的地震力（F1 = F cosθ、F2 = F sinθ）寫入載重模式 EQA_01…。
+
+    回傳:
+        dict: angle、node_name（各群組節點名稱）、response（{群組: directional_response 結果}）及 pattern。
+    """
+    angles = np.atleast_1d(np.asarray(angles, dtype=np.float64))
+    if write_patterns and eqfactor is None:
+        raise ValueError("寫入載重模式需提供地震力係數")
+    factors = None if eqfactor is None else direction_factors(eqfactor, len(groups), len(angles))
+    annotate_backend(session, 'run_direction_sweep', model_path=model_path, groups=groups, angles=angles,
+                     eqfactor=eqfactor, v_percent=v_percent, write_patterns=write_patterns)
+
+    # --- 1. 開啟模型並執行分析（單位載重結果仍有效時沿用） ---
+    sapmodel = setup_and_run_sap_analysis(model_path, session)
+
+    # --- 2. 讀取 UNIT-X、UNIT-Y 的兩個水平位移分量與質量 ---
+    disp_x = get_disp_components(sapmodel, 'UNIT-X', groups, [7, 8], RESULTS_FETCH_MODE)
+    disp_y = get_disp_components(sapmodel, 'UNIT-Y', groups, [7, 8], RESULTS_FETCH_MODE)
+    mass_x = get_mass(sapmodel, groups, 3, RESULTS_FETCH_MODE)
+    mass_y = get_mass(sapmodel, groups, 4, RESULTS_FETCH_MODE)
+
+    # --- 3. 各群組計算所有角度的反應 ---
+    node_names = {}
+    responses = {}
+    with stage('cal_direction'):
+        for j, gp in enumerate(groups):
+            node_name, disp, mass = align_directional_data(
+                {7: disp_x[7][gp], 8: disp_x[8][gp]}, {7: disp_y[7][gp], 8: disp_y[8][gp]},
+                mass_x[gp], mass_y[gp],
+            )
+            node_names[gp] = node_name
+            try:
+                responses[gp] = directional_response(
+                    disp, mass, angles, None if factors is None else factors[j], v_percent
+                )
+            except ValueError as e:
+                raise ValueError(f"群組 {gp}：{e}") from e
+    print(f"[訊息]：{len(angles)} 個方向的週期{'與分布力' if factors is not None else ''}計算完成！")
+
+    # --- 4. 寫入 SAP2000 載重模式 ---
+    patterns = None
+    if write_patterns:
+        width = max(2, len(str(len(angles))))
+        patterns = [f"{DIRECTION_PATTERN_PREFIX}_{i + 1:0{width}d}" for i in range(len(angles))]
+        presentcoordsystem = sapmodel.getCoordSystem()
+        if sapmodel.getModelIsLocked():
+            sapmodel.setModelIsLocked(False)
+        define_eq_load_cases(sapmodel, patterns)
+
+        points = selected_points(sapmodel, groups)
+        cos = np.cos(np.radians(angles))
+        sin = np.sin(np.radians(angles))
+        joint_loads = {}
+        for i, pattern in enumerate(patterns):
+            EQF = {}
+            for gp in groups:
+                EQF.update(zip(node_names[gp], responses[gp]['eqforce'][i].tolist()))
+            loads = []
+            for objn in points:
+                value = EQF.get(objn)
+                if value is None:
+                    continue
+                loads.append((objn, [value * cos[i], value * sin[i], 0, 0, 0, 0]))
+            joint_loads[pattern] = loads
+        apply_joint_loads(sapmodel, joint_loads, presentcoordsystem)
+        print(f"[訊息]：已施加 {patterns[0]}～{patterns[-1]} 地震力！")
+
+    if session is None:
+        sapmodel.closeModel()
+        print("[訊息]：SAP2000關閉。")
+
+    # --- 5. 輸出摘要 ---
+    output_excel_path = model_output_path(model_path, '05_direction_sweep.xlsx')
+    export_direction_sweep_to_excel(angles, responses, patterns, output_excel_path)
+    return {'angle': angles, 'node_name': node_names, 'response': responses, 'pattern': patterns}
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+# 是否於 run_analysis_period / run_analysis_eqforce 結束時輸出耗時統計與 Chrome trace，
+# 預設關閉；設定環境變數 PYREEQ_PROFILE=1 或命令列 --profile 時開啟
+ENABLED = os.environ.get('PYREEQ_PROFILE', '').strip() not in ('', '0')
+
+# 目前執行中流程的 Profiler，None 表示未記錄
+_active = None
+
+
+def result_size(result):
+    """
+    回傳值中陣列的長度，OAPI 回傳 tuple 時取其中最長的陣列，例如 JointDispl 的節點數。
+    """
+    if isinstance(result, (list, tuple)):
+        sizes = [len(v) for v in result if isinstance(v, (list, tuple))]
+        return max(sizes) if sizes else 0
+    return 0
+
+
+class Profiler(object):
+    """
+    記錄單次流程中各階段與 Sap2000 方法呼叫的起訖時間。
+
+    參數:
+        name (str): 流程名稱，作為 Chrome trace 的程序名稱。
+    """
+    def __init__(self, name):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, name, category, start, end, size=0):
+        """
+        加入一筆事件。
+
+        參數:
+            name (str): 事件名稱，例如 'get_disp' 或 'Sap2000.results_JointDispl'。
+            category (str): 'stage' 為流程階段，'com' 為 Sap2000 方法呼叫。
+            start, end (float): time.perf_counter() 的起訖時間。
+            size (int): 回傳陣列長度。
+        """
+        with self._lock:
+            self.events.append((name, category, start, end, size, threading.get_ident()))
+
+    def summary_rows(self):
+        """
+        依事件名稱彙整呼叫次數、總耗時、最大耗時與回傳陣列總長度，依總耗時由大到小排序。
+
+        回傳:
+            list: [(category, name, calls, total_s, max_s, items)]。
+        """
+        rows = {}
+        for name, category, start, end, size, _ in self.events:
+            row = rows.setdefault((category, name), [0, 0.0, 0.0, 0])
+            duration = end - start
+            row[0] += 1
+            row[1] += duration
+            row[2] = max(row[2], duration)
+            row[3] += size
+        return sorted(
+            [(category, name, *row) for (category, name), row in rows.items()],
+            key=lambda r: -r[3],
+        )
+
+    def summary_table(self):
+        """回傳可直接列印的耗時統計表。"""
+        total = (max(e[3] for e in self.events) - self.origin) if self.events else 0.0
+        lines = [
+            f"--- {self.name} 耗時統計（總計 {total:.3f} s）---",
+            f"{'Type':<6} {'Name':<56} {'Calls':>6} {'Total(s)':>9} {'Mean(ms)':>9} {'Max(ms)':>9} {'Items':>9}",
+        ]
+        for category, name, calls, total_s, max_s, items in self.summary_rows():
+            lines.append(
+                f"{category:<6} {name:<56} {calls:>6d} {total_s:>9.3f} "
+                f"{total_s / calls * 1000:>9.2f} {max_s * 1000:>9.2f} {items:>9d}"
+            )
+        return '\n'.join(lines)
+
+    def write_chrome_trace(self, output_path):
+        """
+        輸出 Chrome trace 格式的 JSON，可於 chrome://tracing 或 Perfetto 開啟。
+
+        參數:
+            output_path (str): 輸出檔案完整路徑。
+        """
+        pid = os.getpid()
+        trace_events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+            'args': {'name': self.name},
+        }]
+        for name, category, start, end, size, tid in self.events:
+            trace_events.append({
+                'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6,
+                'args': {'items': size},
+            })
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+
+
+@contextmanager
+def stage(name):
+    """記錄一個流程階段的耗時，未在 profile_run 流程中時不記錄。"""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add(name, 'stage', start, time.perf_counter())
+
+
+def profile_stage(name):
+    """以 stage 記錄整個函式耗時的裝飾器。"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_class(cls):
+    """
+    類別裝飾器：記錄所有公開方法的呼叫次數、耗時與回傳陣列長度，事件名稱為 '類別名稱.方法名稱'。
+    """
+    def wrap(name, method):
+        event_name = f"{cls.__name__}.{name}"
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            profiler.add(event_name, 'com', start, time.perf_counter(), result_size(result))
+            return result
+        return wrapper
+
+    for name, attr in list(vars(cls).items()):
+        if not name.startswith('_') and callable(attr):
+            setattr(cls, name, wrap(name, attr))
+    return cls
+
+
+def profile_run(trace_filename, path_func=None):
+    """
+    流程裝飾器：執行期間記錄所有階段與 Sap2000 呼叫，結束後列印統計表，
+    並於模型同路徑輸出 Chrome trace。被裝飾函式的第一個引數須為模型檔案路徑。
+    已在其他流程中執行時（巢狀呼叫）不另外建立記錄。
+
+    參數:
+        trace_filename (str): Chrome trace 輸出檔名，例如 '01_period_profile.json'。
+        path_func (callable): path_func(model_path, trace_filename) 回傳輸出路徑，None 表示模型同資料夾。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(model_path, *args, **kwargs):
+            global _active
+            if not ENABLED or _active is not None:
+                return func(model_path, *args, **kwargs)
+
+            profiler = Profiler(func.__name__)
+            _active = profiler
+            try:
+                return func(model_path, *args, **kwargs)
+            finally:
+                _active = None
+                print(profiler.summary_table())
+                if path_func is not None:
+                    trace_path = path_func(model_path, trace_filename)
+                else:
+                    trace_path = os.path.join(os.path.dirname(model_path), trace_filename)
+                try:
+                    profiler.write_chrome_trace(trace_path)
+                    print(f"[訊息]：耗時紀錄已輸出至：{trace_path}")
+                except OSError as e:
+                    print(f"[警告]：耗時紀錄輸出失敗：{e}")
+        return wrapper
+    return decorator
@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import gzip
+import time
+import types
+import atexit
+import tempfile
+import threading
+from collections import deque
+
+RECORD_FORMAT = 'pyreeq-record'
+RECORD_VERSION = 1
+# 直接回傳、不包裝的屬性值型態
+_PLAIN_TYPES = (str, bytes, int, float, bool, tuple, list, type(None))
+_METHOD_TYPES = (types.MethodType, types.FunctionType, types.BuiltinFunctionType, types.BuiltinMethodType)
+
+
+class ReplayError(Exception):
+    """回放時找不到對應的錄製回應，或錄製時該呼叫即發生錯誤。"""
+    pass
+
+
+def _to_plain(value):
+    """將 COM 回傳值轉為可 JSON 序列化的型態，tuple 轉為 list。"""
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_plain(v) for k, v in value.items()}
+    if hasattr(value, 'tolist'):
+        # numpy 陣列與純量
+        return _to_plain(value.tolist())
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _from_plain(value):
+    """將 JSON 讀回的 list 還原為 COM 回傳值的 tuple。"""
+    if isinstance(value, list):
+        return tuple(_from_plain(v) for v in value)
+    return value
+
+
+def _read_lines(f):
+    """逐行讀取錄製檔；錄製程式未正常結束時，檔尾可能缺少 gzip 結束標記，讀到已寫入的部分為止。"""
+    try:
+        for line in f:
+            if line.endswith('\n'):
+                yield line
+    except EOFError:
+        return
+
+
+def _args_key(args):
+    return json.dumps(_to_plain(args), ensure_ascii=False)
+
+
+class _RecordingProxy(object):
+    """包裝實際 SapObject，記錄每次方法呼叫的引數、回傳值與耗時。"""
+    def __init__(self, target, recorder, path):
+        self._target = target
+        self._recorder = recorder
+        self._path = path
+
+    def __getattr__(self, name):
+        full_name = f"{self._path}.{name}" if self._path else name
+        try:
+            attr = getattr(self._target, name)
+        except AttributeError:
+            self._recorder.write({'missing': full_name})
+            raise
+        if isinstance(attr, _PLAIN_TYPES):
+            return attr
+        if isinstance(attr, _METHOD_TYPES):
+            def call(*args):
+                start = time.perf_counter()
+                try:
+                    result = attr(*args)
+                except Exception as e:
+                    self._recorder.write({
+                        'call': full_name, 'args': _to_plain(args),
+                        'dt': time.perf_counter() - start, 'error': repr(e),
+                    })
+                    raise
+                self._recorder.write({
+                    'call': full_name, 'args': _to_plain(args),
+                    'dt': time.perf_counter() - start, 'result': _to_plain(result),
+                })
+                return result
+            return call
+        return _RecordingProxy(attr, self._recorder, full_name)
+
+
+class RecordingBackend(object):
+    """
+    錄製模式後端：包裝另一個後端（預設 ComBackend），將每次 OAPI 呼叫及其回傳值寫入 gzip 壓縮的 JSON Lines 檔。
+    錄製檔可交由 ReplayBackend 於無 SAP2000 的環境重現相同的回應。
+
+    參數:
+        path (str): 錄製檔路徑。
+        inner: 實際執行呼叫的後端，None 表示 sapcore.ComBackend。
+    """
+    def __init__(self, path, inner=None):
+        if inner is None:
+            from sapcore import ComBackend
+            inner = ComBackend()
+        self.inner = inner
+        self.path = path
+        self.error = inner.error
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self.write({'format': RECORD_FORMAT, 'version': RECORD_VERSION})
+        atexit.register(self.close)
+
+    def write(self, record):
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def annotate(self, name, kwargs):
+        """記錄流程呼叫（例如 run_analysis_period 與其引數），供回放時重新執行。"""
+        self.write({'note': name, 'kwargs': _to_plain(kwargs)})
+
+    def init_thread(self):
+        self.inner.init_thread()
+
+    def attach(self):
+        return _RecordingProxy(self.inner.attach(), self, '')
+
+    def start(self):
+        sapobject, pid = self.inner.start()
+        return _RecordingProxy(sapobject, self, ''), pid
+
+    def terminate(self, pid, timeout=0):
+        self.inner.terminate(pid, timeout)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """結束錄製並關閉檔案。"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _ReplayProxy(object):
+    """回放用的 SapObject 替身，依屬性路徑向 ReplayBackend 取得錄製的回應。"""
+    def __init__(self, backend, path):
+        self._backend = backend
+        self._path = path
+
+    def __getattr__(self, name):
+        full_name = f"{self._path}.{name}" if self._path else name
+        if full_name in self._backend.missing:
+            raise AttributeError(full_name)
+        if full_name in self._backend.call_names:
+            return lambda *args: self._backend.respond(full_name, args)
+        return _ReplayProxy(self._backend, full_name)
+
+    def __call__(self, *args):
+        return self._backend.respond(self._path, args)
+
+
+class ReplayBackend(object):
+    """
+    回放模式後端：依錄製檔重現每次 OAPI 呼叫的回傳值。
+
+    回應依「呼叫名稱與引數」比對，找不到時改依呼叫名稱的錄製順序；同名呼叫用完後重複最後一筆。
+    未曾錄製的呼叫回傳 0，並計入 unmatched。
+
+    參數:
+        path (str): 錄製檔路徑。
+        replay_latency (bool): 是否依錄製的耗時延遲回應，重現 SAP2000 端的等待時間。
+    """
+    def __init__(self, path, replay_latency=False):
+        self.path = path
+        self.replay_latency = replay_latency
+        self.error = ReplayError
+        self.records = []
+        self.notes = []
+        self.missing = set()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != RECORD_FORMAT:
+                raise ValueError(f"不是 PyreEQ 錄製檔：{path}")
+            for line in _read_lines(f):
+                record = json.loads(line)
+                if 'note' in record:
+                    self.notes.append(record)
+                elif 'missing' in record:
+                    self.missing.add(record['missing'])
+                else:
+                    self.records.append(record)
+
+        self.call_names = {record['call'] for record in self.records}
+        self._by_key = {}
+        self._by_name = {}
+        for i, record in enumerate(self.records):
+            self._by_key.setdefault((record['call'], _args_key(record['args'])), deque()).append(i)
+            self._by_name.setdefault(record['call'], deque()).append(i)
+        self._used = [False] * len(self.records)
+        self._last = {}
+        self._lock = threading.Lock()
+        self.call_counts = {}
+        self.unmatched = {}
+
+    def _next(self, queue):
+        while queue and self._used[queue[0]]:
+            queue.popleft()
+        if not queue:
+            return None
+        index = queue.popleft()
+        self._used[index] = True
+        return index
+
+    def respond(self, name, args):
+        with self._lock:
+            self.call_counts[name] = self.call_counts.get(name, 0) + 1
+            index = self._next(self._by_key.get((name, _args_key(args)), deque()))
+            if index is None:
+                index = self._next(self._by_name.get(name, deque()))
+            if index is None:
+                index = self._last.get(name)
+            if index is None:
+                self.unmatched[name] = self.unmatched.get(name, 0) + 1
+                return 0
+            self._last[name] = index
+
+        record = self.records[index]
+        if self.replay_latency:
+            time.sleep(record['dt'])
+        if 'error' in record:
+            raise ReplayError(record['error'])
+        return _from_plain(record['result'])
+
+    def recorded_time(self):
+        """
+        錄製時各呼叫的累計耗時（秒），即 SAP2000 端的時間。
+
+        回傳:
+            dict: {呼叫名稱: 累計秒數}。
+        """
+        totals = {}
+        for record in self.records:
+            totals[record['call']] = totals.get(record['call'], 0.0) + record['dt']
+        return totals
+
+    def init_thread(self):
+        pass
+
+    def attach(self):
+        return _ReplayProxy(self, '')
+
+    def start(self):
+        return _ReplayProxy(self, ''), None
+
+    def terminate(self, pid, timeout=0):
+        pass
+
+
+def replay_pipeline(path, replay_latency=False):
+    """
+    以錄製檔中記錄的流程呼叫重新執行 run_analysis_period / run_analysis_eqforce / run_analysis_combined。
+    模型檔以同名的空檔案代替，結果快取停用，並輸出至暫存資料夾。
+
+    參數:
+        path (str): 錄製檔路徑。
+        replay_latency (bool): 是否依錄製的耗時延遲回應。
+
+    回傳:
+        tuple: (backend, timing)，timing 為 [(流程名稱, Python 端耗時秒數)]。
+    """
+    import sapcore
+
+    backend = ReplayBackend(path, replay_latency)
+    pipelines = {
+        'run_analysis_period': sapcore.run_analysis_period,
+        'run_analysis_eqforce': sapcore.run_analysis_eqforce,
+        'run_analysis_combined': sapcore.run_analysis_combined,
+        'run_eqforce_sweep': sapcore.run_eqforce_sweep,
+        'run_direction_sweep': sapcore.run_direction_sweep,
+    }
+    timing = []
+    previous = sapcore._default_backend
+    sapcore.set_default_backend(backend)
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            session = None
+            for note in backend.notes:
+                kwargs = dict(note['kwargs'])
+                model_path = os.path.join(work_dir, os.path.basename(kwargs['model_path']))
+                if not os.path.exists(model_path):
+                    open(model_path, 'wb').close()
+                kwargs['model_path'] = model_path
+                kwargs['use_cache'] = False
+                if kwargs.pop('session', False):
+                    session = session or sapcore.SapSession(backend)
+                    kwargs['session'] = session
+                start = time.perf_counter()
+                pipelines[note['note']](**kwargs)
+                timing.append((note['note'], time.perf_counter() - start))
+    finally:
+        sapcore.set_default_backend(previous)
+
+    return backend, timing
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="回放 PyreEQ 的 SAP2000 錄製檔並比較 Python 與 SAP2000 端耗時")
+    parser.add_argument('record', help="RecordingBackend 產生的錄製檔")
+    parser.add_argument('--latency', action='store_true', help="依錄製耗時延遲回應")
+    args = parser.parse_args()
+
+    backend, timing = replay_pipeline(args.record, args.latency)
+    sys.stdout.write("\n--- Replay ---\n")
+    for name, seconds in timing:
+        sys.stdout.write(f"{name:<25} {seconds:10.3f} s\n")
+    recorded = backend.recorded_time()
+    sys.stdout.write(f"{'recorded SAP2000 time':<25} {sum(recorded.values()):10.3f} s\n")
+    sys.stdout.write("\n--- Recorded calls ---\n")
+    for name, seconds in sorted(recorded.items(), key=lambda kv: -kv[1]):
+        sys.stdout.write(f"{name:<55} {backend.call_counts.get(name, 0):6d} {seconds:10.3f} s\n")
+    if backend.unmatched:
+        sys.stdout.write("\n--- Unmatched calls ---\n")
+        for name, count in backend.unmatched.items():
+            sys.stdout.write(f"{name:<55} {count:6d}\n")
@@ -0,0 +1,284 @@
+import numpy as np
+
+# 鐵路橋梁耐震設計規範[110年] 地震力加速度係數
+#
+# 水平向：V/(W+L_E) = I / (1.2 αy) * (SaD/Fu)m
+#   SaD   設計水平譜加速度係數，由 SDS、SD1 與 T0 = SD1/SDS 分段定義
+#   Fu    結構系統地震力折減係數，由容許韌性容量 Ra = 1 + (R-1)/RA_DIVISOR 與週期決定
+#   (SaD/Fu)m 為 SaD/Fu 的修正值
+# 垂直向：上部結構 αv I SDS / αy，下部結構 αv I (0.4 SDS) / αy
+#
+# SDS、SD1 為已考慮工址放大的短週期與一秒週期設計譜加速度係數，可直接輸入，
+# 或由一般工址的地盤分類與震區係數 SS、S1 以 site_spectral_values 求得（SDS = Fa SS，SD1 = Fv S1）。
+# 近斷層與臺北盆地等特殊工址請依規範自行換算後輸入。
+
+# 容許韌性容量 Ra = 1 + (R-1)/RA_DIVISOR
+RA_DIVISOR = 1.5
+# 工址放大係數 Fa、Fv：列為第一、二、三類地盤，欄對應 SS_POINTS、S1_POINTS，中間值線性內插
+SS_POINTS = np.array([0.5, 0.6, 0.7, 0.8, 0.9])
+FA_TABLE = np.array([
+    [1.0, 1.0, 1.0, 1.0, 1.0],
+    [1.1, 1.1, 1.0, 1.0, 1.0],
+    [1.2, 1.2, 1.1, 1.0, 1.0],
+])
+S1_POINTS = np.array([0.30, 0.35, 0.40, 0.45, 0.50])
+FV_TABLE = np.array([
+    [1.0, 1.0, 1.0, 1.0, 1.0],
+    [1.5, 1.4, 1.3, 1.2, 1.1],
+    [1.8, 1.7, 1.6, 1.5, 1.4],
+])
+# 設計參數預設值；SDS、SD1（或 site_class、SS、S1）因工址而異，須由使用者提供
+DEFAULT_DESIGN = {
+    'I': 1.0,
+    'alpha_y': 1.2,
+    'R': 3.0,
+    'alpha_v': 0.5,
+}
+
+
+def site_coefficients(site_class, ss, s1):
+    """
+    一般工址的工址放大係數 Fa、Fv，所有參數皆可為陣列並依 numpy 規則廣播。
+
+    參數:
+        site_class (int or ndarray): 地盤分類 1、2、3。
+        ss, s1 (float or ndarray): 短週期與一秒週期震區設計水平譜加速度係數。
+
+    回傳:
+        tuple: (Fa, Fv) ndarray。
+    """
+    site_class, ss, s1 = np.broadcast_arrays(
+        np.asarray(site_class, dtype=np.intp), np.asarray(ss, dtype=np.float64), np.asarray(s1, dtype=np.float64)
+    )
+    if np.any((site_class < 1) | (site_class > 3)):
+        raise ValueError("地盤分類須為 1、2 或 3")
+    index = site_class - 1
+    fa = np.choose(index, [np.interp(ss, SS_POINTS, row) for row in FA_TABLE])
+    fv = np.choose(index, [np.interp(s1, S1_POINTS, row) for row in FV_TABLE])
+    return fa, fv
+
+
+def site_spectral_values(site_class, ss, s1):
+    """
+    一般工址的設計譜加速度係數 SDS = Fa SS、SD1 = Fv S1。
+
+    回傳:
+        tuple: (SDS, SD1) ndarray。
+    """
+    fa, fv = site_coefficients(site_class, ss, s1)
+    return fa * np.asarray(ss, dtype=np.float64), fv * np.asarray(s1, dtype=np.float64)
+
+
+def spectral_acceleration(period, sds, sd1):
+    """
+    設計水平譜加速度係數 SaD。
+
+    參數:
+        period (float or ndarray): 結構基本振動週期 T（秒）。
+        sds, sd1 (float or ndarray): 短週期與一秒週期設計譜加速度係數。
+
+    回傳:
+        ndarray: 與輸入廣播後形狀相同的 SaD。
+    """
+    period, sds, sd1 = np.broadcast_arrays(
+        np.asarray(period, dtype=np.float64), np.asarray(sds, dtype=np.float64), np.asarray(sd1, dtype=np.float64)
+    )
+    t0 = sd1 / sds
+    return np.select(
+        [period <= 0.2 * t0, period <= t0, period <= 2.5 * t0],
+        [sds * (0.4 + 3.0 * period / t0), sds, sd1 / np.maximum(period, 1e-12)],
+        0.4 * sds,
+    )
+
+
+def reduction_factor(period, t0, ra):
+    """
+    結構系統地震力折減係數 Fu。
+
+    參數:
+        period (float or ndarray): 結構基本振動週期 T（秒）。
+        t0 (float or ndarray): 工址短週期與長週期分界 T0 = SD1/SDS。
+        ra (float or ndarray): 容許韌性容量 Ra。
+
+    回傳:
+        ndarray: Fu。
+    """
+    period, t0, ra = np.broadcast_arrays(
+        np.asarray(period, dtype=np.float64), np.asarray(t0, dtype=np.float64), np.asarray(ra, dtype=np.float64)
+    )
+    fu_short = np.sqrt(2.0 * ra - 1.0)
+    return np.select(
+        [period >= t0, period >= 0.6 * t0, period >= 0.2 * t0],
+        [ra, fu_short + (ra - fu_short) * (period - 0.6 * t0) / (0.4 * t0), fu_short],
+        fu_short + (fu_short - 1.0) * (period - 0.2 * t0) / (0.2 * t0),
+    )
+
+
+def modified_ratio(ratio):
+    """
+    (SaD/Fu)m 修正。
+
+    參數:
+        ratio (ndarray): SaD/Fu。
+
+    回傳:
+        ndarray: (SaD/Fu)m。
+    """
+    ratio = np.asarray(ratio, dtype=np.float64)
+    return np.select(
+        [ratio <= 0.3, ratio <= 0.8],
+        [ratio, 0.52 * ratio + 0.144],
+        0.70 * ratio,
+    )
+
+
+def horizontal_coefficient(period, sds, sd1, importance, alpha_y, r):
+    """
+    水平向地震力加速度係數 V/(W+L_E)，可直接作為 cal_eqforce 的 eqfactor。
+    所有參數皆可為陣列並依 numpy 規則廣播。
+
+    參數:
+        period (float or ndarray): 結構基本振動週期 T（秒）。
+        sds, sd1 (float or ndarray): 設計譜加速度係數。
+        importance (float or ndarray): 用途係數 I。
+        alpha_y (float or ndarray): 起始降伏地震力放大倍數 αy。
+        r (float or ndarray): 韌性容量 R。
+
+    回傳:
+        ndarray: 地震力加速度係數。
+    """
+    sds = np.asarray(sds, dtype=np.float64)
+    sd1 = np.asarray(sd1, dtype=np.float64)
+    ra = 1.0 + (np.asarray(r, dtype=np.float64) - 1.0) / RA_DIVISOR
+    sad = spectral_acceleration(period, sds, sd1)
+    fu = reduction_factor(period, sd1 / sds, ra)
+    return np.asarray(importance, dtype=np.float64) / (1.2 * np.asarray(alpha_y, dtype=np.float64)) * modified_ratio(sad / fu)
+
+
+def vertical_coefficient(sds, importance, alpha_y, alpha_v, superstructure=True):
+    """
+    垂直向地震力加速度係數，可直接作為 cal_eqvforce 的 eqfactor。
+
+    參數:
+        sds (float or ndarray): 短週期設計譜加速度係數。
+        importance (float or ndarray): 用途係數 I。
+        alpha_y (float or ndarray): 起始降伏地震力放大倍數 αy。
+        alpha_v (float or ndarray): 垂直與水平向加速度比值 αv。
+        superstructure (bool or ndarray): True 為上部結構，False 為下部結構（採 0.4 SDS）。
+
+    回傳:
+        ndarray: 地震力加速度係數。
+    """
+    scale = np.where(superstructure, 1.0, 0.4)
+    return (np.asarray(alpha_v, dtype=np.float64) * np.asarray(importance, dtype=np.float64) * scale
+            * np.asarray(sds, dtype=np.float64) / np.asarray(alpha_y, dtype=np.float64))
+
+
+def design_params(design, axis=None):
+    """
+    合併預設值、共用設計參數與各方向覆寫值。
+
+    參數:
+        design (dict): 例如 {'SDS': 0.8, 'SD1': 0.45, 'I': 1.25, 'R': 3.0, 'Y': {'R': 4.0}}，
+            或以 {'site_class': 2, 'SS': 0.7, 'S1': 0.4, ...} 取代 SDS、SD1。
+            I、alpha_y、R、alpha_v 未提供時使用 DEFAULT_DESIGN。
+        axis (str): 'X'、'Y' 或 'Z'，取該方向的覆寫值。
+
+    回傳:
+        dict: 完整設計參數。
+
+    例外:
+        ValueError: 缺少 SDS、SD1，或提供 site_class 但缺少 SS、S1。
+    """
+    params = dict(DEFAULT_DESIGN)
+    params.update({k: v for k, v in (design or {}).items() if k not in ('X', 'Y', 'Z')})
+    if axis is not None:
+        params.update((design or {}).get(axis, {}))
+    # 提供地盤分類與 SS、S1 時，以工址放大係數求 SDS、SD1
+    if 'site_class' in params:
+        missing = [key for key in ('SS', 'S1') if params.get(key) is None]
+        if missing:
+            raise ValueError(f"以地盤分類計算 SDS、SD1 時缺少 {'、'.join(missing)}")
+        sds, sd1 = site_spectral_values(params['site_class'], params['SS'], params['S1'])
+        params['SDS'] = sds.tolist()
+        params['SD1'] = sd1.tolist()
+    elif params.get('SDS') is None or params.get('SD1') is None:
+        where = f"{axis} 方向" if axis is not None else ""
+        raise ValueError(f"{where}設計參數須提供 SDS、SD1，或 site_class、SS、S1")
+    return params
+
+
+def check_design(design):
+    """
+    於開始計算前確認 X、Y、Z 三方向的設計參數皆完整，不完整時拋出 ValueError。
+
+    參數:
+        design (dict): design_params 可接受的設計參數。
+    """
+    for axis in ('X', 'Y', 'Z'):
+        design_params(design, axis)
+
+
+def eqfactors_from_periods(periods, design, axis):
+    """
+    依週期計算結果求各群組的水平向地震力加速度係數。
+
+    參數:
+        periods (dict): cal_period_vec 的回傳值 {群組: {'period': T, ...}}。
+        design (dict): design_params 可接受的設計參數。
+        axis (str): 'X' 或 'Y'。
+
+    回傳:
+        list of float: 與 periods 群組順序對應的係數。
+    """
+    params = design_params(design, axis)
+    period = np.fromiter((data['period'] for data in periods.values()), dtype=np.float64, count=len(periods))
+    coef = horizontal_coefficient(period, params['SDS'], params['SD1'], params['I'], params['alpha_y'], params['R'])
+    return coef.tolist()
+
+
+def vertical_eqfactors(groups, design):
+    """
+    依 cal_eqvforce 的慣例（第一組為上構，其餘為下構）求各群組垂直向地震力加速度係數。
+
+    參數:
+        groups (list): Z 方向群組名稱列表。
+        design (dict): design_params 可接受的設計參數。
+
+    回傳:
+        list of float: 與 groups 順序對應的係數。
+    """
+    params = design_params(design, 'Z')
+    superstructure = np.arange(len(groups)) == 0
+    coef = vertical_coefficient(params['SDS'], params['I'], params['alpha_y'], params['alpha_v'], superstructure)
+    return np.broadcast_to(coef, (len(groups),)).tolist()
+
+
+def coefficient_grid(period, sds=None, sd1=None, importance=1.0, alpha_y=1.2, r=3.0,
+                     site_class=None, ss=None, s1=None):
+    """
+    一次計算多組工址與設計參數下，所有群組的水平向地震力加速度係數。
+
+    period 為各群組週期，其餘參數為各情境的值（單一數值套用至所有情境），
+    回傳陣列的第 i 列可直接作為 cal_eqforce 的 eqfactor。
+    未提供 sds、sd1 時，以 site_class、ss、s1 求得。
+
+    參數:
+        period (array_like): 形狀 (群組數,) 的週期。
+        sds, sd1, importance, alpha_y, r (float or array_like): 形狀 (情境數,) 的設計參數。
+        site_class, ss, s1 (int/float or array_like): 形狀 (情境數,) 的地盤分類與震區係數。
+
+    回傳:
+        ndarray: 形狀 (情境數, 群組數) 的係數。
+    """
+    if sds is None or sd1 is None:
+        if site_class is None or ss is None or s1 is None:
+            raise ValueError("須提供 sds、sd1，或 site_class、ss、s1")
+        sds, sd1 = site_spectral_values(site_class, ss, s1)
+
+    period = np.asarray(period, dtype=np.float64).reshape(1, -1)
+    columns = np.broadcast_arrays(*[
+        np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in (sds, sd1, importance, alpha_y, r)
+    ])
+    sds, sd1, importance, alpha_y, r = [column.reshape(-1, 1) for column in columns]
+    return horizontal_coefficient(period, sds, sd1, importance, alpha_y, r)
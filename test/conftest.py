@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# 模組皆位於專案根目錄
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sapcore
+from fakesap import FakeModel, FakeSapBackend
+
+
+@pytest.fixture
+def fake_backend():
+    """以小型合成模型的 FakeSapBackend 取代 ComBackend，結束後還原。"""
+    backend = FakeSapBackend(FakeModel.synthetic(num_groups=3, joints_per_group=12))
+    sapcore.set_default_backend(backend)
+    yield backend
+    sapcore.set_default_backend(None)
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """模擬後端不讀取模型內容，僅需存在的 .sdb 檔。"""
+    path = tmp_path / 'model.sdb'
+    path.write_bytes(b'')
+    return str(path)
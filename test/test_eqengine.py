@@ -0,0 +1,158 @@
+import math
+
+import numpy as np
+import pytest
+
+from eqengine import (
+    NodeTable, cal_period_vec, cal_eqforce_vec, eqforce_basis, scale_eqforce, sweep_eqforce, directional_response,
+)
+from sapcore import cal_period, cal_eqforce
+
+
+def make_group_data():
+    """兩個群組，含只有位移或只有質量的節點，且位移與質量的節點順序不同。"""
+    jointdisp = {
+        'P1': {'node_num': 4, 'node_name': ['1', '2', '3', '9'], 'node_disp': [0.0, 0.002, 0.005, 0.004]},
+        'P2': {'node_num': 3, 'node_name': ['12', '11', '10'], 'node_disp': [0.009, 0.006, 0.001]},
+    }
+    jointmass = {
+        'P1': {'node_num': 4, 'node_name': ['3', '2', '1', '8'], 'node_mass': [250.0, 3.0, 0.0, 7.0]},
+        'P2': {'node_num': 3, 'node_name': ['10', '11', '12'], 'node_mass': [2.0, 2.5, 310.0]},
+    }
+    return jointdisp, jointmass
+
+
+def assert_tables_equal(actual, expected, columns):
+    assert sorted(actual.names) == sorted(expected.names)
+    for key in columns:
+        assert actual.to_dict(key) == pytest.approx(expected.to_dict(key), rel=1e-12)
+
+
+def test_cal_period_vec_matches_reference():
+    jointdisp, jointmass = make_group_data()
+    group = ['P1', 'P2']
+    expected = cal_period(jointdisp, jointmass, group)
+    actual = cal_period_vec(jointdisp, jointmass, group)
+
+    for gp in group:
+        for key in ('period', 'beta', 'zeta'):
+            assert actual[gp][key] == pytest.approx(expected[gp][key], rel=1e-12)
+        assert_tables_equal(actual[gp]['nodes'], expected[gp]['nodes'], ('mass', 'disp'))
+
+
+def test_cal_period_vec_rayleigh_value():
+    jointdisp = {'P': {'node_num': 1, 'node_name': ['1'], 'node_disp': [0.01]}}
+    jointmass = {'P': {'node_num': 1, 'node_name': ['1'], 'node_mass': [100.0]}}
+    result = cal_period_vec(jointdisp, jointmass, ['P'])['P']
+    # 單一質點 T = 2π sqrt(u/g)
+    assert result['period'] == pytest.approx(2 * math.pi * math.sqrt(0.01 / 9.81))
+
+
+def test_cal_period_vec_uses_common_nodes():
+    jointdisp, jointmass = make_group_data()
+    result = cal_period_vec(jointdisp, jointmass, ['P1'])['P1']
+    # 僅同時具有位移與質量的節點 1、2、3 計入
+    beta = 0.0 * 0.0 + 3.0 * 0.002 + 250.0 * 0.005
+    zeta = 0.0 * 0.0 ** 2 + 3.0 * 0.002 ** 2 + 250.0 * 0.005 ** 2
+    assert result['beta'] == pytest.approx(beta, rel=1e-12)
+    assert result['zeta'] == pytest.approx(zeta, rel=1e-12)
+    assert result['period'] == pytest.approx(2 * math.pi * math.sqrt(zeta / (9.81 * beta)), rel=1e-12)
+
+
+@pytest.mark.parametrize('vpa', [0.9, 1.0])
+def test_cal_eqforce_vec_matches_reference(vpa):
+    jointdisp, jointmass = make_group_data()
+    group = ['P1', 'P2']
+    eqfactor = [0.3, 0.25]
+    expected = cal_eqforce(jointdisp, jointmass, group, eqfactor, vpa)
+    actual = cal_eqforce_vec(jointdisp, jointmass, group, eqfactor, vpa)
+
+    for gp in group:
+        for key in ('beta', 'zeta', 'eqfactor', 'TotalMass', 'BaseShear'):
+            assert actual[gp][key] == pytest.approx(expected[gp][key], rel=1e-12)
+        assert_tables_equal(
+            actual[gp]['nodes'], expected[gp]['nodes'],
+            ('mass', 'disp', 'wu', 'wuu', 'eqforce_origin', 'eqforce'),
+        )
+
+
+@pytest.mark.parametrize('vpa', [0.9, 1.0])
+def test_cal_eqforce_vec_reaches_base_shear_ratio(vpa):
+    jointdisp, jointmass = make_group_data()
+    result = cal_eqforce_vec(jointdisp, jointmass, ['P1', 'P2'], [0.3, 0.25], vpa)
+    for gp, factor in (('P1', 0.3), ('P2', 0.25)):
+        data = result[gp]
+        assert data['eqfactor'] == factor
+        assert data['BaseShear'] == pytest.approx(data['TotalMass'] * 9.81 * factor, rel=1e-12)
+        assert abs(data['nodes'].sum('eqforce')) >= vpa * data['BaseShear'] * (1 - 1e-12)
+
+
+def test_scale_eqforce_reaches_base_shear_ratio():
+    jointdisp, jointmass = make_group_data()
+    basis = eqforce_basis(jointdisp, jointmass, ['P1'])
+    result = scale_eqforce(basis, ['P1'], [0.3], 1.0)['P1']
+    assert abs(result['nodes'].sum('eqforce')) >= result['BaseShear'] * (1 - 1e-12)
+
+
+def test_scale_eqforce_matches_cal_eqforce_vec():
+    jointdisp, jointmass = make_group_data()
+    basis = eqforce_basis(jointdisp, jointmass, ['P1', 'P2'])
+    scaled = scale_eqforce(basis, ['P1', 'P2'], [0.3, 0.25], 0.9)
+    direct = cal_eqforce_vec(jointdisp, jointmass, ['P1', 'P2'], [0.3, 0.25], 0.9)
+    for gp in ('P1', 'P2'):
+        assert scaled[gp]['BaseShear'] == pytest.approx(direct[gp]['BaseShear'], rel=1e-12)
+        assert_tables_equal(scaled[gp]['nodes'], direct[gp]['nodes'], ('wu', 'eqforce'))
+
+
+def test_node_table_missing_values():
+    table = NodeTable.from_dicts(mass={'1': 1.0, '2': 2.0}, disp={'2': 0.5})
+    assert table.to_dict('disp') == {'2': 0.5}
+    assert np.isnan(table['disp'][table.row('1')])
+    assert table.sum('mass') == 3.0
+
+
+def test_scale_eqforce_zero_modal_force_raises():
+    # 位移正負相消，第一振態分配力總和為 0
+    jointdisp = {'P': {'node_num': 2, 'node_name': ['1', '2'], 'node_disp': [0.01, -0.01]}}
+    jointmass = {'P': {'node_num': 2, 'node_name': ['1', '2'], 'node_mass': [100.0, 100.0]}}
+    basis = eqforce_basis(jointdisp, jointmass, ['P'])
+    with pytest.raises(ValueError, match='P'):
+        scale_eqforce(basis, ['P'], [0.3], 0.9)
+
+    jointdisp['P']['node_disp'] = [0.0, 0.0]
+    with pytest.raises(ValueError, match='P'):
+        cal_eqforce_vec(jointdisp, jointmass, ['P'], [0.3], 0.9)
+
+
+def test_sweep_eqforce_matches_scale_eqforce():
+    jointdisp, jointmass = make_group_data()
+    basis = eqforce_basis(jointdisp, jointmass, ['P1', 'P2'])
+    sweep = sweep_eqforce(basis, ['P1', 'P2'], [[0.3, 0.25], [0.1, 0.2]], [0.9, 1.0])
+    for k, (factors, vpa) in enumerate((([0.3, 0.25], 0.9), ([0.1, 0.2], 1.0))):
+        scaled = scale_eqforce(basis, ['P1', 'P2'], factors, vpa)
+        for j, gp in enumerate(['P1', 'P2']):
+            names = sweep['node_name'][j]
+            expected = scaled[gp]['nodes'].to_dict('eqforce')
+            assert dict(zip(names, sweep['eqforce'][k, j, :len(names)])) == pytest.approx(expected, rel=1e-12)
+
+
+def test_sweep_eqforce_zero_modal_force_raises():
+    jointdisp = {'P': {'node_num': 2, 'node_name': ['1', '2'], 'node_disp': [0.01, -0.01]}}
+    jointmass = {'P': {'node_num': 2, 'node_name': ['1', '2'], 'node_mass': [100.0, 100.0]}}
+    basis = eqforce_basis(jointdisp, jointmass, ['P'])
+    with pytest.raises(ValueError, match='P'):
+        sweep_eqforce(basis, ['P'], [0.3, 0.4], 0.9)
+
+
+def test_directional_response_checks_factor_shape():
+    disp = {'xx': np.array([0.01, 0.02]), 'xy': np.zeros(2), 'yx': np.zeros(2), 'yy': np.array([0.02, 0.03])}
+    mass = {'x': np.array([1.0, 2.0]), 'y': np.array([1.0, 2.0])}
+    result = directional_response(disp, mass, [0, 90], [0.3, 0.2])
+    assert result['eqfactor'].tolist() == [0.3, 0.2]
+    with pytest.raises(ValueError):
+        directional_response(disp, mass, [0, 45, 90], [0.3, 0.2])
+
+    # 沒有位移時無法調整至比例下限
+    disp = {key: np.zeros(2) for key in disp}
+    with pytest.raises(ValueError, match='0°'):
+        directional_response(disp, mass, [0, 90], 0.3, 0.9)
@@ -0,0 +1,245 @@
+import os
+
+import pytest
+
+import sapcore
+from fakesap import FakeModel, FakeSapBackend
+from rescache import ResultsCache, make_key
+from s2kio import iter_s2k_tables
+
+
+@pytest.fixture
+def groups(fake_backend):
+    return [gp for gp in fake_backend.model.groups if gp != sapcore.ALL_GROUP]
+
+
+@pytest.fixture
+def session(fake_backend):
+    session = sapcore.SapSession()
+    yield session
+    session.shutdown()
+
+
+@pytest.fixture
+def meshed_backend(request):
+    """每根框架自動分割出 2 個內部節點的模型；以 indirect 參數 False 模擬無 DatabaseTables 的舊版 SAP2000。"""
+    tables = getattr(request, 'param', True)
+    backend = FakeSapBackend(FakeModel.synthetic(num_groups=3, joints_per_group=6, mesh_points=2), tables=tables)
+    sapcore.set_default_backend(backend)
+    yield backend
+    sapcore.set_default_backend(None)
+
+
+@pytest.mark.parametrize('fetch_mode', ['group', 'all', 'selection'])
+def test_run_analysis_period_matches_reference(fake_backend, model_path, groups, session, monkeypatch, fetch_mode):
+    monkeypatch.setattr(sapcore, 'RESULTS_FETCH_MODE', fetch_mode)
+    period_x, period_y, period_z = sapcore.run_analysis_period(
+        model_path, groups, groups, groups[:2], session=session, use_cache=False
+    )
+
+    _, jointdisp, jointmass = sapcore.collect_joint_results(
+        model_path, groups, groups, groups[:2], session=session, use_cache=False
+    )
+    expected_x = sapcore.cal_period(jointdisp['X'], jointmass['X'], groups)
+    expected_y = sapcore.cal_period(jointdisp['Y'], jointmass['Y'], groups)
+    for gp in groups:
+        assert period_x[gp]['period'] == pytest.approx(expected_x[gp]['period'], rel=1e-12)
+        assert period_y[gp]['period'] == pytest.approx(expected_y[gp]['period'], rel=1e-12)
+        assert period_x[gp]['period'] > 0
+    assert list(period_z) == ['StructZdir']
+    assert os.path.exists(os.path.join(os.path.dirname(model_path), '01_period_results.xlsx'))
+
+
+def test_run_analysis_eqforce_writes_loads(fake_backend, model_path, groups, session):
+    factors = [0.3] * len(groups)
+    eqforce_x, eqforce_y, eqforce_z = sapcore.run_analysis_eqforce(
+        model_path, groups, groups, groups[:2], factors, factors, [0.2, 0.2], 0.9,
+        session=session, use_cache=False, load_output='both',
+    )
+
+    for gp, data in eqforce_x.items():
+        assert abs(data['nodes'].sum('eqforce')) >= 0.9 * data['BaseShear'] * (1 - 1e-12)
+
+    loads_path = os.path.join(os.path.dirname(model_path), '02_eqforce_loads.s2k')
+    written = {}
+    for _, record in iter_s2k_tables(loads_path, ['JOINT LOADS - FORCE']):
+        if record['LoadPat'] == 'EQL':
+            written[record['Joint']] = float(record['F1'])
+    expected = sapcore.merge_force_data(eqforce_x)
+    assert written.keys() == expected.keys()
+    for node, force in expected.items():
+        assert written[node] == pytest.approx(force, rel=1e-9)
+    assert os.path.exists(os.path.join(os.path.dirname(model_path), '02_eqforce_results.xlsx'))
+
+
+def test_eqforce_reuses_session_basis(fake_backend, model_path, groups, session):
+    args = (model_path, groups, groups, groups[:2])
+    sapcore.run_analysis_eqforce(*args, [0.3] * len(groups), [0.3] * len(groups), [0.2, 0.2], 0.9,
+                                 session=session, use_cache=False)
+    calls = fake_backend.call_counts.get('SapModel.Results.JointDispl', 0)
+
+    second = sapcore.run_analysis_eqforce(*args, [0.4] * len(groups), [0.4] * len(groups), [0.2, 0.2], 0.9,
+                                          session=session, use_cache=False)
+    assert fake_backend.call_counts.get('SapModel.Results.JointDispl', 0) == calls
+    assert second[0][groups[0]]['eqfactor'] == 0.4
+
+    sapcore.run_analysis_eqforce(*args, [0.4] * len(groups), [0.4] * len(groups), [0.2, 0.2], 0.9,
+                                 session=session, use_cache=False, reuse_basis=False)
+    assert fake_backend.call_counts.get('SapModel.Results.JointDispl', 0) > calls
+
+
+def test_results_cache_skips_sap(fake_backend, model_path, groups):
+    first = sapcore.run_analysis_period(model_path, groups, groups, groups[:2])
+    opened = fake_backend.call_counts.get('SapModel.File.OpenFile', 0)
+    assert opened > 0
+
+    second = sapcore.run_analysis_period(model_path, groups, groups, groups[:2])
+    assert fake_backend.call_counts.get('SapModel.File.OpenFile', 0) == opened
+    for gp in groups:
+        assert second[0][gp]['period'] == pytest.approx(first[0][gp]['period'], rel=1e-12)
+
+
+def test_shutdown_leaves_attached_instance(fake_backend):
+    owner = sapcore.Sap2000(fake_backend)
+    owner.launch_sap()
+    attached = sapcore.Sap2000(fake_backend, attach_existing=True)
+    attached.launch_sap()
+    assert attached.pid is None
+
+    attached.closeModel()
+    assert fake_backend.terminated == []
+    assert fake_backend.attach() is not None
+
+    pid = owner.pid
+    owner.closeModel()
+    assert fake_backend.terminated == [pid]
+
+
+def test_missing_model_raises(fake_backend, tmp_path):
+    missing = str(tmp_path / 'missing.sdb')
+    with pytest.raises(FileNotFoundError):
+        sapcore.run_analysis_period(missing, ['P1'], ['P1'], ['P1'], use_cache=False)
+    assert fake_backend.call_counts.get('SapModel.File.OpenFile', 0) == 0
+
+
+def test_direction_factors_shapes():
+    assert sapcore.direction_factors(0.3, 2, 3).tolist() == [[0.3] * 3] * 2
+    assert sapcore.direction_factors([0.1, 0.2], 2, 3).tolist() == [[0.1] * 3, [0.2] * 3]
+    assert sapcore.direction_factors([0.1, 0.2, 0.3], 2, 3).tolist() == [[0.1, 0.2, 0.3]] * 2
+    # 長度同時等於群組數與角度數時無法判斷
+    with pytest.raises(ValueError):
+        sapcore.direction_factors([0.1, 0.2], 2, 2)
+    with pytest.raises(ValueError):
+        sapcore.direction_factors([0.1, 0.2, 0.3, 0.4], 2, 3)
+    with pytest.raises(ValueError):
+        sapcore.direction_factors([[0.1, 0.2]], 2, 2)
+
+
+def test_run_direction_sweep_matches_axes(fake_backend, model_path, groups, session):
+    sweep = sapcore.run_direction_sweep(model_path, groups, [0, 90], 0.3, session=session)
+    period_x, period_y, _ = sapcore.run_analysis_period(
+        model_path, groups, groups, groups[:1], session=session, use_cache=False
+    )
+    for gp in groups:
+        period = sweep['response'][gp]['period']
+        assert period[0] == pytest.approx(period_x[gp]['period'], rel=1e-9)
+        assert period[1] == pytest.approx(period_y[gp]['period'], rel=1e-9)
+
+
+def test_group_cache_survives_save_on_exit(fake_backend, model_path):
+    first = sapcore.load_group_info(model_path)
+    opened = fake_backend.call_counts.get('SapModel.File.OpenFile', 0)
+    # 關閉 SAP2000 時存檔改變了模型內容，快取以存檔後的鍵值寫入
+    second = sapcore.load_group_info(model_path)
+    assert fake_backend.call_counts.get('SapModel.File.OpenFile', 0) == opened
+    assert second == first
+
+
+def test_live_session_results_keyed_after_save(fake_backend, model_path, groups):
+    session = sapcore.SapSession()
+    session.call(session.acquire, model_path)
+    key_args = (sapcore.MODEL_UNITS,
+                {lc: ["Accel", d, sapcore.UNIT_ACCEL] for lc, d in sapcore.UNIT_LOAD_CASES.items()},
+                {'X': groups, 'Y': groups, 'Z': groups[:1]}, sapcore.RESULTS_FETCH_MODE)
+    key = make_key(model_path, *key_args)
+
+    sapcore.collect_joint_results(model_path, groups, groups, groups[:1], session=session)
+    # 工作階段中已開啟的模型可能含未存檔的修改，不以磁碟上的檔案內容為鍵值
+    assert ResultsCache(model_path).load(key) is None
+
+    session.shutdown()
+    assert ResultsCache(model_path).load(make_key(model_path, *key_args)) is not None
+
+
+def test_modified_model_not_cached_after_save(fake_backend, model_path, groups, session):
+    sapmodel, _, _ = sapcore.collect_joint_results(model_path, groups, groups, groups[:1], session=session)
+    # 使用者於 SAP2000 中修改模型，分析結果隨解鎖刪除
+    session.call(sapmodel.setModelIsLocked, False)
+    entries = set(os.listdir(ResultsCache(model_path).cache_dir))
+    session.shutdown()
+    assert set(os.listdir(ResultsCache(model_path).cache_dir)) == entries
+
+
+def test_direction_sweep_profile(fake_backend, model_path, groups, monkeypatch):
+    import sapprofile
+    monkeypatch.setattr(sapprofile, 'ENABLED', True)
+    sapcore.run_direction_sweep(model_path, groups, [0, 45], 0.3)
+    assert os.path.exists(os.path.join(os.path.dirname(model_path), '05_direction_sweep_profile.json'))
+
+
+def test_session_runs_on_one_com_thread(fake_backend, model_path, groups, session):
+    sapcore.run_analysis_period(model_path, groups, groups, groups[:1], session=session, use_cache=False)
+    pid = session.sapmodel.pid
+    sapcore.run_analysis_period(model_path, groups, groups, groups[:1], session=session, use_cache=False)
+    # 流程皆轉交同一 COM 執行緒，不重新啟動 SAP2000
+    assert session.sapmodel.pid == pid
+    assert session._thread_id == session.com.thread_id
+    assert fake_backend.terminated == []
+
+
+def test_acquire_on_other_thread_terminates_previous_instance(fake_backend, model_path):
+    session = sapcore.SapSession()
+    session.acquire(model_path)
+    pid = session.sapmodel.pid
+    session.call(session.acquire, model_path)
+    assert fake_backend.terminated == [pid]
+    assert session.sapmodel.pid != pid
+
+    new_pid = session.sapmodel.pid
+    session.shutdown()
+    assert fake_backend.terminated == [pid, new_pid]
+
+
+@pytest.mark.parametrize('fetch_mode', ['all', 'selection'])
+def test_meshed_joints_match_group_fetch(meshed_backend, model_path, monkeypatch, fetch_mode, capsys):
+    groups = [gp for gp in meshed_backend.model.groups if gp != sapcore.ALL_GROUP]
+    monkeypatch.setattr(sapcore, 'RESULTS_FETCH_MODE', 'group')
+    _, expected_disp, expected_mass = sapcore.collect_joint_results(model_path, groups, groups, groups, use_cache=False)
+
+    monkeypatch.setattr(sapcore, 'RESULTS_FETCH_MODE', fetch_mode)
+    _, jointdisp, jointmass = sapcore.collect_joint_results(model_path, groups, groups, groups, use_cache=False)
+    for axis in 'XYZ':
+        for gp in groups:
+            # 群組成員含框架自動分割產生的節點
+            assert set(jointdisp[axis][gp]['node_name']) == set(expected_disp[axis][gp]['node_name'])
+            assert any(name.startswith('~') for name in jointdisp[axis][gp]['node_name'])
+            assert sorted(jointmass[axis][gp]['node_mass']) == sorted(expected_mass[axis][gp]['node_mass'])
+    period = sapcore.cal_period(jointdisp['X'], jointmass['X'], groups)
+    expected = sapcore.cal_period(expected_disp['X'], expected_mass['X'], groups)
+    for gp in groups:
+        assert period[gp]['period'] == pytest.approx(expected[gp]['period'], rel=1e-12)
+    assert '[警告]' not in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('meshed_backend', [False], indirect=True)
+def test_meshed_joints_warned_without_tables(meshed_backend, model_path, monkeypatch, capsys):
+    groups = [gp for gp in meshed_backend.model.groups if gp != sapcore.ALL_GROUP]
+    monkeypatch.setattr(sapcore, 'RESULTS_FETCH_MODE', 'all')
+    _, jointdisp, _ = sapcore.collect_joint_results(model_path, groups, groups, groups, use_cache=False)
+
+    out = capsys.readouterr().out
+    num_mesh = sum(len(names) for names in meshed_backend.model.mesh.values())
+    assert f'{num_mesh} 個節點不屬於任何群組' in out
+    # 每次分析只警告一次
+    assert out.count('不屬於任何群組') == 1
+    assert not any(name.startswith('~') for name in jointdisp['X'][groups[0]]['node_name'])
@@ -0,0 +1,89 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import rescache
+from rescache import ResultsCache, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """以遞增的假時間取代 time.time，使最後使用時間的先後順序確定。"""
+    now = [1000.0]
+
+    def fake_time():
+        now[0] += 1.0
+        return now[0]
+
+    monkeypatch.setattr(rescache.time, 'time', fake_time)
+    return now
+
+
+def cached_keys(cache):
+    with open(os.path.join(cache.cache_dir, rescache.INDEX_FILENAME), 'r', encoding='utf-8') as f:
+        return set(json.load(f))
+
+
+def test_save_and_load(model_path):
+    cache = ResultsCache(model_path)
+    assert cache.load('missing') is None
+    cache.save('a', {'disp': [1, 2, 3]})
+    assert cache.load('a') == {'disp': [1, 2, 3]}
+
+
+def test_lru_eviction_by_entries(model_path, clock):
+    cache = ResultsCache(model_path, max_entries=2)
+    cache.save('a', {'v': 1})
+    cache.save('b', {'v': 2})
+    # 讀取 a 後 b 成為最久未使用
+    assert cache.load('a') == {'v': 1}
+    cache.save('c', {'v': 3})
+
+    assert cached_keys(cache) == {'a', 'c'}
+    assert cache.load('b') is None
+    assert not os.path.exists(os.path.join(cache.cache_dir, 'b.json.gz'))
+
+
+def test_lru_eviction_by_bytes_keeps_new_entry(model_path, clock):
+    cache = ResultsCache(model_path, max_bytes=1)
+    cache.save('a', {'v': list(range(100))})
+    cache.save('b', {'v': list(range(100))})
+    # 超過容量時仍保留剛寫入的項目
+    assert cached_keys(cache) == {'b'}
+    assert cache.load('b') == {'v': list(range(100))}
+
+
+def test_corrupt_entry_is_dropped(model_path):
+    cache = ResultsCache(model_path)
+    cache.save('a', {'v': 1})
+    with open(os.path.join(cache.cache_dir, 'a.json.gz'), 'wb') as f:
+        f.write(b'not gzip')
+    assert cache.load('a') is None
+    assert cached_keys(cache) == set()
+
+
+def test_make_key_depends_on_content_and_groups(model_path):
+    key = make_key(model_path, 12, {'UNIT-X': ['Accel', 'UX', 9.81]}, {'X': ['P1']})
+    assert key == make_key(model_path, 12, {'UNIT-X': ['Accel', 'UX', 9.81]}, {'X': ['P1']})
+    assert key != make_key(model_path, 12, {'UNIT-X': ['Accel', 'UX', 9.81]}, {'X': ['P2']})
+    assert key != make_key(model_path, 12, {'UNIT-X': ['Accel', 'UX', 9.81]}, {'X': ['P1']}, 'all')
+
+    with open(model_path, 'ab') as f:
+        f.write(b'changed')
+    assert key != make_key(model_path, 12, {'UNIT-X': ['Accel', 'UX', 9.81]}, {'X': ['P1']})
+
+
+def _save_many(model_path, worker):
+    cache = ResultsCache(model_path, max_entries=1000)
+    for i in range(10):
+        cache.save(f'{worker}-{i}', {'v': i})
+
+
+def test_concurrent_saves_keep_all_entries(model_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_save_many, [model_path] * 4, range(4)))
+
+    cache = ResultsCache(model_path)
+    assert cached_keys(cache) == {f'{w}-{i}' for w in range(4) for i in range(10)}
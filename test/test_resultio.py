@@ -0,0 +1,127 @@
+import openpyxl
+import pytest
+
+from resultio import read_joint_results, results_to_joint_data, split_by_group
+
+
+DISPLACEMENTS = [
+    # Joint, OutputCase, U1, U2, U3
+    ('1', 'UNIT-X', 0.0, 0.0, 0.0),
+    ('2', 'UNIT-X', 0.004, 0.0001, 0.0),
+    ('3', 'UNIT-X', 0.010, 0.0002, 0.0),
+    ('1', 'UNIT-Y', 0.0, 0.0, 0.0),
+    ('2', 'UNIT-Y', 0.0001, 0.006, 0.0),
+    ('3', 'UNIT-Y', 0.0002, 0.015, 0.0),
+    ('1', 'UNIT-Z', 0.0, 0.0, 0.0),
+    ('2', 'UNIT-Z', 0.0, 0.0, 0.0003),
+    ('3', 'UNIT-Z', 0.0, 0.0, 0.0005),
+]
+MASSES = [
+    ('1', 0.0, 0.0, 0.0),
+    ('2', 2.0, 2.0, 2.0),
+    ('3', 300.0, 300.0, 300.0),
+]
+
+
+def write_text_results(path):
+    lines = ['TABLE:  "Joint Displacements"']
+    for joint, case, u1, u2, u3 in DISPLACEMENTS:
+        lines.append(f'   Joint={joint}   OutputCase={case}   CaseType=LinStatic   U1={u1}   U2={u2}   U3={u3}'
+                     '   R1=0   R2=0   R3=0')
+    lines.append('')
+    lines.append('TABLE:  "Assembled Joint Masses"')
+    for joint, u1, u2, u3 in MASSES:
+        lines.append(f'   Joint={joint}   U1={u1}   U2={u2}   U3={u3}   R1=0   R2=0   R3=0')
+    lines.append('')
+    lines.append('END TABLE DATA')
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def write_excel_results(path):
+    # SAP2000 匯出格式：第一列為資料表名稱、第二列為欄位名稱、第三列為單位
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = 'Joint Displacements'
+    sheet.append(['TABLE:  Joint Displacements'])
+    sheet.append(['Joint', 'OutputCase', 'CaseType', 'U1', 'U2', 'U3'])
+    sheet.append(['Text', 'Text', 'Text', 'm', 'm', 'm'])
+    for joint, case, u1, u2, u3 in DISPLACEMENTS:
+        sheet.append([joint, case, 'LinStatic', u1, u2, u3])
+
+    sheet = book.create_sheet('Assembled Joint Masses')
+    sheet.append(['TABLE:  Assembled Joint Masses'])
+    sheet.append(['Joint', 'U1', 'U2', 'U3'])
+    sheet.append(['Text', 'Ton-s2/m', 'Ton-s2/m', 'Ton-s2/m'])
+    for row in MASSES:
+        sheet.append(list(row))
+    book.save(path)
+
+
+@pytest.fixture(params=['txt', 'xlsx'])
+def results_path(request, tmp_path):
+    path = tmp_path / f'results.{request.param}'
+    if request.param == 'txt':
+        write_text_results(path)
+    else:
+        write_excel_results(path)
+    return str(path)
+
+
+def test_read_joint_results(results_path):
+    results = read_joint_results(results_path)
+
+    assert set(results['disp']) == {'UNIT-X', 'UNIT-Y', 'UNIT-Z'}
+    disp_x = results['disp']['UNIT-X']
+    assert disp_x.names == ['1', '2', '3']
+    assert disp_x['U1'].tolist() == pytest.approx([0.0, 0.004, 0.010])
+    assert results['disp']['UNIT-Y'].to_dict('U2') == pytest.approx({'1': 0.0, '2': 0.006, '3': 0.015})
+    # Excel 的單位列不列入節點
+    assert results['mass'].names == ['1', '2', '3']
+    assert results['mass']['U3'].tolist() == pytest.approx([0.0, 2.0, 300.0])
+
+
+def test_results_to_joint_data(results_path):
+    results = read_joint_results(results_path)
+    members = {'P1': ['1', '2', '3'], 'SUP': ['3', '99']}
+    jointdisp, jointmass = results_to_joint_data(results, members, ['P1'], ['P1'], ['SUP'])
+
+    assert jointdisp['X']['P1']['node_disp'] == pytest.approx([0.0, 0.004, 0.010])
+    assert jointdisp['Y']['P1']['node_disp'] == pytest.approx([0.0, 0.006, 0.015])
+    # 沒有結果的節點略過
+    assert jointdisp['Z']['SUP'] == {'node_num': 1, 'node_name': ['3'], 'node_disp': pytest.approx([0.0005])}
+    assert jointmass['X']['P1']['node_mass'] == pytest.approx([0.0, 2.0, 300.0])
+
+
+def test_unmatched_joints_warning(results_path, capsys):
+    results = read_joint_results(results_path)
+    results_to_joint_data(results, {'P1': ['1', '2', '3']}, ['P1'], ['P1'], ['P1'])
+    assert '[警告]' not in capsys.readouterr().out
+
+    # 節點 3 不屬於任何群組（如網格分割節點）
+    results_to_joint_data(results, {'P1': ['1'], 'P2': ['2']}, ['P1'], ['P1'], ['P1'])
+    out = capsys.readouterr().out
+    assert '[警告]' in out and '1 個節點' in out
+
+
+def test_missing_unit_case(tmp_path):
+    path = tmp_path / 'results.txt'
+    write_text_results(path)
+    path.write_text(path.read_text(encoding='utf-8').replace('UNIT-Z', 'DEAD'), encoding='utf-8')
+
+    results = read_joint_results(str(path))
+    with pytest.raises(ValueError):
+        results_to_joint_data(results, {'P1': ['1']}, ['P1'], ['P1'], ['P1'])
+
+
+def test_split_by_group_keeps_member_order(tmp_path):
+    path = tmp_path / 'results.txt'
+    write_text_results(path)
+    mass = read_joint_results(str(path))['mass']
+
+    split = split_by_group(mass, 'U1', {'P1': ['3', '2']}, ['P1'], 'node_mass')
+    assert split['P1'] == {'node_num': 2, 'node_name': ['3', '2'], 'node_mass': [300.0, 2.0]}
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError):
+        read_joint_results(str(tmp_path / 'results.csv'))
@@ -0,0 +1,112 @@
+import s2kio
+from s2kio import iter_s2k_tables, parse_s2k_record, read_s2k_model, write_joint_loads_s2k
+
+
+S2K_TEXT = """\
+File model.s2k was saved on m/d/yy at h:mm:ss
+
+TABLE:  "PROGRAM CONTROL"
+   ProgramName=SAP2000   Version=24.0.0   CurrUnits="Ton, m, C"
+
+TABLE:  "JOINT COORDINATES"
+   Joint=1   CoordSys=GLOBAL   CoordType=Cartesian   XorR=0   Y=0   Z=0
+   Joint=2   CoordSys=GLOBAL   CoordType=Cartesian   XorR=0   Y=0 _
+      Z=5.5
+$ 註解列略過
+   Joint=3   CoordSys=GLOBAL   CoordType=Cartesian   XorR=0   Y=0   Z=11
+
+TABLE:  "FRAME SECTION PROPERTIES 01 - GENERAL"
+   SectionName=COL   Material=4000Psi   Shape=Rectangular
+
+TABLE:  "GROUPS 1 - DEFINITIONS"
+   GroupName=ALL   Selection=Yes
+   GroupName=P1   Selection=Yes
+
+TABLE:  "GROUPS 2 - ASSIGNMENTS"
+   GroupName=P1   ObjectType=Joint   ObjectLabel=2
+   GroupName=P1   ObjectType=Frame   ObjectLabel=F1
+   GroupName=P1   ObjectType=Joint _
+      ObjectLabel=3
+
+TABLE:  "JOINT ADDED MASS ASSIGNMENTS"
+   Joint=3   CoordSys=GLOBAL   Mass1=250   Mass2=250   Mass3=0
+
+END TABLE DATA
+"""
+
+
+def write_text(tmp_path, text, encoding='utf-8', name='model.s2k'):
+    path = tmp_path / name
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_parse_s2k_record_quoted_and_empty():
+    record = parse_s2k_record('   GroupName="P 1"   Note=   Label=A')
+    assert record == {'GroupName': 'P 1', 'Note': '', 'Label': 'A'}
+
+
+def test_iter_s2k_tables_continuation_and_filter(tmp_path):
+    path = write_text(tmp_path, S2K_TEXT)
+    records = list(iter_s2k_tables(path, ['joint coordinates', 'GROUPS 2 - ASSIGNMENTS']))
+
+    tables = [table for table, _ in records]
+    assert set(tables) == {'JOINT COORDINATES', 'GROUPS 2 - ASSIGNMENTS'}
+
+    joints = [record for table, record in records if table == 'JOINT COORDINATES']
+    assert [j['Joint'] for j in joints] == ['1', '2', '3']
+    # 以 ' _' 延續的資料列合併為單一記錄
+    assert joints[1]['Z'] == '5.5'
+
+    assignments = [record for table, record in records if table == 'GROUPS 2 - ASSIGNMENTS']
+    assert assignments[-1] == {'GroupName': 'P1', 'ObjectType': 'Joint', 'ObjectLabel': '3'}
+
+
+def test_iter_s2k_tables_encoding_fallback(tmp_path, monkeypatch):
+    text = S2K_TEXT.replace('GroupName=P1   Selection=Yes', 'GroupName=橋墩1   Selection=Yes')
+    path = write_text(tmp_path, text, encoding='cp950')
+    monkeypatch.setattr(s2kio, 'FALLBACK_ENCODING', 'cp950')
+
+    groups = [record['GroupName'] for _, record in iter_s2k_tables(path, ['GROUPS 1 - DEFINITIONS'])]
+    assert groups == ['ALL', '橋墩1']
+
+
+def test_iter_s2k_tables_mixed_encoding_per_line(tmp_path, monkeypatch):
+    # UTF-8 檔案中夾雜以 cp950 編碼的資料列，逐行判斷編碼
+    path = tmp_path / 'mixed.s2k'
+    path.write_bytes(
+        'TABLE:  "GROUPS 1 - DEFINITIONS"\n'.encode('utf-8')
+        + '   GroupName=上構   Selection=Yes\n'.encode('utf-8')
+        + '   GroupName=下構   Selection=Yes\n'.encode('cp950')
+        + b'END TABLE DATA\n'
+    )
+    monkeypatch.setattr(s2kio, 'FALLBACK_ENCODING', 'cp950')
+
+    groups = [record['GroupName'] for _, record in iter_s2k_tables(str(path))]
+    assert groups == ['上構', '下構']
+
+
+def test_iter_s2k_tables_explicit_encoding(tmp_path):
+    text = S2K_TEXT.replace('GroupName=P1   Selection=Yes', 'GroupName=橋墩1   Selection=Yes')
+    path = write_text(tmp_path, text, encoding='cp950')
+
+    groups = [record['GroupName'] for _, record in iter_s2k_tables(path, ['GROUPS 1 - DEFINITIONS'], 'cp950')]
+    assert groups == ['ALL', '橋墩1']
+
+
+def test_read_s2k_model(tmp_path):
+    model = read_s2k_model(write_text(tmp_path, S2K_TEXT))
+
+    assert model['units'] == 'Ton, m, C'
+    assert model['groups'] == ['ALL', 'P1']
+    assert model['members'] == {'ALL': [], 'P1': ['2', '3']}
+    assert model['joints']['z'].tolist() == [0.0, 5.5, 11.0]
+    assert model['added_mass'].to_dict('mass1') == {'3': 250.0}
+
+
+def test_joint_loads_round_trip(tmp_path):
+    path = str(tmp_path / 'loads.s2k')
+    write_joint_loads_s2k(path, {'EQL': [('2', [1.5, 0, 0, 0, 0, 0]), ('3', [2.5, 0, 0, 0, 0, 0])]})
+
+    records = [record for _, record in iter_s2k_tables(path, ['JOINT LOADS - FORCE'])]
+    assert [(r['Joint'], r['LoadPat'], float(r['F1'])) for r in records] == [('2', 'EQL', 1.5), ('3', 'EQL', 2.5)]
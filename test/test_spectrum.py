@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pytest
+
+import spectrum
+
+
+@pytest.mark.parametrize('site_class, ss, s1, fa, fv', [
+    (1, 0.7, 0.40, 1.0, 1.0),
+    (2, 0.5, 0.30, 1.1, 1.5),
+    (2, 0.65, 0.45, 1.05, 1.2),
+    (3, 0.9, 0.325, 1.0, 1.75),
+    # 超出表列範圍時取端點值
+    (3, 0.4, 0.60, 1.2, 1.4),
+])
+def test_site_coefficients_table(site_class, ss, s1, fa, fv):
+    actual_fa, actual_fv = spectrum.site_coefficients(site_class, ss, s1)
+    assert float(actual_fa) == pytest.approx(fa)
+    assert float(actual_fv) == pytest.approx(fv)
+
+
+def test_site_coefficients_invalid_class():
+    with pytest.raises(ValueError):
+        spectrum.site_coefficients(4, 0.7, 0.4)
+
+
+def test_site_spectral_values():
+    sds, sd1 = spectrum.site_spectral_values(2, 0.65, 0.45)
+    assert float(sds) == pytest.approx(1.05 * 0.65)
+    assert float(sd1) == pytest.approx(1.2 * 0.45)
+
+
+@pytest.mark.parametrize('period, sad', [
+    (0.0, 0.32),
+    (0.05, 0.56),   # T <= 0.2 T0: SDS (0.4 + 3 T/T0)
+    (0.3, 0.8),     # 0.2 T0 < T <= T0: SDS
+    (1.0, 0.4),     # T0 < T <= 2.5 T0: SD1/T
+    (2.0, 0.32),    # T > 2.5 T0: 0.4 SDS
+])
+def test_spectral_acceleration(period, sad):
+    # SDS = 0.8、SD1 = 0.4，T0 = 0.5
+    assert float(spectrum.spectral_acceleration(period, 0.8, 0.4)) == pytest.approx(sad)
+
+
+def test_reduction_factor_segments():
+    ra = 1.0 + (3.0 - 1.0) / spectrum.RA_DIVISOR
+    fu_short = math.sqrt(2 * ra - 1)
+    t0 = 0.5
+    periods = [0.0, 0.05, 0.2, 0.4, 1.0]
+    expected = [1.0, (1.0 + fu_short) / 2, fu_short, (fu_short + ra) / 2, ra]
+    assert spectrum.reduction_factor(periods, t0, ra) == pytest.approx(expected)
+
+
+def test_modified_ratio():
+    assert spectrum.modified_ratio([0.2, 0.5, 1.0]) == pytest.approx([0.2, 0.52 * 0.5 + 0.144, 0.7])
+
+
+def test_horizontal_coefficient():
+    ra = 1.0 + 2.0 / spectrum.RA_DIVISOR
+    # T = 1.0 > T0，SaD = SD1/T = 0.4、Fu = Ra，SaD/Fu <= 0.3 不修正
+    expected = 1.25 / (1.2 * 1.2) * (0.4 / ra)
+    assert float(spectrum.horizontal_coefficient(1.0, 0.8, 0.4, 1.25, 1.2, 3.0)) == pytest.approx(expected)
+
+
+def test_vertical_coefficient():
+    coef = spectrum.vertical_coefficient(0.8, 1.0, 1.2, 0.5, np.array([True, False]))
+    assert coef == pytest.approx([0.5 * 0.8 / 1.2, 0.5 * 0.4 * 0.8 / 1.2])
+
+
+def test_coefficient_grid_matches_scalar():
+    period = [0.3, 1.0]
+    grid = spectrum.coefficient_grid(period, sds=[0.8, 0.6], sd1=[0.4, 0.3], importance=1.25, r=[3.0, 4.0])
+    assert grid.shape == (2, 2)
+    for i, (sds, sd1, r) in enumerate([(0.8, 0.4, 3.0), (0.6, 0.3, 4.0)]):
+        for j, t in enumerate(period):
+            assert grid[i, j] == pytest.approx(float(spectrum.horizontal_coefficient(t, sds, sd1, 1.25, 1.2, r)))
+
+
+def test_design_params_defaults_and_overrides():
+    params = spectrum.design_params({'SDS': 0.8, 'SD1': 0.45, 'Y': {'R': 4.0}}, 'Y')
+    assert params['R'] == 4.0
+    assert params['I'] == spectrum.DEFAULT_DESIGN['I']
+
+
+@pytest.mark.parametrize('design', [{'I': 1.0}, {'SDS': 0.8}, {'site_class': 2, 'SS': 0.7}])
+def test_design_params_requires_site_values(design):
+    with pytest.raises(ValueError):
+        spectrum.design_params(design, 'X')